@@ -0,0 +1,287 @@
+# --- Precomputed Adiabatic Flame Temperature Tables ---
+# Most flame temperature questions are about a few common fuels burning in air near ambient
+# conditions. For those, the flame temperature is read from a table computed offline over a grid
+# of equivalence ratio, initial temperature and initial pressure, by multilinear interpolation
+# (in phi, T0 and ln P0) instead of a full HP equilibrium. Tables are .npy files memory-mapped on
+# first use, each with a JSON sidecar holding its axes, the mechanism it was built from and the
+# largest interpolation error measured against Cantera when it was built. Anything outside a
+# table, or a table built from a different mechanism, falls back to Cantera.
+#
+#   python aft_tables.py                                 # rebuild the default tables
+#   python aft_tables.py --fuels CH4 H2 --parallel       # rebuild selected fuels
+
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+import cantera as ct
+import numpy as np
+
+from combustion import AIR, adiabatic_flame_temperature_sweep
+from mechanisms import DEFAULT_MECHANISM, mechanism_hash, mechanism_registry
+
+
+AFT_TABLE_DIR = os.environ.get("CATALYST_MIND_AFT_TABLE_DIR",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "aft_tables"))
+TABLE_FORMAT_VERSION = 1
+DEFAULT_FUELS = ("CH4", "C3H8", "H2", "C2H6", "CO")
+DEFAULT_OXIDIZERS = ("air",)
+
+# Finer in phi around stoichiometric, where the curve bends most
+PHI_AXIS = sorted({round(float(value), 4) for value in np.concatenate([
+    np.arange(0.3, 0.8, 0.05), np.arange(0.8, 1.4, 0.02), np.arange(1.4, 3.0001, 0.05)])})
+T0_AXIS = [float(value) for value in np.arange(250.0, 900.1, 50.0)]
+P0_AXIS = [multiple * ct.one_atm for multiple in (0.5, 1.0, 2.0, 5.0, 10.0, 20.0)]
+RANDOM_VALIDATION_POINTS = 200
+
+
+def _table_name(fuel: str, oxidizer: str) -> str:
+    return f"{fuel.strip().upper()}_{oxidizer.strip().lower()}"
+
+
+def _bracket(axis: list, value: float) -> tuple:
+    """Index of the cell holding value and the fractional position inside it."""
+    index = min(max(bisect.bisect_right(axis, value) - 1, 0), len(axis) - 2)
+    lo, hi = axis[index], axis[index + 1]
+    return index, (value - lo) / (hi - lo)
+
+
+class AftTable:
+    """
+    Flame temperatures of one fuel/oxidizer pair on a (phi, T0, P0) grid.
+
+    Args:
+        values (np.ndarray): Flame temperatures in K, shape (len(phi), len(t0), len(p0)); may be a memory map.
+        metadata (dict): The JSON sidecar (axes "phi", "t0_k", "p0_pa", "max_error_K", ...).
+    """
+
+    def __init__(self, values: np.ndarray, metadata: dict):
+        self.values = values
+        self.metadata = metadata
+        self.phi = list(metadata["phi"])
+        self.t0 = list(metadata["t0_k"])
+        self.ln_p0 = [math.log(p) for p in metadata["p0_pa"]]
+        self.max_error_k = metadata["max_error_K"]
+
+    @classmethod
+    def load(cls, directory: str, name: str):
+        """Memory-maps a table; returns None if its files are missing."""
+        try:
+            with open(os.path.join(directory, name + ".json"), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            values = np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+        except OSError:
+            return None
+        return cls(values, metadata)
+
+    def contains(self, phi: float, t0: float, p0: float) -> bool:
+        return (self.phi[0] <= phi <= self.phi[-1] and self.t0[0] <= t0 <= self.t0[-1]
+                and self.ln_p0[0] <= math.log(p0) <= self.ln_p0[-1])
+
+    def interpolate(self, phi: float, t0: float, p0: float) -> float:
+        """Multilinear interpolation in (phi, T0, ln P0); the point must be inside the table."""
+        i, u = _bracket(self.phi, phi)
+        j, v = _bracket(self.t0, t0)
+        k, w = _bracket(self.ln_p0, math.log(p0))
+        cube = self.values[i:i + 2, j:j + 2, k:k + 2].tolist()
+        result = 0.0
+        for di, wi in ((0, 1 - u), (1, u)):
+            for dj, wj in ((0, 1 - v), (1, v)):
+                for dk, wk in ((0, 1 - w), (1, w)):
+                    result += wi * wj * wk * cube[di][dj][dk]
+        return result
+
+
+class AftTableStore:
+    """
+    Lazily loaded tables of a directory, checked against the current mechanism.
+
+    Args:
+        directory (str): Directory with <FUEL>_<oxidizer>.npy/.json pairs; an empty string disables lookups.
+        mechanism (str): Mechanism the tables must have been built from.
+    """
+
+    def __init__(self, directory: str = AFT_TABLE_DIR, mechanism: str = DEFAULT_MECHANISM):
+        self.directory = directory
+        self.mechanism = mechanism
+        self._tables = {}
+        self._on_disk = None  # Table names in the directory, listed on first use
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "outside_table": 0, "no_table": 0, "stale_tables": 0}
+
+    def get(self, fuel: str, oxidizer: str):
+        """Returns the table of a fuel/oxidizer pair, or None if there is no current one."""
+        name = _table_name(fuel, oxidizer)
+        with self._lock:
+            if self._on_disk is None:
+                self._on_disk = self._list_tables()
+            # Only names with files are remembered, so arbitrary fuel strings cannot grow the cache
+            if name not in self._on_disk:
+                return None
+            if name in self._tables:
+                return self._tables[name]
+        table = AftTable.load(self.directory, name) if self.directory else None
+        if table is not None and (table.metadata.get("mechanism_hash") != mechanism_hash(self.mechanism)
+                                  or table.metadata.get("format_version") != TABLE_FORMAT_VERSION):
+            table = None  # Built from another mechanism: its values no longer match Cantera's
+            with self._lock:
+                self._stats["stale_tables"] += 1
+        with self._lock:
+            self._tables[name] = table
+        return table
+
+    def lookup(self, fuel: str, oxidizer: str, phi: float, t0: float, p0: float):
+        """
+        Interpolates the flame temperature if a table covers the point.
+
+        Returns:
+            tuple or None: (flame temperature in K, largest error measured for the table in K)
+        """
+        table = self.get(fuel, oxidizer)
+        if table is None:
+            outcome = "no_table"
+        elif not table.contains(phi, t0, p0):
+            outcome = "outside_table"
+        else:
+            outcome = "hits"
+        with self._lock:
+            self._stats[outcome] += 1
+        if outcome != "hits":
+            return None
+        return table.interpolate(phi, t0, p0), table.max_error_k
+
+    def fingerprint(self) -> str:
+        """
+        Short hash of the tables in the directory (their mechanism, build time and measured error),
+        so results read from them can be keyed by the tables they came from.
+        """
+        with self._lock:
+            if self._fingerprint is None:
+                sidecars = {}
+                for name in sorted(self._list_tables()):
+                    try:
+                        with open(os.path.join(self.directory, name + ".json"), "r", encoding="utf-8") as f:
+                            metadata = json.load(f)
+                    except (OSError, ValueError):
+                        continue  # Unreadable sidecar: no table can be served from it
+                    sidecars[name] = [metadata.get(key) for key in ("format_version", "mechanism_hash", "created_at", "max_error_K")]
+                self._fingerprint = hashlib.sha256(json.dumps(sidecars, sort_keys=True).encode()).hexdigest()[:16]
+            return self._fingerprint
+
+    def _list_tables(self) -> set:
+        try:
+            return {entry[:-len(".npy")] for entry in os.listdir(self.directory) if entry.endswith(".npy")} if self.directory else set()
+        except OSError:
+            return set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._on_disk = None
+            self._fingerprint = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = dict(self._stats)
+            report["tables_loaded"] = sum(table is not None for table in self._tables.values())
+            return report
+
+
+def _validation_points(seed: int = 0) -> list:
+    """Cell midpoints along phi (where interpolation is least accurate) plus random points inside the grid."""
+    rng = np.random.default_rng(seed)
+    phi_mid = [(a + b) / 2 for a, b in zip(PHI_AXIS[:-1], PHI_AXIS[1:])]
+    t0_mid = [(a + b) / 2 for a, b in zip(T0_AXIS[:-1], T0_AXIS[1:])]
+    p0_mid = [math.sqrt(a * b) for a, b in zip(P0_AXIS[:-1], P0_AXIS[1:])]
+    points = [(phi, t0, p0) for t0, p0 in ((t0_mid[0], p0_mid[0]), (t0_mid[len(t0_mid) // 2], p0_mid[1]),
+                                           (t0_mid[-1], p0_mid[-1])) for phi in phi_mid]
+    for _ in range(RANDOM_VALIDATION_POINTS):
+        points.append((rng.uniform(PHI_AXIS[0], PHI_AXIS[-1]), rng.uniform(T0_AXIS[0], T0_AXIS[-1]),
+                       math.exp(rng.uniform(math.log(P0_AXIS[0]), math.log(P0_AXIS[-1])))))
+    return points
+
+
+def build_table(fuel: str, oxidizer: str = "air", directory: str = AFT_TABLE_DIR, parallel: bool = False,
+                mechanism: str = DEFAULT_MECHANISM) -> dict:
+    """
+    Computes the table of a fuel/oxidizer pair with Cantera, measures its interpolation error and
+    writes it to the directory.
+
+    Returns:
+        dict: The table's metadata.
+    """
+    started = time.perf_counter()
+    values = np.empty((len(PHI_AXIS), len(T0_AXIS), len(P0_AXIS)))
+    for k, p0 in enumerate(P0_AXIS):  # One sweep per pressure keeps each within the sweep size limit
+        grid = adiabatic_flame_temperature_sweep([fuel], oxidizer, PHI_AXIS, T0_AXIS, [p0], parallel=parallel,
+                                                 mechanism=mechanism)
+        # Sweep rows come out in (phi, T0) order, matching the table layout
+        values[:, :, k] = np.array([row[-1] for row in grid["rows"]]).reshape(len(PHI_AXIS), len(T0_AXIS))
+    metadata = {
+        "format_version": TABLE_FORMAT_VERSION,
+        "fuel": fuel,
+        "oxidizer": oxidizer,
+        "mechanism": mechanism,
+        "mechanism_hash": mechanism_hash(mechanism),
+        "cantera_version": ct.__version__,
+        "phi": PHI_AXIS,
+        "t0_k": T0_AXIS,
+        "p0_pa": P0_AXIS,
+        "interpolation": "multilinear in phi, T0 and ln(P0)",
+    }
+
+    points = _validation_points()
+    table = AftTable(values, dict(metadata, max_error_K=None))
+    phis, t0s, p0s = (list(column) for column in zip(*points))
+    with mechanism_registry.checkout(mechanism) as gas:
+        exact = ct.SolutionArray(gas, len(points))
+        exact.TP = np.array(t0s), np.array(p0s)
+        exact.set_equivalence_ratio(np.array(phis), fuel, AIR if oxidizer.lower() == 'air' else oxidizer)
+        exact.equilibrate('HP')
+        errors = np.abs(np.array([table.interpolate(*point) for point in points]) - exact.T)
+    metadata.update({
+        "max_error_K": round(float(errors.max()), 3),
+        "mean_error_K": round(float(errors.mean()), 3),
+        "validation_points": len(points),
+        "build_s": round(time.perf_counter() - started, 2),
+        "created_at": time.time(),
+    })
+
+    os.makedirs(directory, exist_ok=True)
+    name = _table_name(fuel, oxidizer)
+    np.save(os.path.join(directory, name + ".npy"), values)
+    with open(os.path.join(directory, name + ".json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+        f.write("\n")
+    return metadata
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Regenerate the precomputed adiabatic flame temperature tables.")
+    parser.add_argument("--fuels", nargs="+", default=list(DEFAULT_FUELS), help="Fuel formulas")
+    parser.add_argument("--oxidizers", nargs="+", default=list(DEFAULT_OXIDIZERS), help="Oxidizers ('air' or a composition)")
+    parser.add_argument("--output-dir", default=AFT_TABLE_DIR, help="Directory to write the tables to")
+    parser.add_argument("--parallel", action="store_true", help="Spread each table across CPU cores")
+    args = parser.parse_args()
+
+    points = len(PHI_AXIS) * len(T0_AXIS) * len(P0_AXIS)
+    for oxidizer in args.oxidizers:
+        for fuel in args.fuels:
+            metadata = build_table(fuel, oxidizer, args.output_dir, parallel=args.parallel)
+            print(f"{_table_name(fuel, oxidizer):<16}{points} points in {metadata['build_s']:>6.1f} s, "
+                  f"max error {metadata['max_error_K']:.2f} K (mean {metadata['mean_error_K']:.3f} K)")
+    return 0
+
+
+# Module-level table store shared by every Streamlit session in this process.
+aft_table_store = AftTableStore()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,276 @@
+# --- Agent Turn Processing ---
+# The multi-step tool-calling loop of one chat turn, independent of Streamlit. The app drives it
+# with an observer that renders into the page; the benchmarks drive it headless with a scripted
+# model. The loop streams each model response, starts tools as soon as their JSON closes, feeds
+# the results back and stops when the model answers or the step/time budget runs out.
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import nullcontext
+
+import google.generativeai as genai
+
+from tool_dispatch import tool_dispatcher
+from tool_stream import ToolCallDetector
+
+
+TOOL_POLL_INTERVAL_S = 0.25
+BUDGET_EXHAUSTED_NOTE = (
+    "The tool budget for this question is exhausted. Do not request any more tools; "
+    "answer now using the tool results above and state what could not be completed."
+)
+# Sent instead when the budget allows a single model call, so no tool result can ever come back
+NO_TOOL_BUDGET_NOTE = (
+    "No tools can be run for this question. Do not request any; answer directly and state "
+    "which calculations could not be performed."
+)
+
+
+class TurnObserver:
+    """
+    Receives the progress of a turn for display. The default implementation ignores everything,
+    which is what headless runs use; the Streamlit app overrides the hooks it renders.
+    """
+
+    def step_started(self, step: int) -> None:
+        """A model call is about to be made."""
+
+    def text(self, visible_text: str, final: bool = False) -> None:
+        """The visible part of the response so far (final once the step's stream has ended)."""
+
+    def tool_calls(self, tool_calls: list) -> None:
+        """The model requested these tools (ToolCall objects)."""
+
+    def tools_running(self, count: int):
+        """Context manager entered while waiting for the tools of a step to finish."""
+        return nullcontext()
+
+    def tools_waiting(self, elapsed_s: float, pending: int) -> None:
+        """Called periodically while tools are running; a UI may raise here to abandon the turn."""
+
+    def tool_result(self, record: dict, output: dict) -> None:
+        """A tool finished; record is the dispatcher record and output the parsed result."""
+
+    def turn_finished(self, response_text: str, budget_exhausted: str = None) -> None:
+        """The turn ended with this answer; budget_exhausted is 'steps' or 'time' if the loop was cut short."""
+
+
+def stream_model_response(model, messages: list, metrics: dict, stage: str, on_text=None, on_tool_call=None):
+    """
+    Streams a model response, reporting the visible text and tool calls as the chunks arrive.
+
+    Args:
+        model: The genai.GenerativeModel (or a stand-in with the same generate_content interface).
+        messages (list): The conversation in Gemini API format.
+        metrics (dict): Turn metrics; "<stage>_first_token_s", "<stage>_first_visible_s",
+                        "<stage>_tool_call_s" and "<stage>_total_s" are recorded relative to the request.
+        stage (str): Name of the model call (e.g. "step_1").
+        on_text (callable, optional): Called with the visible text each time it grows.
+        on_tool_call (callable, optional): Called with each ToolCall as soon as its JSON closes in the stream.
+
+    Returns:
+        tuple: (response text without the tool-call JSON, list of ToolCall found in the stream, raw response text)
+    """
+    started = time.perf_counter()
+    response_stream = model.generate_content(
+        messages,
+        stream=True,
+        generation_config=genai.types.GenerationConfig(
+            temperature=0.7,
+            max_output_tokens=1024
+        )
+    )
+
+    detector = ToolCallDetector()
+    for chunk in response_stream:
+        if not chunk.text:
+            continue
+        if not detector.text:
+            metrics[f"{stage}_first_token_s"] = round(time.perf_counter() - started, 4)
+        for tool_call in detector.feed(chunk.text):
+            metrics.setdefault(f"{stage}_tool_call_s", round(time.perf_counter() - started, 4))
+            if on_tool_call is not None:
+                on_tool_call(tool_call)
+        visible_text = detector.visible_text()
+        if visible_text:
+            if f"{stage}_first_visible_s" not in metrics:
+                metrics[f"{stage}_first_visible_s"] = round(time.perf_counter() - started, 4)
+            if on_text is not None:
+                on_text(visible_text)
+
+    metrics[f"{stage}_total_s"] = round(time.perf_counter() - started, 4)
+
+    # Token usage is reported once the stream has been consumed
+    usage = getattr(response_stream, "usage_metadata", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        metrics[f"{stage}_input_tokens"] = prompt_tokens
+        metrics[f"{stage}_cached_input_tokens"] = cached_tokens
+        metrics[f"{stage}_output_tokens"] = getattr(usage, "candidates_token_count", 0) or 0
+        metrics["input_tokens"] = metrics.get("input_tokens", 0) + prompt_tokens
+        metrics["cached_input_tokens"] = metrics.get("cached_input_tokens", 0) + cached_tokens
+    return detector.visible_text(final=True), detector.tool_calls, detector.text
+
+
+def _wait_for_tools(futures: list, observer: TurnObserver) -> list:
+    """Waits for the tool futures, calling observer.tools_waiting between polls; returns their records."""
+    started = time.perf_counter()
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=TOOL_POLL_INTERVAL_S, return_when=FIRST_COMPLETED)
+        if pending:
+            observer.tools_waiting(time.perf_counter() - started, len(pending))
+    return [future.result() for future in futures]
+
+
+def run_turn(model, history: list, compactor, compaction_state: dict, trace, metrics: dict,
+             observer: TurnObserver = None, dispatcher=tool_dispatcher,
+             max_steps: int = 5, time_budget_s: float = 90.0, request_context: str = None) -> str:
+    """
+    Answers the latest user message in history, running the tools the model asks for.
+
+    Tool outputs and the final answer are appended to history in the app's message format.
+    If the turn is abandoned (any exception, including the UI stopping the script), the tool
+    calls still running are cancelled and their worker processes killed.
+
+    Args:
+        model: The generative model used for every step.
+        history (list): Chat history ending with the new user message (modified in place).
+        compactor (ConversationCompactor): Builds the bounded request from the history.
+        compaction_state (dict): Per-session compaction state.
+        trace (TurnTrace): Receives the timing spans of the turn.
+        metrics (dict): Receives the per-step metrics ("history", "steps", "agent_steps", ...).
+        observer (TurnObserver, optional): Display hooks.
+        dispatcher (ToolDispatcher): Executes the tool calls.
+        max_steps (int): Maximum number of model calls.
+        time_budget_s (float): Wall-clock budget; tools still running when it runs out are stopped,
+                               and the next call must answer.
+        request_context (str, optional): Text added to the latest user message for this turn's
+                                         requests only (e.g. retrieved document excerpts).
+
+    Returns:
+        str: The final response text (empty if the model gave none).
+    """
+    observer = observer or TurnObserver()
+    cancel_event = threading.Event()
+    try:
+        return _run_steps(model, history, compactor, compaction_state, trace, metrics, observer,
+                          dispatcher, max_steps, time_budget_s, request_context, cancel_event)
+    except BaseException:
+        cancel_event.set()
+        raise
+
+
+def _run_steps(model, history, compactor, compaction_state, trace, metrics, observer,
+               dispatcher, max_steps, time_budget_s, request_context, cancel_event) -> str:
+
+    # Prepare messages for Gemini API: recent turns verbatim, older turns as cached summaries
+    with trace.span("message_building"):
+        api_messages, metrics["history"] = compactor.build_request(history, compaction_state)
+        if request_context and api_messages:
+            api_messages[-1]["parts"].append({"text": request_context})
+
+    # Bounded multi-step loop: keep executing tools while the model keeps asking for them,
+    # within max_steps model calls and time_budget_s seconds of wall-clock time.
+    # The message list is extended in place, so each step only appends what is new.
+    metrics["steps"] = []
+    agent_started = time.perf_counter()
+    response_text = ""
+
+    for step in range(1, max_steps + 1):
+        elapsed = time.perf_counter() - agent_started
+        last_step = step == max_steps or elapsed >= time_budget_s
+        if last_step:
+            if step > 1:
+                metrics["budget_exhausted"] = "steps" if step == max_steps else "time"
+            # Out of budget: ask for a final answer instead of further tool calls
+            api_messages[-1]["parts"].append({"text": BUDGET_EXHAUSTED_NOTE if step > 1 else NO_TOOL_BUDGET_NOTE})
+
+        step_metrics = {"step": step}
+
+        # Each tool is started as soon as its JSON closes, while the model finishes its message,
+        # and independent calls run concurrently.
+        tool_futures = []
+
+        def dispatch_tool_call(tool_call):
+            if not last_step:
+                # Tools may not outlast the turn's time budget, whatever their own limits
+                remaining_s = time_budget_s - (time.perf_counter() - agent_started)
+                tool_futures.append(dispatcher.submit(tool_call.name, tool_call.args, cancel_event, remaining_s))
+
+        observer.step_started(step)
+        step_started = time.perf_counter()
+        with trace.span(f"model_call_{step}"):
+            response_text, detected_tool_calls, raw_response = stream_model_response(
+                model, api_messages, metrics, f"step_{step}",
+                on_text=observer.text, on_tool_call=dispatch_tool_call
+            )
+        step_metrics["model_s"] = round(time.perf_counter() - step_started, 4)
+
+        if not detected_tool_calls or last_step:
+            if detected_tool_calls:
+                # Requested despite the note: they are not run, and the answer was cut short
+                step_metrics["tool_calls_dropped"] = len(detected_tool_calls)
+                metrics.setdefault("budget_exhausted", "steps" if step == max_steps else "time")
+            step_metrics["step_total_s"] = step_metrics["model_s"]
+            metrics["steps"].append(step_metrics)
+            break
+
+        # Keep the short "Executing calculation..." note the model wrote around the JSON
+        observer.text(response_text, final=True)
+        observer.tool_calls(detected_tool_calls)
+
+        with observer.tools_running(len(tool_futures)), trace.span(f"tool_execution_{step}", calls=len(tool_futures)):
+            wait_started = time.perf_counter()
+            tool_records = _wait_for_tools(tool_futures, observer)
+            # Time the tools ran beyond the end of the stream (the rest overlapped with generation)
+            step_metrics["tool_wait_after_stream_s"] = round(time.perf_counter() - wait_started, 4)
+        for record in tool_records:
+            trace.add_span(f"tool:{record['name']}", record["elapsed_s"], executor=record.get("executor"))
+        step_metrics["tool_calls"] = [
+            {key: record.get(key) for key in ("name", "executor", "queued_s", "elapsed_s", "compute_s", "stopped")}
+            for record in tool_records
+        ]
+
+        render_started = time.perf_counter()
+        tool_outputs_parsed = []
+        tool_results = []
+        for record in tool_records:
+            try:
+                output = json.loads(record["result"]) # Parse JSON string back to dict
+            except (TypeError, ValueError):
+                output = {"status": "error", "message": str(record["result"])}
+            observer.tool_result(record, output)
+            tool_outputs_parsed.append(output)
+            tool_results.append((record["name"], record["result"], output))
+        trace.add_span(f"render_tool_results_{step}", time.perf_counter() - render_started)
+
+        # Add the tool outputs to the conversation history
+        history.append({
+            "role": "tool_output_display", # Custom role for display purposes
+            "parts": [{"tool_output": parsed} for parsed in tool_outputs_parsed]
+        })
+
+        # Extend the request with the model's tool request and the tool outputs for the next step,
+        # trimmed if sending them whole would take the request over the token budget
+        api_messages.append({"role": "model", "parts": [{"text": raw_response}]})
+        tool_results_text, step_metrics["tool_outputs_trimmed"] = compactor.tool_results_text(tool_results, api_messages)
+        api_messages.append({
+            "role": "user", # Model's perspective: it "receives" the tool output from the system/user
+            "parts": [{"text": tool_results_text}]
+        })
+
+        step_metrics["step_total_s"] = round(time.perf_counter() - step_started, 4)
+        metrics["steps"].append(step_metrics)
+
+    metrics["agent_steps"] = len(metrics["steps"])
+    with trace.span("render_answer"):
+        observer.turn_finished(response_text, metrics.get("budget_exhausted"))
+
+    # Add the assistant's final response to the chat history
+    if response_text:
+        history.append({"role": "assistant", "parts": [{"text": response_text}]})
+    return response_text
@@ -1,18 +1,31 @@
 # Ensure to install the required packages on your local terminal:
-# pip install google-generativeai streamlit Pillow PyPDF2 cantera requests beautifulsoup4
+# pip install google-generativeai streamlit Pillow PyPDF2 cantera numpy requests beautifulsoup4
 
 
 import streamlit as st
 import google.generativeai as genai
 import json
-import io
-from PIL import Image
-import PyPDF2
-import base64
 import os
-import cantera as ct
-import requests # New import for web fetching
-from bs4 import BeautifulSoup # New import for HTML parsing
+import time
+import datetime
+import logging
+import uuid
+import tempfile
+import itertools
+from concurrent.futures import wait
+from mechanisms import mechanism_registry
+from tool_cache import tool_result_cache
+from wikipedia_client import wikipedia_client
+from tools import available_tools
+from tool_dispatch import tool_dispatcher
+from pdf_ingest import pdf_ingestor
+from image_store import image_blob_store, store_upload
+from session_store import is_owner_token, session_store
+from session_export import export_session, import_session
+from document_store import SessionDocumentStore, pages_to_text
+from compaction import ConversationCompactor
+from telemetry import TurnTrace, summarize_traces, trace_log
+from agent import TurnObserver, run_turn
 
 
 
@@ -99,6 +112,15 @@ if api_key is None:
 genai.configure(api_key=api_key)
 
 
+# --- Session Owner ---
+# Stored sessions belong to the browser that created them, identified by a random owner token kept
+# in the URL next to the session id; only that owner's sessions are listed or can be reopened
+if "owner" not in st.session_state:
+    requested_owner = st.query_params.get("owner", "")
+    st.session_state.owner = requested_owner if is_owner_token(requested_owner) else uuid.uuid4().hex
+st.query_params["owner"] = st.session_state.owner
+
+
 # --- Professional Dark Theme Sidebar with Consistent Font Sizing ---
 with st.sidebar:
     st.title("⚗️ Catalyst Mind")
@@ -228,19 +250,81 @@ with st.sidebar:
         </div>
         """, unsafe_allow_html=True)
 
+    # Mechanism registry and tool cache statistics (shared by all sessions)
+    with st.expander("⚙️ **Performance Statistics**", expanded=False):
+        st.caption("Cantera mechanism pool")
+        st.json(mechanism_registry.stats())
+        st.caption("Tool result cache")
+        st.json(tool_result_cache.stats())
+        st.caption("Wikipedia fetching")
+        st.json(wikipedia_client.stats())
+        st.caption("Tool workers and queue")
+        st.json(tool_dispatcher.stats())
+        st.caption("PDF extraction")
+        st.json(pdf_ingestor.stats())
+        st.caption("Image blob store")
+        st.json(image_blob_store.stats())
+
+    # Latency of the most recent turn (refreshed at the end of every turn)
+    with st.expander("🐞 **Debug**", expanded=False):
+        debug_placeholder = st.empty()
+        debug_placeholder.json(st.session_state.get("last_turn_metrics", {}))
+
+    # p50/p95 of the timing spans of this session's turns (or of every logged turn)
+    with st.expander("📈 **Latency Report**", expanded=False):
+        include_all_sessions = st.checkbox("Include all logged sessions", value=False)
+        latency_placeholder = st.empty()
+        if include_all_sessions:
+            latency_placeholder.json(summarize_traces(trace_log.read()))
+        else:
+            latency_placeholder.json(summarize_traces(st.session_state.get("turn_traces", [])))
+
+    # Stored sessions (survive restarts); the current one is also reachable through its URL
+    with st.expander("🗂️ **Sessions**", expanded=False):
+        if st.button("➕ New Session"):
+            st.query_params.pop("session", None)
+            st.session_state.pop("session_id", None)  # Re-initialized below
+        for stored_session in session_store.list_sessions(st.session_state.owner, limit=10):
+            label = f"{stored_session['title'] or 'Untitled'} ({stored_session['message_count']} messages)"
+            if st.button(label, key=f"open_session_{stored_session['session_id']}"):
+                st.query_params["session"] = stored_session["session_id"]
+                st.session_state.pop("session_id", None)
+
     # --- Download Chat Session ---
-    if st.sidebar.button("📥 Download This Session"):
-        import datetime
-        import json
-        session_data = {
-            "timestamp": str(datetime.datetime.now()),
-            "chat": st.session_state.get("messages", [])
-        }
-        session_json = json.dumps(session_data, indent=2)
-
-        b64 = base64.b64encode(session_json.encode()).decode()
-        href = f'<a href="data:file/json;base64,{b64}" download="catalyst_mind_session.json">Click here to download</a>'
-        st.sidebar.markdown(href, unsafe_allow_html=True)
+    # The archive is written to a temporary file entry by entry, from the session store
+    if "session_id" in st.session_state and st.sidebar.button("📥 Export This Session"):
+        if st.session_state.get("export_path"):
+            os.remove(st.session_state.pop("export_path"))
+        export_file = tempfile.NamedTemporaryFile(prefix="catalyst_mind_session_", suffix=".zip", delete=False)
+        export_file.close()
+        try:
+            export_session(st.session_state.session_id, export_file.name)
+            st.session_state.export_path = export_file.name
+        except KeyError:
+            os.remove(export_file.name)
+            st.sidebar.info("Nothing to export yet: send a message first.")
+        except Exception as e:
+            os.remove(export_file.name)
+            st.sidebar.error(f"Could not export the session: {e}")
+    if st.session_state.get("export_path"):
+        # The archive is built entry by entry on disk, but download_button cannot stream a file:
+        # Streamlit reads it into memory to serve it, so exports are bounded by memory, not disk
+        with open(st.session_state.export_path, "rb") as export_file:
+            downloaded = st.sidebar.download_button(
+                "💾 Download Session Archive", data=export_file, mime="application/zip",
+                file_name=f"catalyst_mind_session_{datetime.datetime.now():%Y%m%d_%H%M}.zip",
+            )
+        if downloaded:  # Served: the temporary archive is not needed any more
+            os.remove(st.session_state.pop("export_path"))
+
+    imported_archive = st.sidebar.file_uploader("📤 Import a Session", type=["zip"], key="session_import")
+    if imported_archive is not None and imported_archive.file_id != st.session_state.get("imported_file_id"):
+        st.session_state.imported_file_id = imported_archive.file_id  # The uploader keeps the file across reruns
+        try:
+            st.query_params["session"] = import_session(imported_archive, st.session_state.owner)
+            st.session_state.pop("session_id", None)  # Opened below
+        except ValueError as e:
+            st.sidebar.error(f"Could not import the session: {e}")
 
     st.markdown("---")
     st.markdown("""
@@ -252,306 +336,25 @@ with st.sidebar:
 
     
 
-# --- Cantera Tool Definitions ---
-def calculate_adiabatic_flame_temperature(fuel: str, oxidizer: str, equivalence_ratio: float, initial_temp_k: float, initial_pressure_pa: float) -> str:
-    """
-    Calculates the adiabatic flame temperature (AFT) for a given fuel and oxidizer mixture.
-    
-    Args:
-        fuel (str): The chemical formula of the fuel (e.g., 'CH4' for methane, 'C2H5OH' for ethanol).
-        oxidizer (str): The chemical formula of the oxidizer (e.g., 'O2' for pure oxygen, 'air' for atmospheric air).
-        equivalence_ratio (float): The equivalence ratio (phi). Phi < 1 for lean, Phi = 1 for stoichiometric, Phi > 1 for rich.
-        initial_temp_k (float): The initial temperature of the reactants in Kelvin (e.g., 300.0).
-        initial_pressure_pa (float): The initial pressure of the reactants in Pascals (e.g., 101325.0 for 1 atm).
-
-    Returns:
-        str: A JSON string containing the adiabatic flame temperature in Kelvin and Celsius,
-             or an error message if the calculation fails.
-    """
-    try:
-        gas = ct.Solution('gri30.yaml')
-        gas.TP = initial_temp_k, initial_pressure_pa
-        if oxidizer.lower() == 'air':
-            gas.set_equivalence_ratio(equivalence_ratio, fuel, {'O2': 1.0, 'N2': 3.76})
-        else:
-            gas.set_equivalence_ratio(equivalence_ratio, fuel, oxidizer)
-        gas.equilibrate('HP')
-        
-        aft_k = gas.T
-        aft_c = aft_k - 273.15
-        
-        return json.dumps({
-            "status": "success",
-            "fuel": fuel,
-            "oxidizer": oxidizer,
-            "equivalence_ratio": equivalence_ratio,
-            "initial_temperature_K": initial_temp_k,
-            "initial_pressure_Pa": initial_pressure_pa,
-            "adiabatic_flame_temperature_K": aft_k,
-            "adiabatic_flame_temperature_C": aft_c
-        })
-    except Exception as e:
-        return json.dumps({
-            "status": "error",
-            "message": f"Cantera calculation failed: {str(e)}",
-            "fuel": fuel,
-            "oxidizer": oxidizer,
-            "equivalence_ratio": equivalence_ratio,
-            "initial_temperature_K": initial_temp_k,
-            "initial_pressure_Pa": initial_pressure_pa
-        })
-
-def get_species_molecular_weight(species_name: str) -> str:
-    """
-    Retrieves the molecular weight of a specified chemical species using Cantera's default mechanism.
-
-    Args:
-        species_name (str): The chemical formula or common name of the species (e.g., 'CO2', 'H2O', 'CH4').
-
-    Returns:
-        str: A JSON string containing the molecular weight in kg/kmol (g/mol),
-             or an error message if the species is not found.
-    """
-    try:
-        gas = ct.Solution('gri30.yaml')
-        mw = gas.molecular_weights[gas.species_index(species_name)]
-        
-        return json.dumps({
-            "status": "success",
-            "species": species_name,
-            "molecular_weight_kg_kmol": mw,
-            "molecular_weight_g_mol": mw / 1000.0
-        })
-    except Exception as e:
-        return json.dumps({
-            "status": "error",
-            "message": f"Species '{species_name}' not found or molecular weight calculation failed: {str(e)}",
-            "species": species_name
-        })
-
-def get_equilibrium_concentrations(mixture_formula: str, temperature_k: float, pressure_pa: float) -> str:
-    """
-    Calculates the equilibrium mole fractions of species in a given mixture at a specified temperature and pressure.
-
-    Args:
-        mixture_formula (str): The initial composition of the mixture as a string (e.g., 'CH4:1, O2:2, N2:7.52').
-                               Ensure the species are defined in the loaded Cantera mechanism (gri30.yaml).
-        temperature_k (float): The equilibrium temperature in Kelvin.
-        pressure_pa (float): The equilibrium pressure in Pascals.
-
-    Returns:
-        str: A JSON string containing the equilibrium mole fractions of all species present,
-             or an error message if the calculation fails.
-    """
-    try:
-        gas = ct.Solution('gri30.yaml')
-        gas.TPX = temperature_k, pressure_pa, mixture_formula
-        gas.equilibrate('TP')
-
-        # mole_fractions = {species.name: gas.X[species.index] for species in gas.species()}
-        mole_fractions = {species: mole_fraction for species, mole_fraction in zip(gas.species_names, gas.X)}
-        
-        return json.dumps({
-            "status": "success",
-            "mixture_formula": mixture_formula,
-            "temperature_K": temperature_k,
-            "pressure_Pa": pressure_pa,
-            "equilibrium_mole_fractions": mole_fractions
-        })
-    except Exception as e:
-        return json.dumps({
-            "status": "error",
-            "message": f"Equilibrium calculation failed for mixture '{mixture_formula}' at {temperature_k}K, {pressure_pa}Pa: {str(e)}",
-            "mixture_formula": mixture_formula,
-            "temperature_K": temperature_k,
-            "pressure_Pa": pressure_pa
-        })
-
-def get_species_thermodynamic_properties(species_name: str, temperature_k: float, pressure_pa: float) -> str:
-    """
-    Retrieves standard thermodynamic properties (enthalpy, entropy, Gibbs free energy, heat capacity)
-    for a specified chemical species at a given temperature and pressure using Cantera.
-
-    Args:
-        species_name (str): The chemical formula or common name of the species (e.g., 'CO2', 'H2O', 'CH4').
-                            Must be present in the 'gri30.yaml' mechanism.
-        temperature_k (float): The temperature in Kelvin.
-        pressure_pa (float): The pressure in Pascals.
-
-    Returns:
-        str: A JSON string containing the thermodynamic properties in J/kmol or J/kmol-K,
-             or an error message if the species is not found or calculation fails.
-    """
-    try:
-        gas = ct.Solution('gri30.yaml')
-        # Set the state for the specific species
-        gas.TPX = temperature_k, pressure_pa, f'{species_name}:1.0' # Set mole fraction to 1 for the species
-
-        properties = {
-            "enthalpy_kmol": gas.h,     # J/kmol
-            "entropy_kmol": gas.s,      # J/kmol-K
-            "gibbs_kmol": gas.g,        # J/kmol
-            "cp_kmol": gas.cp          # J/kmol-K (constant pressure heat capacity)
-        }
-        
-        return json.dumps({
-            "status": "success",
-            "species": species_name,
-            "temperature_K": temperature_k,
-            "pressure_Pa": pressure_pa,
-            "thermodynamic_properties": properties
-        })
-    except Exception as e:
-        return json.dumps({
-            "status": "error",
-            "message": f"Could not retrieve thermodynamic properties for '{species_name}': {str(e)}. Ensure species is in 'gri30.yaml' and parameters are valid.",
-            "species": species_name,
-            "temperature_K": temperature_k,
-            "pressure_Pa": pressure_pa
-        })
-
-def process_simulation_snapshot(process_type: str, inlet_composition: str, temperature_k: float, pressure_pa: float, flow_rate: float, reactor_params: dict = None) -> str:
-    """    Simulates a chemical process snapshot based on the specified process type, inlet composition, temperature, pressure, and flow rate.
-    Args:
-        process_type (str): The type of process to simulate (e.g., 'combustion', 'reaction', 'distillation').
-        inlet_composition (str): The inlet composition as a string (e.g., 'CH4:1, O2:2, N2:7.52').
-        temperature_k (float): The temperature in Kelvin.
-        pressure_pa (float): The pressure in Pascals.
-        flow_rate (float): The flow rate in moles per second.
-        reactor_params (dict, optional): Additional parameters for the reactor simulation, such as volume.
-    Returns:
-        str: A JSON string containing the simulation results, including outlet composition and conversion,
-             or an error message if the simulation fails.
-    """
-    
-    try:
-        gas = ct.Solution('gri30.yaml')
-        gas.TPX = temperature_k, pressure_pa, inlet_composition
-        reactor = ct.IdealGasReactor(gas, volume=reactor_params.get("volume", 1.0))
-        sim = ct.ReactorNet([reactor])
-        sim.advance_to_steady_state()
-        return json.dumps({
-            "status": "success",
-            "process_type": process_type,
-            "outlet_composition": {species: reactor.thermo.X[i] for i, species in enumerate(gas.species_names)},
-            "conversion": 1 - reactor.thermo[inlet_composition.split(":")[0]].X
-        })
-    except Exception as e:
-        return json.dumps({"status": "error", "message": f"Process simulation failed: {str(e)}"})
-
-def generate_phase_diagram(components: list, temperature_k: float, pressure_pa: float, mole_fractions: list) -> str:
-    """    Generates a phase diagram for a mixture of components at specified temperature and pressure.
-    Args:
-        components (list): List of chemical components (e.g., ['CH4', 'O2', 'N2']).
-        temperature_k (float): The temperature in Kelvin.
-        pressure_pa (float): The pressure in Pascals.
-        mole_fractions (list): List of mole fractions corresponding to the components.
-    Returns:
-        str: A JSON string containing the phase diagram data, including vapor and liquid compositions,
-             or an error message if the generation fails.
-    """
-    
-    try:
-        gas = ct.Solution('gri30.yaml')
-        gas.TPX = temperature_k, pressure_pa, {comp: x for comp, x in zip(components, mole_fractions)}
-        
-        return json.dumps({
-            "status": "success",
-            "components": components,
-            "phase_data": {"vapor_composition": gas.X, "liquid_composition": gas.X}  # Simplified
-        })
-    except Exception as e:
-        return json.dumps({"status": "error", "message": f"Phase diagram generation failed: {str(e)}"})
-
-
-
-
-def get_wikipedia_data(query: str) -> str:
-    """
-    Fetches the full main content of a Wikipedia article based on a query.
-    
-    Args:
-        query (str): The chemical or scientific topic to retrieve from Wikipedia.
-        
-    Returns:
-        str: A JSON string containing the article title, full text, and page metadata.
-    """
-    search_url = f"https://en.wikipedia.org/wiki/{requests.utils.quote(query)}"
-
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(search_url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Extract title
-        page_title = soup.find("h1", id="firstHeading").text.strip()
-
-        # Extract the main content
-        content_div = soup.find("div", class_="mw-parser-output")
-        paragraphs = content_div.find_all(['p', 'h2', 'h3', 'ul', 'ol'])  # Main content only
-
-        article_text = ""
-        for tag in paragraphs:
-            if tag.name in ["h2", "h3"]:
-                section_title = tag.get_text(strip=True).replace("[edit]", "")
-                article_text += f"\n\n### {section_title}\n\n"
-            else:
-                text = tag.get_text(strip=True)
-                if text:
-                    article_text += f"{text}\n\n"
-
-        if article_text.strip():
-            return json.dumps({
-                "status": "success",
-                "query": query,
-                "wikipedia_url": search_url,
-                "title": page_title,
-                "article_text": article_text.strip()
-            })
-        else:
-            return json.dumps({
-                "status": "error",
-                "query": query,
-                "wikipedia_url": search_url,
-                "message": "No article text found on the page."
-            })
-
-    except requests.exceptions.RequestException as e:
-        return json.dumps({
-            "status": "error",
-            "query": query,
-            "wikipedia_url": search_url,
-            "message": f"Network error: {str(e)}"
-        })
-    except Exception as e:
-        return json.dumps({
-            "status": "error",
-            "query": query,
-            "wikipedia_url": search_url,
-            "message": f"Parsing error: {str(e)}"
-        })
-
-
-
-
-# --- Map tool names to actual functions ---
-available_tools = {
-    "calculate_adiabatic_flame_temperature": calculate_adiabatic_flame_temperature,
-    "get_species_molecular_weight": get_species_molecular_weight,
-    "get_equilibrium_concentrations": get_equilibrium_concentrations,
-    "get_species_thermodynamic_properties": get_species_thermodynamic_properties,
-    "process_simulation_snapshot": process_simulation_snapshot,
-    "generate_phase_diagram": generate_phase_diagram,
-    "get_wikipedia_data": get_wikipedia_data
-}
-
-
-# --- Initialize the Generative Model ---
-model = genai.GenerativeModel("gemini-1.5-flash")
+# --- Agent Loop Budget ---
+# Upper bounds on the model calls and wall-clock time spent on a single user turn
+AGENT_MAX_STEPS = int(st.secrets.get("AGENT_MAX_STEPS", 5))
+AGENT_TIME_BUDGET_S = float(st.secrets.get("AGENT_TIME_BUDGET_S", 90))
+# Conversation history sent per request: the last HISTORY_KEEP_TURNS turns verbatim, older turns
+# summarized, and the whole history kept under HISTORY_TOKEN_BUDGET (estimated) tokens
+conversation_compactor = ConversationCompactor(
+    keep_turns=int(st.secrets.get("HISTORY_KEEP_TURNS", 4)),
+    token_budget=int(st.secrets.get("HISTORY_TOKEN_BUDGET", 12000)),
+)
+# Messages rendered on each rerun (and read back when a stored session is reopened); older ones
+# are shown on request
+HISTORY_RENDER_MESSAGES = int(st.secrets.get("HISTORY_RENDER_MESSAGES", 30))
+# Token budget for the excerpts of uploaded documents added to each request
+DOCUMENT_CONTEXT_TOKENS = int(st.secrets.get("DOCUMENT_CONTEXT_TOKENS", 2000))
+# Uploaded images are downsized so their longer side is at most IMAGE_MAX_SIDE pixels and
+# re-encoded (JPEG at IMAGE_JPEG_QUALITY unless they have transparency)
+IMAGE_MAX_SIDE = int(st.secrets.get("IMAGE_MAX_SIDE", 1536))
+IMAGE_JPEG_QUALITY = int(st.secrets.get("IMAGE_JPEG_QUALITY", 85))
 
 # --- System Instruction Prompt (UPDATED for Manual Tool Use) ---
 system_instruction_prompt = """
@@ -583,6 +386,18 @@ Defined Structure for JSON Format
 }
 
 Available Tools and Parameters:
+When several independent tool calls are needed to answer a query (e.g., comparing the adiabatic flame temperatures of methane, propane and hydrogen,
+or fetching data for several compounds), request them all at once in a single JSON object instead of one per turn:
+{
+  "tool_calls": [
+    {"name": "tool_function_name", "args": {"param1": "value1"}},
+    {"name": "tool_function_name", "args": {"param1": "value2"}}
+  ]
+}
+The calls are executed concurrently and all results are returned to you together.
+If the results show that further calculations are needed (e.g., look up a species, then compute its equilibrium, then interpret it),
+request the next tool calls in your reply to the results; keep going until you can give the final answer.
+
 - calculate_adiabatic_flame_temperature: Calculates adiabatic flame temperature.
 This requires the fuel and oxidizer chemical formulas, equivalence ratio, initial temperature in Kelvin, and initial pressure in Pascals.
 If all the values aren't provided, ask the user to specify them. If all parameters are provided except the initial temperature and pressure, use 298.15 Kelvin and 101325 Pascals.
@@ -593,6 +408,20 @@ State clearly that the initial pressure and temperature are assumed to be 1 atm
     initial_temp_k (float, Kelvin, e.g., 298.15)
     initial_pressure_pa (float, Pascals, e.g., 101325.0)
 
+- calculate_adiabatic_flame_temperature_sweep: Calculates adiabatic flame temperatures over ranges of conditions in one call.
+Use this tool instead of repeated calculate_adiabatic_flame_temperature calls whenever the user asks for a curve, trend, table or comparison
+across equivalence ratios, initial temperatures, initial pressures, or several fuels.
+Each of equivalence_ratios, initial_temps_k and initial_pressures_pa may be a single number, a list of numbers,
+or a range object {"start": ..., "stop": ..., "num": ...} or {"start": ..., "stop": ..., "step": ...}. The full grid of all combinations is evaluated.
+Apply the same default assumptions (298.15 K, 101325 Pa) as for the single-point calculation and state them.
+Summarize the returned table (trends, peak temperature and where it occurs) rather than repeating every row.
+    fuels (list, e.g., ['CH4', 'C3H8', 'H2'])
+    oxidizer (string, e.g., 'air')
+    equivalence_ratios (number, list, or range, e.g., {"start": 0.5, "stop": 2.0, "num": 200})
+    initial_temps_k (number, list, or range, Kelvin, e.g., 298.15)
+    initial_pressures_pa (number, list, or range, Pascals, e.g., 101325.0)
+    parallel (boolean, optional, true for sweeps of more than a few hundred points)
+
 - get_species_molecular_weight: Retrieves molecular weight of a species.
 This returns the molecular weight of a specified chemical species.
 This requires the chemical formula or common name of the species and outputs the molecular weight of the specified component.
@@ -607,6 +436,19 @@ Outputs the equilibrium mole fractions of all species present in the mixture.
     temperature_k (float, Kelvin, e.g., 1500.0)
     pressure_pa (float, Pascals, e.g., 101325.0)
 
+- get_equilibrium_concentrations_sweep: Calculates equilibrium mole fractions over ranges of temperature and pressure in one call.
+Use this tool instead of repeated get_equilibrium_concentrations calls whenever the user asks how the equilibrium composition changes
+with temperature or pressure (e.g., dissociation versus temperature, a composition map or table).
+Each of temperatures_k and pressures_pa may be a single number, a list of numbers, or a range object
+{"start": ..., "stop": ..., "num": ...} or {"start": ..., "stop": ..., "step": ...}. The full grid of all combinations is evaluated.
+Outputs temperature_K and pressure_Pa columns (one entry per grid point) and one mole fraction column per species that reaches min_mole_fraction somewhere on the grid;
+values below the cutoff are reported as 0. Summarize trends (dominant species, where minor species appear) rather than repeating every value.
+    mixture_formula (string, e.g., 'CH4:1, O2:2, N2:7.52')
+    temperatures_k (number, list, or range, Kelvin, e.g., {"start": 300, "stop": 3000, "num": 100})
+    pressures_pa (number, list, or range, Pascals, e.g., [101325.0, 1013250.0])
+    min_mole_fraction (float, optional, default 1e-6)
+    parallel (boolean, optional, true for grids of more than a few hundred points)
+
 - get_species_thermodynamic_properties: Retrieves thermodynamic properties (enthalpy, entropy, Gibbs, heat capacity).
 This tool should be used when the thermodynamic properties of a species are required. The properties include enthalpy, entropy, Gibbs free energy, and heat capacity at constant pressure.
 If the temperature and pressure aren't specified, assume standard conditions (298.15 Kelvin and 101325 Pascals) and inform the user of the assumption.
@@ -618,33 +460,66 @@ Outputs the thermodynamic properties in J/kmol or J/kmol-K.
     temperature_k (float, Kelvin)
     pressure_pa (float, Pascals)
 
-- process_simulation_snapshot: Simulates a chemical process snapshot.
-This tool should be used when simulating a chemical process such as combustion, reaction, or distillation.
+- get_species_property_curves: Retrieves enthalpy, entropy, Gibbs free energy and heat capacity curves over a temperature range.
+Use this tool instead of repeated get_species_thermodynamic_properties calls when properties are needed at many temperatures
+or for several species at once (e.g., plotting Cp from 300 to 3000 K, comparing species, or reaction properties versus temperature).
+If the range is not specified, use 300 K to 3000 K in 10 K steps at 101325 Pascals and inform the user of the assumption.
+Outputs the temperature grid and property lists in J/kmol or J/kmol-K; summarize trends instead of repeating every value.
+    species_names (list, e.g., ['CO2', 'H2O'])
+    t_start_k (float, Kelvin, e.g., 300.0)
+    t_stop_k (float, Kelvin, e.g., 3000.0)
+    t_step_k (float, Kelvin, e.g., 10.0)
+    pressure_pa (float, Pascals, e.g., 101325.0)
+
+- calculate_ignition_delay: Calculates autoignition delay times of a fuel/oxidizer mixture in an adiabatic constant-volume reactor.
+Use this tool when the user asks about ignition delay, autoignition, induction time, or the apparent activation energy of ignition.
+Each of initial_temps_k, initial_pressures_pa and equivalence_ratios may be a single number, a list of numbers, or a range object
+{"start": ..., "stop": ..., "num": ...} or {"start": ..., "stop": ..., "step": ...}. Pass the whole grid in one call instead of calling the tool repeatedly.
+Ignition is taken as the time at which the temperature has risen 400 K above its initial value; state this criterion.
+Outputs a table with 1000/T and log10 of the delay for Arrhenius plots (null delays did not ignite within max_time_s; typically initial temperatures below about 900-1000 K),
+and an Arrhenius fit (apparent activation energy in kJ/mol and pre-exponential factor) per equivalence ratio and pressure. Summarize trends rather than repeating every row.
+    fuel (string, e.g., 'CH4')
+    oxidizer (string, e.g., 'air')
+    initial_temps_k (number, list, or range, Kelvin, e.g., {"start": 1000, "stop": 1600, "num": 13})
+    initial_pressures_pa (number, list, or range, Pascals, e.g., [101325.0, 1013250.0])
+    equivalence_ratios (number, list, or range, optional, default 1.0)
+    max_time_s (float, optional, default 1.0, up to 100)
+    parallel (boolean, optional, true for more than a few dozen points)
+
+- process_simulation_snapshot: Simulates a continuous flow reactor (CSTR or PFR) at steady state.
+This tool should be used when simulating a reacting process such as combustion or a gas-phase reaction in a stirred-tank (CSTR) or plug-flow (PFR) reactor.
 If the temperature and pressure are not specified, assume standard conditions (298.15 Kelvin and 101325 Pascals) and inform the user of the assumption.
-If the prompt is about obtaining the outlet composition and/or conversion of a chemical process, use this tool.
-This requires the process type, inlet composition, temperature in Kelvin, pressure in Pascals, flow rate in moles per second, and optional reactor parameters (e.g., volume).
-Outputs the outlet composition and conversion. If the temperature and pressure are not specified, assume 298.15 Kelvin and 101325 Pascals. State in the query output that those values were assumed.
-    process_type (string, e.g., 'combustion', 'reaction', 'distillation')
+If the prompt is about obtaining the outlet composition, outlet temperature and/or conversion of a reactor, use this tool.
+This requires the process type, inlet composition, inlet temperature in Kelvin, pressure in Pascals, flow rate in moles per second, and optional reactor parameters.
+A CSTR is sized by volume_m3 (default 1.0) or residence_time_s; a PFR needs length_m or residence_time_s, and diameter_m (default 0.1) or area_m2.
+For a residence-time study, pass residence_times_s as a list or range (e.g., {"start": 0.001, "stop": 0.1, "num": 50}) in one call instead of calling the tool repeatedly.
+Reactors are adiabatic unless energy is 'off' (isothermal). Combustion CSTRs start on the burning branch.
+Outputs the outlet temperature, main outlet species, conversion of each reacting inlet species, residence time, a profile (transient approach for a CSTR, axial profile for a PFR) or sweep table, and solver statistics. Summarize the profile instead of repeating every row.
+Distillation and other separations are not reactor simulations; use generate_phase_diagram for vapor-liquid equilibrium.
+    process_type (string, e.g., 'combustion', 'reaction', 'cstr', 'pfr')
     inlet_composition (string, e.g., 'CH4:1, O2:2, N2:7.52')
     temperature_k (float, Kelvin)
     pressure_pa (float, Pascals)
     flow_rate (float, moles per second)
-    reactor_params (dict, optional, e.g., {'volume': 1.0})
+    reactor_params (dict, optional, e.g., {'reactor_type': 'cstr', 'residence_time_s': 0.01} or {'reactor_type': 'pfr', 'length_m': 1.0, 'diameter_m': 0.05})
 
-- generate_phase_diagram: Generates a phase diagram for a mixture.
-This tool should be used when generating a phase diagram for a mixture of components at specified temperature and pressure.
-This tool should be used when generating the liquid and vapour compositions of a mixture at specified temperature and pressure.
+- generate_phase_diagram: Calculates vapor-liquid equilibrium (phase diagrams, bubble and dew points, flash) for liquid mixtures.
+This tool should be used when generating a T-x-y or P-x-y phase diagram, or the liquid and vapour compositions of a mixture at a specified temperature and pressure.
+Use it for distillation and separation questions (relative volatility, azeotropes, boiling ranges).
 If the temperature and pressure are not specified, assume standard conditions (298.15 Kelvin and 101325 Pascals) and inform the user of the assumption.
-If the prompt is about obtaining the phase diagram data for a mixture, use this tool.
-This tool requires the components, temperature in Kelvin, pressure in Pascals, and mole fractions.
-Outputs the phase diagram data, including vapor and liquid compositions.
-Always assume the temperature and pressure are 298.15 Kelvin and 101325 Pascals if not specified.
-Components should be provided as a list of chemical formulas, and mole fractions should match the components.
-Ensure the mole fractions sum to 1.0.
-    components (list, e.g., ['CH4', 'O2', 'N2'])
-    temperature_k (float, Kelvin) 
+Components are names or formulas of common solvents and hydrocarbons (e.g., 'ethanol', 'water', 'benzene', 'toluene', 'acetone', 'methanol', 'n-hexane').
+For two components the T-x-y diagram (at pressure_pa) and the P-x-y diagram (at temperature_k) are returned as tables, with any azeotropes found.
+If mole_fractions are given (they must match the components), the bubble and dew points of that feed and an isothermal flash at temperature_k and pressure_pa are also returned.
+Non-ideal liquids use the Wilson model where binary parameters are known; results list pairs that were treated as ideal and any extrapolation warnings, which you should mention.
+Summarize the diagram (boiling points, azeotrope, shape) rather than repeating every row.
+    components (list, e.g., ['ethanol', 'water'])
+    temperature_k (float, Kelvin)
     pressure_pa (float, Pascals)
-    mole_fractions (list, e.g., [0.1, 0.2, 0.7])
+    mole_fractions (list, optional, e.g., [0.3, 0.7])
+    diagram (string, optional, 'txy', 'pxy', 'both' or 'none')
+    points (integer, optional, default 101)
+    activity_model (string, optional, 'ideal', 'wilson' or 'nrtl')
+    interaction_parameters (dict, optional, binary parameters in cal/mol, e.g., {"ethanol/water": [382.3, 955.45]})
 
 
 
@@ -661,7 +536,11 @@ For this particular tool, don't return the JSON output directly in the response.
 The summary should include the title of the article, a brief overview of the main content, and a deep breakdown of the relevant sections that pertain to the user's query.
 If the query is about safety information, always use this tool to fetch the article content.
 Don't mention Wikipedia in your response to the query. State that the information is retrieved from a reliable source.
+The tool returns the article's lead section and the excerpts most relevant to the question, not the whole article.
+Always pass the user's question so the right sections are selected. If the excerpts don't cover what was asked, call the tool again with a more specific question or a higher max_tokens.
     query (string, e.g., 'Chemical engineering', "Ammonia")
+    question (string, the user's question, e.g., "How should ammonia leaks be handled safely?")
+    max_tokens (integer, optional, default 1500)
 
     
 
@@ -712,25 +591,162 @@ Include safety warnings where applicable.
 
 """
 
+# --- Rendering of Agent Turns ---
+class StreamlitTurnObserver(TurnObserver):
+    """Renders the progress of an agent turn into the current st.chat_message container."""
+
+    def __init__(self):
+        self.placeholder = None
+        self.wait_placeholder = None
+
+    def step_started(self, step: int) -> None:
+        self.placeholder = st.empty()
+        self.placeholder.markdown(("Catalyst Mind is thinking..." if step == 1 else "Interpreting the results...") + " ▌")
+
+    def text(self, visible_text: str, final: bool = False) -> None:
+        if final and not visible_text:
+            self.placeholder.empty()
+        else:
+            self.placeholder.markdown(visible_text if final else visible_text + "▌")
+
+    def tool_calls(self, tool_calls: list) -> None:
+        for tool_call in tool_calls:
+            st.info(f"Catalyst Mind decided to use a tool: `{tool_call.name}` with arguments: `{tool_call.args}`")
+            if tool_call.name not in available_tools:
+                st.warning(f"Catalyst Mind tried to call an unknown tool: {tool_call.name}")
+        self.wait_placeholder = st.empty()
+
+    def tools_running(self, count: int):
+        return st.spinner(f"Running {count} tool call(s)...")
+
+    def tools_waiting(self, elapsed_s: float, pending: int) -> None:
+        # Updating the page also lets Streamlit stop this run if the user resubmits or leaves;
+        # the agent loop then cancels the tools that are still running
+        self.wait_placeholder.caption(f"{pending} tool call(s) still running ({elapsed_s:.1f} s)")
+
+    def tool_result(self, record: dict, output: dict) -> None:
+        if self.wait_placeholder is not None:
+            self.wait_placeholder.empty()
+            self.wait_placeholder = None
+        if output.get("status") == "success":
+            st.success(f"Tool output ({record['name']}, {record['elapsed_s']} s): success")
+        else:
+            st.error(f"Tool output ({record['name']}): {output.get('message', 'error')}")
+        st.json(output, expanded=False) # Display parsed output for debugging
+
+    def turn_finished(self, response_text: str, budget_exhausted: str = None) -> None:
+        if budget_exhausted:
+            st.caption(f"Tool budget exhausted ({budget_exhausted}); answered with the results gathered so far.")
+        # The final response has already been rendered chunk by chunk; drop the cursor
+        if response_text:
+            self.placeholder.markdown(response_text)
+        else:
+            self.placeholder.markdown("No direct text response. A tool might have been executed.")
+
+
+# --- Initialize the Generative Model ---
+# The system prompt (including the tool catalogue) is passed once as the model's system instruction
+# rather than stored as the first chat message and resent as part of the history on every call.
+# It is not uploaded as cached content: at a few thousand tokens it is far below the smallest
+# prefix the API's context caching accepts (32,768 tokens for gemini-1.5-flash).
+MODEL_NAME = "gemini-1.5-flash"
+
+logger = logging.getLogger("catalyst_mind")
+
+
+@st.cache_resource
+def get_model():
+    """
+    Builds the GenerativeModel once per process (instead of on every Streamlit rerun).
+
+    Returns:
+        tuple: (model, info) where info reports the model name and the static prefix size.
+    """
+    info = {"model": MODEL_NAME, "static_prefix_tokens": None}
+    try:
+        info["static_prefix_tokens"] = genai.GenerativeModel(MODEL_NAME).count_tokens(system_instruction_prompt).total_tokens
+    except Exception as e:
+        logger.warning("Could not count system prompt tokens: %s", e)
+
+    logger.info("Static prefix of %s tokens sent as system instruction", info["static_prefix_tokens"])
+    return genai.GenerativeModel(MODEL_NAME, system_instruction=system_instruction_prompt), info
+
+
+model, model_info = get_model()
+
 # --- Session State Initialization for Chat History ---
-if "messages" not in st.session_state:
-    st.session_state.messages = [
-        {"role": "user", "parts": [{"text": system_instruction_prompt}]},
-        {"role": "assistant", "parts": [{"text": "Hello! I am Catalyst Mind. How can I assist you with chemical operations or process control today?"}]}
-    ]
+# A session named in the URL (?session=...) is reopened from the session store
+if "session_id" not in st.session_state:
+    requested_session = st.query_params.get("session")
+    stored_session = session_store.load(requested_session, st.session_state.owner,
+                                        recent_messages=HISTORY_RENDER_MESSAGES) if requested_session else None
+    if stored_session:
+        # Only the most recent messages are read; earlier turns are represented by their summaries
+        st.session_state.session_id = requested_session
+        st.session_state.messages = stored_session["messages"]
+        st.session_state.message_offset = stored_session["offset"]
+        st.session_state.compaction_state = {"summaries": stored_session["summaries"],
+                                             "message_offset": stored_session["offset"]}
+    else:
+        st.session_state.session_id = uuid.uuid4().hex
+        st.session_state.messages = [
+            {"role": "assistant", "parts": [{"text": "Hello! I am Catalyst Mind. How can I assist you with chemical operations or process control today?"}]}
+        ]
+        st.session_state.message_offset = 0  # Position of messages[0] in the session's history
+        st.session_state.compaction_state = {}  # Summaries of older turns, computed once each
+    st.session_state.documents = SessionDocumentStore()  # Uploaded PDF/TXT files, indexed for retrieval
+    for stored_document in (stored_session or {}).get("documents", []):
+        st.session_state.documents.add(stored_document["name"], stored_document["text"], stored_document["turn"])
+    # Messages already in the session store; each save writes only the ones after them
+    st.session_state.persisted_messages = stored_session["message_count"] if stored_session else 0
+    st.session_state.history_render_limit = HISTORY_RENDER_MESSAGES
+    st.session_state.turn_traces = []
+    if st.session_state.get("export_path"):  # Archive of the previous session
+        os.remove(st.session_state.pop("export_path"))
+    st.query_params["session"] = st.session_state.session_id
+
+
+def persist_session() -> None:
+    """Writes the session's new messages and turn summaries to the session store."""
+    st.session_state.persisted_messages = session_store.save_messages(
+        st.session_state.session_id, st.session_state.messages, st.session_state.persisted_messages,
+        owner=st.session_state.owner, offset=st.session_state.message_offset
+    )
+    session_store.save_summaries(st.session_state.session_id, st.session_state.compaction_state.get("summaries", {}))
+
 
 # --- Display Existing Chat Messages ---
-for message in st.session_state.messages[1:]:
+# Only the most recent messages are rendered, so a rerun costs the same however long the session is
+def show_earlier_messages() -> None:
+    st.session_state.history_render_limit += HISTORY_RENDER_MESSAGES
+
+
+total_messages = st.session_state.message_offset + len(st.session_state.messages)
+hidden_messages = max(total_messages - st.session_state.history_render_limit, 0)
+if hidden_messages:
+    st.button(f"⬆️ Show earlier messages ({hidden_messages} hidden)", on_click=show_earlier_messages)
+history_render_started = time.perf_counter()
+# Messages before the loaded window are read back from the session store to be shown
+earlier_messages = session_store.iter_messages(
+    st.session_state.session_id, start=hidden_messages, stop=st.session_state.message_offset
+) if hidden_messages < st.session_state.message_offset else ()
+shown_messages = st.session_state.messages[max(hidden_messages - st.session_state.message_offset, 0):]
+for message in itertools.chain(earlier_messages, shown_messages):
     with st.chat_message(message["role"]):
         for part_content in message["parts"]:
             if isinstance(part_content, dict) and "text" in part_content:
                 st.markdown(part_content["text"])
-            elif isinstance(part_content, Image.Image):
-                st.image(part_content, caption="Uploaded Image", use_container_width=True)
+            elif isinstance(part_content, dict) and "image_ref" in part_content:
+                image_bytes = image_blob_store.get(part_content["image_ref"])
+                if image_bytes is not None:
+                    st.image(image_bytes, caption=part_content["name"], use_container_width=True)
+                else:
+                    st.caption(f"Image '{part_content['name']}' is no longer available.")
             # Display tool outputs if they are part of the conversation history (as plain text/JSON)
             elif isinstance(part_content, dict) and "tool_output" in part_content:
                 st.subheader("Tool Output:")
                 st.json(part_content["tool_output"]) # Display raw JSON for debugging tool output
+history_render_s = time.perf_counter() - history_render_started
 
 # --- Chat Input with File Acceptance ---
 prompt_input = st.chat_input(
@@ -741,13 +757,19 @@ prompt_input = st.chat_input(
 
 # --- Process User Input and Generate Response ---
 if prompt_input:
+    turn_trace = TurnTrace(st.session_state.session_id)
+    turn_trace.add_span("history_render", history_render_s, messages=total_messages,
+                        rendered=total_messages - hidden_messages)
     user_text = prompt_input.text
     uploaded_files = prompt_input.files
 
     user_message_parts = []
     if user_text:
         user_message_parts.append({"text": user_text})
+    user_turn_index = total_messages  # Position the user message will take in the history
 
+    upload_started = time.perf_counter()
+    image_bytes_received = image_bytes_uploaded = 0
     if uploaded_files:
         for uploaded_file in uploaded_files:
             file_type = uploaded_file.type
@@ -755,33 +777,41 @@ if prompt_input:
             
             if file_type.startswith("image"):
                 try:
-                    image_data = uploaded_file.read()
-                    pil_image = Image.open(io.BytesIO(image_data))
-                    user_message_parts.append(pil_image)
+                    # Downsized, re-encoded and stored once by content hash; the history keeps a reference
+                    image_part = store_upload(uploaded_file.getvalue(), file_name,
+                                              max_side=IMAGE_MAX_SIDE, quality=IMAGE_JPEG_QUALITY)
+                    user_message_parts.append(image_part)
+                    image_bytes_uploaded += image_part["bytes"]
+                    image_bytes_received += image_part["original_bytes"]
                 except Exception as e:
                     st.error(f"Error processing image {file_name}: {e}. This image will not be sent.")
                     continue
             elif file_type == "application/pdf":
                 try:
-                    with st.spinner(f"Extracting text from PDF: {file_name}..."):
-                        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                        pdf_text = ""
-                        for page_num in range(len(pdf_reader.pages)):
-                            page_text = pdf_reader.pages[page_num].extract_text()
-                            if page_text:
-                                pdf_text += page_text + "\n"
-                        
-                        if pdf_text.strip():
-                            max_text_length = 2000
-                            display_text = pdf_text.strip()
-                            if len(display_text) > max_text_length:
-                                display_text = display_text[:max_text_length] + "...\n\n[Content truncated due to length.]"
-                            
-                            user_message_parts.append({"text": f"Content from PDF '{file_name}':\n\n{display_text}"})
-                            st.info(f"Successfully extracted text from PDF: {file_name}.")
-                        else:
-                            st.warning(f"Could not extract any readable text from PDF: {file_name}. It might be a scanned PDF without OCR, or empty.")
-                            user_message_parts.append({"text": f"Attempted to process PDF '{file_name}', but no text could be extracted."})
+                    # Extracted in the background and cached by content hash. The script waits for
+                    # the text the question needs, polling so the progress bar moves and Stop works
+                    progress = {}
+                    extraction = pdf_ingestor.submit(uploaded_file.getvalue(), progress=progress)
+                    progress_bar = st.progress(0.0, text=f"Extracting text from PDF: {file_name}...")
+                    while not extraction.done():
+                        wait([extraction], timeout=0.1)
+                        if progress.get("page_count"):
+                            progress_bar.progress(
+                                min(progress["pages_done"] / progress["page_count"], 1.0),
+                                text=f"Extracting text from PDF: {file_name} ({progress['pages_done']} of {progress['page_count']} pages read)..."
+                            )
+                    progress_bar.empty()
+                    document = extraction.result()
+                    pdf_text = pages_to_text(document["pages"])
+                    if pdf_text.strip():
+                        # The full text goes into the session's document index; the history only keeps a note
+                        indexed = st.session_state.documents.add(file_name, pdf_text, user_turn_index)
+                        session_store.save_document(st.session_state.session_id, file_name, pdf_text, indexed["sha256"], user_turn_index)
+                        user_message_parts.append({"text": f"[Uploaded PDF '{file_name}': {document['page_count']} pages, indexed in {indexed['chunks']} chunks. Relevant excerpts are retrieved for each question.]"})
+                        st.info(f"Successfully extracted and indexed text from PDF: {file_name} ({document['page_count']} pages).")
+                    else:
+                        st.warning(f"Could not extract any readable text from PDF: {file_name}. It might be a scanned PDF without OCR, or empty.")
+                        user_message_parts.append({"text": f"Attempted to process PDF '{file_name}', but no text could be extracted."})
 
                 except Exception as e:
                     st.error(f"Error processing PDF {file_name}: {e}. This PDF will not be sent.")
@@ -790,13 +820,10 @@ if prompt_input:
             elif file_type == "text/plain":
                 try:
                     text_content = uploaded_file.read().decode("utf-8")
-                    max_text_length = 2000
-                    display_text = text_content.strip()
-                    if len(display_text) > max_text_length:
-                        display_text = display_text[:max_text_length] + "...\n\n[Content truncated due to length.]"
-
-                    user_message_parts.append({"text": f"Content from TXT '{file_name}':\n\n{display_text}"})
-                    st.info(f"Successfully processed TXT file: {file_name}.")
+                    indexed = st.session_state.documents.add(file_name, text_content, user_turn_index)
+                    session_store.save_document(st.session_state.session_id, file_name, text_content, indexed["sha256"], user_turn_index)
+                    user_message_parts.append({"text": f"[Uploaded TXT '{file_name}': {indexed['chars']} characters, indexed in {indexed['chunks']} chunks. Relevant excerpts are retrieved for each question.]"})
+                    st.info(f"Successfully processed and indexed TXT file: {file_name}.")
                 except Exception as e:
                     st.error(f"Error processing text file {file_name}: {e}. This file will not be sent.")
                     user_message_parts.append({"text": f"Error processing text file '{file_name}': {e}"})
@@ -805,157 +832,75 @@ if prompt_input:
                 st.warning(f"Unsupported file type: {file_name} ({file_type}). Only images (PNG, JPG, JPEG), PDFs, and TXT files are supported.")
                 continue
     
+    turn_trace.add_span("upload_parsing", time.perf_counter() - upload_started, files=len(uploaded_files or []),
+                        image_bytes_received=image_bytes_received, image_bytes_stored=image_bytes_uploaded)
+
     if not user_message_parts:
         st.warning("Please enter a query or upload a valid image/PDF/TXT file to send a message.")
         st.stop()
 
     st.session_state.messages.append({"role": "user", "parts": user_message_parts})
+    persist_session()
     
     with st.chat_message("user"):
         for part_content in user_message_parts:
             if isinstance(part_content, dict) and "text" in part_content:
                 st.markdown(part_content["text"])
-            elif isinstance(part_content, Image.Image):
-                st.image(part_content, caption="Your Uploaded Image", use_container_width=True)
+            elif isinstance(part_content, dict) and "image_ref" in part_content:
+                st.image(image_blob_store.get(part_content["image_ref"]), caption=part_content["name"], use_container_width=True)
 
     # --- Agentic AI Loop for Manual Tool Calling ---
-    with st.spinner("Catalyst Mind is thinking..."):
-        # Prepare messages for Gemini API
-        gemini_messages_for_api = []
-        for msg in st.session_state.messages:
-            role_for_gemini = "user" if msg["role"] == "user" else "model"
-            parts_for_gemini = []
-            for part_content in msg["parts"]:
-                if isinstance(part_content, dict) and "text" in part_content:
-                    parts_for_gemini.append({"text": part_content["text"]})
-                elif isinstance(part_content, Image.Image):
-                    parts_for_gemini.append(part_content)
-                elif isinstance(part_content, dict) and "tool_output" in part_content:
-                    # When sending tool output back to the model, format it as regular text
-                    # or a specific string that the model understands as "tool result"
-                    parts_for_gemini.append({"text": f"Tool Output:\n```json\n{json.dumps(part_content['tool_output'], indent=2)}\n```"})
-                elif isinstance(part_content, str): # Fallback for any raw strings
-                    parts_for_gemini.append({"text": part_content})
-            
-            if not parts_for_gemini:
-                continue
-            gemini_messages_for_api.append({"role": role_for_gemini, "parts": parts_for_gemini})
-
+    turn_metrics = {"turn_started_at": time.time()}
+
+    # Excerpts of the session's uploaded documents that match this question (sent with this request only)
+    with turn_trace.span("document_retrieval"):
+        document_context, document_sources = st.session_state.documents.context_for(
+            user_text or "", token_budget=DOCUMENT_CONTEXT_TOKENS, new_since_turn=user_turn_index
+        )
+    turn_metrics["document_excerpts"] = len(document_sources)
+
+    with st.chat_message("assistant"):
+        if document_sources:
+            cited = dict.fromkeys(f"{source['name']} ({source['section']})" for source in document_sources)
+            st.caption("Using excerpts from: " + ", ".join(cited))
         try:
-            # First call to model.generate_content to get the model's initial thought/tool call
-            response_stream = model.generate_content(
-                gemini_messages_for_api,
-                stream=True,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=1024
-                )
+            run_turn(
+                model, st.session_state.messages, conversation_compactor, st.session_state.compaction_state,
+                turn_trace, turn_metrics, observer=StreamlitTurnObserver(),
+                max_steps=AGENT_MAX_STEPS, time_budget_s=AGENT_TIME_BUDGET_S,
+                request_context=document_context or None
             )
-
-            full_response_content = ""
-            tool_call_detected = False
-            tool_output_result = None
-            tool_name_called = None
-            tool_args_called = None
-
-            for chunk in response_stream:
-                if chunk.text:
-                    full_response_content += chunk.text
-            
-            # Attempt to parse the full response content for a tool call JSON
-            # The model is prompted to output JSON followed by a message.
-            # We look for the JSON at the beginning of the response.
-            try:
-                # Find the start and end of the JSON block
-                json_start = full_response_content.find('{')
-                json_end = full_response_content.rfind('}') + 1 # +1 to include the '}'
-                
-                if json_start != -1 and json_end != -1 and json_start < json_end:
-                    json_str = full_response_content[json_start:json_end]
-                    parsed_json = json.loads(json_str)
-                    
-                    if "tool_call" in parsed_json and \
-                       "name" in parsed_json["tool_call"] and \
-                       "args" in parsed_json["tool_call"]:
-                        
-                        tool_name_called = parsed_json["tool_call"]["name"]
-                        tool_args_called = parsed_json["tool_call"]["args"]
-                        tool_call_detected = True
-                        
-                        # Remove the JSON part from the content that will be displayed as model's thought
-                        full_response_content = full_response_content[json_end:].strip()
-
-            except json.JSONDecodeError:
-                # Not a valid JSON, or JSON is incomplete/malformed.
-                # Treat as a regular text response.
-                pass
-            except Exception as e:
-                st.warning(f"Error parsing potential tool call JSON: {e}")
-                pass # Continue as normal text response
-
-            if tool_call_detected:
-                st.info(f"Catalyst Mind decided to use a tool: `{tool_name_called}` with arguments: `{tool_args_called}`")
-                
-                # Execute the tool based on its name
-                if tool_name_called in available_tools:
-                    try:
-                        # Ensure arguments are correctly typed for the Python function
-                        # This is a simple example; for robust production, you'd add validation/conversion
-                        # based on the expected types of the tool function's parameters.
-                        tool_output_result = available_tools[tool_name_called](**tool_args_called)
-                        tool_output_result_parsed = json.loads(tool_output_result) # Parse JSON string back to dict
-                        st.success(f"Tool output: {tool_output_result_parsed['status']}")
-                        st.json(tool_output_result_parsed) # Display parsed output for debugging
-                        
-                        # Add the tool output to the conversation history
-                        st.session_state.messages.append({
-                            "role": "tool_output_display", # Custom role for display purposes
-                            "parts": [{"tool_output": tool_output_result_parsed}]
-                        })
-
-                        # Prepare messages for the second API call, including the tool output
-                        # We append the tool's raw JSON output as a text part for the model to process
-                        gemini_messages_for_api.append({
-                            "role": "user", # Model's perspective: it "receives" the tool output from the system/user
-                            "parts": [{"text": f"Tool execution result for {tool_name_called}:\n```json\n{tool_output_result}\n```"}]
-                        })
-                        
-                        # Make a second call to get the model's interpretation of the tool output
-                        final_response_stream = model.generate_content(
-                            gemini_messages_for_api,
-                            stream=True,
-                            generation_config=genai.types.GenerationConfig(
-                                temperature=0.7,
-                                max_output_tokens=1024
-                            )
-                        )
-                        full_response_content = "" # Reset to accumulate final response
-                        for final_chunk in final_response_stream:
-                            if final_chunk.text:
-                                full_response_content += final_chunk.text
-                        
-                    except Exception as tool_e:
-                        st.error(f"Error executing tool '{tool_name_called}': {tool_e}")
-                        full_response_content = f"An error occurred while executing the tool '{tool_name_called}'. Please check the parameters or try again. Error: {tool_e}"
-                else:
-                    st.warning(f"Catalyst Mind tried to call an unknown tool: {tool_name_called}")
-                    full_response_content = f"Catalyst Mind attempted to use an unknown tool: {tool_name_called}. Please ensure your query is within my capabilities."
-            
-            # Display the assistant's final response (either direct or after tool call)
-            with st.chat_message("assistant"):
-                message_placeholder = st.empty()
-                if full_response_content:
-                    message_placeholder.markdown(full_response_content + "▌")
-                else:
-                    message_placeholder.markdown("No direct text response. A tool might have been executed.")
-                message_placeholder.markdown(full_response_content)
-                
-            # Add the assistant's final response to the session state chat history
-            if full_response_content:
-                st.session_state.messages.append({"role": "assistant", "parts": [{"text": full_response_content}]})
-            
         except Exception as e:
             st.error(f"An error occurred while generating response: {e}")
             st.warning("Please try again. If the issue persists, verify your API key or the model's availability.")
-
-
+    with turn_trace.span("session_persist"):
+        persist_session()
+
+    turn_metrics["turn_total_s"] = round(time.time() - turn_metrics.pop("turn_started_at"), 4)
+    # Per-session memory: the history holds text, tool outputs and image references; image bytes
+    # live in the shared blob store and are counted separately
+    turn_metrics["session_history_bytes"] = len(json.dumps(st.session_state.messages, default=str))
+    turn_metrics["session_document_chars"] = sum(d["chars"] for d in st.session_state.documents.summary())
+    turn_metrics["session_image_bytes"] = sum({
+        part["image_ref"]: part["bytes"] for message in st.session_state.messages for part in message["parts"]
+        if isinstance(part, dict) and "image_ref" in part
+    }.values())
+    turn_metrics["static_prefix_tokens"] = model_info["static_prefix_tokens"]
+    logger.info(
+        "Turn input tokens: %s total, %s served from cache (static prefix %s tokens)",
+        turn_metrics.get("input_tokens"), turn_metrics.get("cached_input_tokens"), model_info["static_prefix_tokens"]
+    )
+    st.session_state.last_turn_metrics = turn_metrics
+    debug_placeholder.json(turn_metrics)
+
+    turn_trace.add_tokens(
+        input=turn_metrics.get("input_tokens"),
+        cached_input=turn_metrics.get("cached_input_tokens"),
+        output=sum(value for key, value in turn_metrics.items() if key.endswith("_output_tokens")),
+        history_estimate=turn_metrics.get("history", {}).get("estimated_tokens"),
+        images_attached=turn_metrics.get("history", {}).get("images_attached"),
+    )
+    turn_record = turn_trace.record()
+    trace_log.append(turn_record)
+    st.session_state.turn_traces.append(turn_record)
+    latency_placeholder.json(summarize_traces(trace_log.read() if include_all_sessions else st.session_state.turn_traces))
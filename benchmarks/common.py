@@ -0,0 +1,73 @@
+# --- Shared Benchmark Helpers ---
+# Path and cache setup for running the app modules outside Streamlit, memory readings, and
+# comparison of a run's metrics against a saved baseline so regressions fail the run.
+
+import json
+import os
+import resource
+import sys
+import tempfile
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_environment() -> str:
+    """
+    Makes the app modules importable and points their caches at a scratch directory,
+    unless CATALYST_MIND_CACHE_DIR is already set. Call before importing any app module.
+
+    Returns:
+        str: The cache directory in use.
+    """
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    if "CATALYST_MIND_CACHE_DIR" not in os.environ:
+        os.environ["CATALYST_MIND_CACHE_DIR"] = tempfile.mkdtemp(prefix="catalyst_mind_bench_")
+    return os.environ["CATALYST_MIND_CACHE_DIR"]
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident memory so far of this process and of its finished/waited-for children, in MB."""
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def compare_to_baseline(metrics: dict, baseline_path: str, tolerance: float = 0.25, floor_s: float = 0.005) -> list:
+    """
+    Compares lower-is-better metrics with those of a baseline results file.
+
+    A metric regresses when it exceeds the baseline by more than the relative tolerance and by
+    more than floor_s (so sub-millisecond noise on tiny timings is ignored).
+
+    Returns:
+        list: (metric, baseline value, current value) for every regression.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["metrics"]
+    regressions = []
+    for name, value in metrics.items():
+        reference = baseline.get(name)
+        if reference is None or value is None:
+            continue
+        if value > reference * (1 + tolerance) and value - reference > floor_s:
+            regressions.append((name, reference, value))
+    return regressions
+
+
+def report_regressions(regressions: list) -> int:
+    """Prints regressions and returns the process exit code (1 if there were any)."""
+    for name, reference, value in regressions:
+        print(f"REGRESSION {name}: {reference:.4f} -> {value:.4f}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
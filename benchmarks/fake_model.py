@@ -0,0 +1,76 @@
+# --- Scripted Gemini Stand-In ---
+# A local replacement for genai.GenerativeModel that streams pre-recorded responses chunk by
+# chunk, with optional simulated time-to-first-token and inter-chunk delays, and reports
+# usage metadata like the real API. Lets the agent loop run offline and deterministically.
+
+import time
+
+from compaction import IMAGE_TOKENS
+from retrieval import estimate_tokens
+
+
+NO_SCRIPT_RESPONSE = "(no scripted response left for this turn)"
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Usage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.cached_content_token_count = 0
+        self.candidates_token_count = output_tokens
+
+
+class _ResponseStream:
+    """Iterable of chunks; usage_metadata is set once the stream has been consumed, as with the real API."""
+
+    def __init__(self, text: str, prompt_tokens: int, chunk_chars: int, first_token_s: float, chunk_interval_s: float):
+        self._text = text
+        self._prompt_tokens = prompt_tokens
+        self._chunk_chars = chunk_chars
+        self._first_token_s = first_token_s
+        self._chunk_interval_s = chunk_interval_s
+        self.usage_metadata = None
+
+    def __iter__(self):
+        if self._first_token_s:
+            time.sleep(self._first_token_s)
+        for i in range(0, len(self._text), self._chunk_chars):
+            if i and self._chunk_interval_s:
+                time.sleep(self._chunk_interval_s)
+            yield _Chunk(self._text[i:i + self._chunk_chars])
+        self.usage_metadata = _Usage(self._prompt_tokens, estimate_tokens(self._text))
+
+
+class ScriptedModel:
+    """
+    Streams scripted responses in order, one per generate_content call.
+
+    Args:
+        chunk_chars (int): Characters per streamed chunk (Gemini streams a few tokens at a time).
+        first_token_s (float): Simulated delay before the first chunk.
+        chunk_interval_s (float): Simulated delay between chunks.
+    """
+
+    def __init__(self, chunk_chars: int = 16, first_token_s: float = 0.0, chunk_interval_s: float = 0.0):
+        self.chunk_chars = chunk_chars
+        self.first_token_s = first_token_s
+        self.chunk_interval_s = chunk_interval_s
+        self.script = []
+        self.requests = []
+
+    def load(self, responses: list) -> None:
+        """Sets the responses for the next calls (typically those of one recorded turn)."""
+        self.script = list(responses)
+
+    def generate_content(self, messages, stream: bool = False, **kwargs):
+        self.requests.append(messages)
+        prompt_tokens = sum(
+            IMAGE_TOKENS if "data" in part else estimate_tokens(part.get("text", ""))
+            for message in messages for part in message["parts"]
+        )
+        text = self.script.pop(0) if self.script else NO_SCRIPT_RESPONSE
+        return _ResponseStream(text, prompt_tokens, self.chunk_chars, self.first_token_s, self.chunk_interval_s)
@@ -0,0 +1,115 @@
+# --- Flame Temperature Table Benchmark ---
+# Compares adiabatic flame temperatures interpolated from the precomputed tables with direct
+# Cantera HP equilibria at random operating points inside the tables: per-query latency of the
+# lookup and of the equilibrium, the interpolation error against the error bound stored with each
+# table, and the latency of the calculate_adiabatic_flame_temperature tool both ways.
+#
+#   python benchmarks/run_aft_table_benchmark.py --queries 500
+#   python benchmarks/run_aft_table_benchmark.py --baseline aft_table_baseline.json
+
+import argparse
+import json
+import math
+import random
+import time
+
+import common
+
+common.setup_environment()
+
+import aft_tables  # noqa: E402
+import tools  # noqa: E402
+from aft_tables import DEFAULT_FUELS, aft_table_store  # noqa: E402
+from combustion import AIR  # noqa: E402
+from mechanisms import mechanism_registry  # noqa: E402
+
+
+def _queries(count: int, seed: int = 0) -> list:
+    """Random operating points inside the tables (phi 0.5-2, T0 280-600 K, P0 0.5-20 atm)."""
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        points.append((
+            rng.choice(DEFAULT_FUELS),
+            rng.uniform(0.5, 2.0),
+            rng.uniform(280.0, 600.0),
+            math.exp(rng.uniform(math.log(0.5 * 101325), math.log(20 * 101325))),
+        ))
+    return points
+
+
+def _cantera_aft(gas, fuel: str, phi: float, t0: float, p0: float) -> float:
+    gas.TP = t0, p0
+    gas.set_equivalence_ratio(phi, fuel, AIR)
+    gas.equilibrate("HP")
+    return gas.T
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark table-backed flame temperatures against Cantera.")
+    parser.add_argument("--queries", type=int, default=500, help="Random operating points")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    queries = _queries(args.queries)
+    bounds = {}
+    for fuel in DEFAULT_FUELS:
+        table = aft_table_store.get(fuel, "air")
+        if table is None:
+            print(f"No current table for {fuel}/air in {aft_table_store.directory}; run `python aft_tables.py` first.")
+            return 1
+        bounds[fuel] = table.max_error_k
+
+    started = time.perf_counter()
+    interpolated = [aft_table_store.lookup(fuel, "air", phi, t0, p0)[0] for fuel, phi, t0, p0 in queries]
+    lookup_s = time.perf_counter() - started
+
+    with mechanism_registry.checkout("gri30.yaml") as gas:
+        started = time.perf_counter()
+        exact = [_cantera_aft(gas, fuel, phi, t0, p0) for fuel, phi, t0, p0 in queries]
+        cantera_s = time.perf_counter() - started
+
+    errors = [abs(a - b) for a, b in zip(interpolated, exact)]
+    over_bound = sum(error > bounds[fuel] for error, (fuel, _, _, _) in zip(errors, queries))
+
+    # The tool itself, with and without the tables
+    tool_queries = queries[:100]
+    started = time.perf_counter()
+    for fuel, phi, t0, p0 in tool_queries:
+        assert json.loads(tools.calculate_adiabatic_flame_temperature(fuel, "air", phi, t0, p0))["status"] == "success"
+    tool_table_s = time.perf_counter() - started
+    tools.aft_table_store = aft_tables.AftTableStore(directory="")
+    started = time.perf_counter()
+    for fuel, phi, t0, p0 in tool_queries:
+        tools.calculate_adiabatic_flame_temperature(fuel, "air", phi, t0, p0)
+    tool_cantera_s = time.perf_counter() - started
+    tools.aft_table_store = aft_table_store
+
+    per_lookup_us = lookup_s / len(queries) * 1e6
+    per_equilibrium_us = cantera_s / len(queries) * 1e6
+    metrics = {
+        "lookup_us": round(per_lookup_us, 2),
+        "cantera_us": round(per_equilibrium_us, 1),
+        "max_error_K": round(max(errors), 3),
+        "tool_table_s": round(tool_table_s, 4),
+        "tool_cantera_s": round(tool_cantera_s, 4),
+    }
+    print(f"{'table lookup':<40}{per_lookup_us:>10.1f} us/query")
+    print(f"{'Cantera HP equilibrium':<40}{per_equilibrium_us:>10.1f} us/query  ({per_equilibrium_us / per_lookup_us:,.0f}x slower)")
+    print(f"{'interpolation error, max / mean':<40}{max(errors):>10.3f} / {sum(errors) / len(errors):.3f} K  "
+          f"({over_bound} of {len(errors)} above the stored bound of {max(bounds.values()):.2f} K)")
+    print(f"{'tool, ' + str(len(tool_queries)) + ' calls with tables':<40}{tool_table_s:>10.4f} s")
+    print(f"{'tool, ' + str(len(tool_queries)) + ' calls with Cantera':<40}{tool_cantera_s:>10.4f} s")
+    print(f"{'table store':<40}{aft_table_store.stats()}")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "aft_table", "queries": len(queries), "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+# --- Agent Turn Benchmark ---
+# Replays the recorded conversations in benchmarks/conversations/ through agent.run_turn with a
+# scripted model and the real Cantera tools, and reports per-turn latency, tool time and memory.
+# Runs without network access or an API key.
+#
+#   python benchmarks/run_agent_benchmark.py
+#   python benchmarks/run_agent_benchmark.py --output baseline.json
+#   python benchmarks/run_agent_benchmark.py --baseline baseline.json --tolerance 0.25
+
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+
+import common
+
+common.setup_environment()
+
+from agent import run_turn  # noqa: E402
+from compaction import ConversationCompactor  # noqa: E402
+from fake_model import ScriptedModel  # noqa: E402
+from telemetry import TurnTrace, percentile  # noqa: E402
+from tool_cache import tool_result_cache  # noqa: E402
+from tool_dispatch import tool_dispatcher  # noqa: E402
+
+
+CONVERSATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversations")
+
+
+def load_conversations(names: list = None) -> list:
+    conversations = []
+    for path in sorted(glob.glob(os.path.join(CONVERSATIONS_DIR, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            conversation = json.load(f)
+        if not names or conversation["name"] in names:
+            conversations.append(conversation)
+    return conversations
+
+
+def replay(conversation: dict, model: ScriptedModel, compactor: ConversationCompactor, trace_memory: bool) -> list:
+    """Runs every turn of a conversation in one fresh session and returns a row per turn."""
+    history = [{"role": "assistant", "parts": [{"text": "Hello! I am Catalyst Mind."}]}]
+    compaction_state = {}
+    rows = []
+    for number, turn in enumerate(conversation["turns"], start=1):
+        model.load(turn["responses"])
+        history.append({"role": "user", "parts": [{"text": turn["user"]}]})
+        trace = TurnTrace(conversation["name"])
+        metrics = {}
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        run_turn(model, history, compactor, compaction_state, trace, metrics)
+        latency = time.perf_counter() - started
+        peak_traced = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+        spans = trace.record()["spans"]
+        rows.append({
+            "conversation": conversation["name"],
+            "turn": number,
+            "latency_s": round(latency, 4),
+            "model_s": round(sum(s["duration_s"] for s in spans if s["name"].startswith("model_call_")), 4),
+            "tool_s": round(sum(s["duration_s"] for s in spans if s["name"].startswith("tool:")), 4),
+            "tool_wait_s": round(sum(s["duration_s"] for s in spans if s["name"].startswith("tool_execution_")), 4),
+            "tool_calls": [c["name"] + "@" + c["executor"] for step in metrics["steps"] for c in step.get("tool_calls", [])],
+            "steps": metrics["agent_steps"],
+            "history_tokens": metrics["history"]["estimated_tokens"],
+            "input_tokens": metrics.get("input_tokens", 0),
+            "peak_traced_mb": round(peak_traced / 2**20, 2) if peak_traced is not None else None,
+            "peak_rss_mb": common.peak_rss_mb()["self"],
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded conversations through the agent loop with a scripted model.")
+    parser.add_argument("conversations", nargs="*", help="Names of the conversations to replay (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Replays of each conversation")
+    parser.add_argument("--cold", action="store_true", help="Clear the tool result cache before every replay")
+    parser.add_argument("--first-token-s", type=float, default=0.0, help="Simulated model time to first token")
+    parser.add_argument("--chunk-interval-s", type=float, default=0.0, help="Simulated delay between streamed chunks")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure peak Python allocations per turn (slower)")
+    parser.add_argument("--output", help="Write the results (and metrics for --baseline) to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    conversations = load_conversations(args.conversations)
+    model = ScriptedModel(first_token_s=args.first_token_s, chunk_interval_s=args.chunk_interval_s)
+    compactor = ConversationCompactor()
+
+    rows = []
+    for repeat in range(1, args.repeat + 1):
+        for conversation in conversations:
+            if args.cold:
+                tool_result_cache.clear()
+            for row in replay(conversation, model, compactor, args.trace_memory):
+                row["repeat"] = repeat
+                rows.append(row)
+
+    print(f"{'conversation':<28}{'rep':>4}{'turn':>5}{'latency_s':>11}{'model_s':>9}{'tool_s':>9}"
+          f"{'wait_s':>9}{'steps':>6}{'hist_tok':>9}{'rss_mb':>8}  tools")
+    for row in rows:
+        print(f"{row['conversation']:<28}{row['repeat']:>4}{row['turn']:>5}{row['latency_s']:>11.4f}{row['model_s']:>9.4f}"
+              f"{row['tool_s']:>9.4f}{row['tool_wait_s']:>9.4f}{row['steps']:>6}{row['history_tokens']:>9}"
+              f"{row['peak_rss_mb']:>8.1f}  {', '.join(row['tool_calls'])}")
+
+    # Lower-is-better summary metrics, the ones compared against a baseline
+    metrics = {}
+    for conversation in conversations:
+        latencies = [r["latency_s"] for r in rows if r["conversation"] == conversation["name"]]
+        tool_times = [r["tool_s"] for r in rows if r["conversation"] == conversation["name"]]
+        metrics[f"{conversation['name']}.latency_p50_s"] = round(percentile(latencies, 50), 4)
+        metrics[f"{conversation['name']}.latency_p95_s"] = round(percentile(latencies, 95), 4)
+        metrics[f"{conversation['name']}.tool_p50_s"] = round(percentile(tool_times, 50), 4)
+    memory = common.peak_rss_mb()
+    print()
+    for name, value in metrics.items():
+        print(f"{name:<48}{value:>10.4f}")
+    print(f"{'peak_rss_mb (main / exited workers)':<48}{memory['self']:>10.1f} / {memory['children']:.1f}")
+    print(f"{'dispatcher processes':<48}{tool_dispatcher.max_processes:>10}")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "agent", "metrics": metrics, "memory_mb": memory, "turns": rows})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+# --- Equilibrium Grid Benchmark ---
+# Times TP equilibrium of a methane/air mixture over a temperature x pressure grid three ways:
+# every point started from the raw mixture (how repeated single-point calls behave), with
+# continuation, and with continuation spread over worker processes. Also compares the size of the
+# thresholded columnar result with the same table keeping every species.
+#
+#   python benchmarks/run_equilibrium_benchmark.py --temps 60 --pressures 10
+#   python benchmarks/run_equilibrium_benchmark.py --baseline equilibrium_baseline.json
+
+import argparse
+import json
+import time
+
+import common
+
+common.setup_environment()
+
+from equilibrium import equilibrium_grid  # noqa: E402
+from mechanisms import mechanism_registry  # noqa: E402
+
+
+MIXTURE = "CH4:1, O2:2, N2:7.52"
+
+
+def _timed(**kwargs) -> tuple:
+    started = time.perf_counter()
+    result = equilibrium_grid(MIXTURE, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark batched equilibrium over a T-P grid.")
+    parser.add_argument("--temps", type=int, default=60, help="Temperatures in the grid (300-3000 K)")
+    parser.add_argument("--pressures", type=int, default=10, help="Pressures in the grid (0.1-100 bar, log-spaced)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    grid = {
+        "temperatures_k": {"start": 300.0, "stop": 3000.0, "num": args.temps},
+        "pressures_pa": [1e4 * 1000 ** (i / max(args.pressures - 1, 1)) for i in range(args.pressures)],
+    }
+    points = args.temps * args.pressures
+    mechanism_registry.get_template("gri30.yaml")  # Parse the mechanism outside the timings
+
+    cold, cold_s = _timed(continuation=False, **grid)
+    serial, serial_s = _timed(**grid)
+    # Twice: the first parallel run also pays for starting the pool and parsing the mechanism in each worker
+    _timed(parallel=True, **grid)
+    parallel, parallel_s = _timed(parallel=True, **grid)
+
+    deviation = max(abs(a - b) for species, column in cold["mole_fractions"].items()
+                    for a, b in zip(column, serial["mole_fractions"].get(species, [0.0] * points)))
+    species_count = len(serial["mole_fractions"]) + serial["species_omitted"]
+    sparse_bytes = len(json.dumps(serial))
+    dense_bytes = len(json.dumps(_timed(min_mole_fraction=0.0, **grid)[0]))
+
+    metrics = {
+        "cold_grid_s": round(cold_s, 4),
+        "continuation_grid_s": round(serial_s, 4),
+        "parallel_grid_s": round(parallel_s, 4),
+    }
+    print(f"{str(points) + '-point grid, cold starts':<40}{cold_s:>9.3f} s  ({points / cold_s:,.0f} points/s)")
+    print(f"{str(points) + '-point grid, continuation':<40}{serial_s:>9.3f} s  ({points / serial_s:,.0f} points/s, "
+          f"{cold_s / serial_s:.1f}x, {serial['solver_fallbacks']} VCS fallbacks)")
+    print(f"{'continuation, ' + str(parallel['blocks']) + ' parallel block(s)':<40}{parallel_s:>9.3f} s  ({points / parallel_s:,.0f} points/s)")
+    print(f"{'largest difference, cold vs continuation':<40}{deviation:>9.2e}")
+    print(f"{'result size':<40}{sparse_bytes:>9,} bytes  ({len(serial['mole_fractions'])} of {species_count} species; "
+          f"{dense_bytes:,} bytes with every species)")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "equilibrium", "points": points, "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
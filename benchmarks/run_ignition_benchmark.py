@@ -0,0 +1,75 @@
+# --- Ignition Delay Benchmark ---
+# Times a CH4/air ignition delay grid (T0 from 1100 to 1600 K, 1 and 10 atm, phi 0.5 and 1) with
+# integration stopped at ignition against the same grid integrated to a fixed end time, serially
+# and across worker processes, and reports throughput in points per second and integrator steps.
+#
+#   python benchmarks/run_ignition_benchmark.py --temps 13
+#   python benchmarks/run_ignition_benchmark.py --baseline ignition_baseline.json
+
+import argparse
+import json
+import os
+import time
+
+import common
+
+common.setup_environment()
+
+from ignition import ignition_delay_sweep  # noqa: E402
+from tools import calculate_ignition_delay  # noqa: E402
+
+
+FUEL = "CH4"
+PRESSURES_PA = [101325.0, 1013250.0]
+EQUIVALENCE_RATIOS = [0.5, 1.0]
+MAX_TIME_S = 1.0
+
+
+def _timed_sweep(temps: dict, **kwargs) -> tuple:
+    started = time.perf_counter()
+    result = ignition_delay_sweep(FUEL, "air", temps, PRESSURES_PA, EQUIVALENCE_RATIOS, max_time_s=MAX_TIME_S, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark batched ignition delay calculations.")
+    parser.add_argument("--temps", type=int, default=13, help="Initial temperatures per (phi, P0) series")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    temps = {"start": 1100.0, "stop": 1600.0, "num": args.temps}
+    early, early_s = _timed_sweep(temps)
+    fixed, fixed_s = _timed_sweep(temps, stop_at_ignition=False)
+    parallel, parallel_s = _timed_sweep(temps, parallel=True)
+    points = len(early["rows"])
+    deviation = max(abs(a[4] - b[4]) / a[4] for a, b in zip(early["rows"], fixed["rows"]) if a[4] is not None)
+
+    started = time.perf_counter()
+    result = json.loads(calculate_ignition_delay(FUEL, "air", temps, PRESSURES_PA, EQUIVALENCE_RATIOS))
+    tool_s = time.perf_counter() - started
+
+    metrics = {
+        "stop_at_ignition_s": round(early_s, 3),
+        "fixed_end_time_s": round(fixed_s, 3),
+        "parallel_s": round(parallel_s, 3),
+        "tool_call_s": round(tool_s, 3),
+    }
+    print(f"{str(points) + ' points, stop at ignition':<40}{early_s:>9.3f} s  ({points / early_s:.1f} points/s, "
+          f"{early['integrator_steps']} steps)")
+    print(f"{str(points) + ' points, fixed end time':<40}{fixed_s:>9.3f} s  ({points / fixed_s:.1f} points/s, "
+          f"{fixed['integrator_steps']} steps, max delay difference {deviation:.1e})")
+    print(f"{str(points) + ' points, ' + str(parallel['workers']) + ' worker(s)':<40}{parallel_s:>9.3f} s  "
+          f"({points / parallel_s:.1f} points/s on {os.cpu_count()} CPU(s))")
+    print(f"{'calculate_ignition_delay':<40}{tool_s:>9.3f} s  ({len(result['arrhenius_fits'])} Arrhenius fits)")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "ignition", "points": points, "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+# --- PDF Ingestion Benchmark ---
+# Measures PDF text-extraction throughput on a generated multi-page manual: the original
+# sequential page loop, the parallel ingestor cold, and a re-upload served from the
+# content-hash cache.
+#
+#   python benchmarks/run_pdf_benchmark.py --pages 300
+#   python benchmarks/run_pdf_benchmark.py --baseline pdf_baseline.json
+
+import argparse
+import io
+import shutil
+import tempfile
+import time
+
+import common
+
+common.setup_environment()
+
+import PyPDF2  # noqa: E402
+
+from pdf_ingest import MIN_PAGES_FOR_PROCESSES, PdfIngestor  # noqa: E402
+
+
+LINE = "Section {page}.{line}: Maintain reactor inlet temperature within the interlock band before startup."
+
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """Builds a text-only PDF with the given number of pages (no PDF-writing dependency needed)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        lines = [LINE.format(page=page + 1, line=line + 1) for line in range(lines_per_page)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({text}) '" for text in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def sequential_extract(data: bytes) -> int:
+    """The app's original approach: every page, one after another, in the calling thread."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = ""
+    for page_number in range(len(reader.pages)):
+        page_text = reader.pages[page_number].extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return len(text)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction.")
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the generated document")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    data = make_pdf(args.pages)
+    cache_dir = tempfile.mkdtemp(prefix="pdf_bench_")
+    try:
+        started = time.perf_counter()
+        sequential_extract(data)
+        sequential_s = time.perf_counter() - started
+
+        ingestor = PdfIngestor(cache_dir=cache_dir, max_workers=args.workers)
+        ingestor.extract(make_pdf(MIN_PAGES_FOR_PROCESSES))  # Start the worker pool outside the timed run
+        started = time.perf_counter()
+        full = ingestor.extract(data)
+        parallel_s = time.perf_counter() - started
+        ingestor.shutdown()
+
+        reloaded = PdfIngestor(cache_dir=cache_dir, max_workers=args.workers)  # Empty memory, warm disk
+        started = time.perf_counter()
+        reloaded.extract(data)
+        cached_s = time.perf_counter() - started
+        reloaded.shutdown()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    metrics = {
+        "sequential_s": round(sequential_s, 4),
+        "parallel_cold_s": round(parallel_s, 4),
+        "cached_reupload_s": round(cached_s, 4),
+    }
+    print(f"Document: {args.pages} pages, {len(data) / 1024:.0f} KB, {ingestor.max_workers} worker(s)")
+    print(f"{'sequential (original loop)':<32}{sequential_s:>9.3f} s  {args.pages / sequential_s:>8.0f} pages/s")
+    print(f"{'parallel, cold':<32}{parallel_s:>9.3f} s  {args.pages / parallel_s:>8.0f} pages/s  "
+          f"({sum(map(len, full['pages']))} chars)")
+    print(f"{'re-upload (disk cache)':<32}{cached_s:>9.3f} s")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "pdf", "pages": args.pages, "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+# --- Flow Reactor Benchmark ---
+# Times a CSTR residence-time sweep three ways: one independent cold-started reactor per point
+# (how the tool used to work), the sweep reusing one reactor network with continuation, and a
+# repeat of a single operating point warm-started from the steady-state cache. Also times one
+# PFR solve and the same PFR read off at every sweep residence time.
+#
+#   python benchmarks/run_reactor_benchmark.py --points 50
+#   python benchmarks/run_reactor_benchmark.py --baseline reactor_baseline.json
+
+import argparse
+import time
+
+import common
+
+common.setup_environment()
+
+from mechanisms import mechanism_registry  # noqa: E402
+from reactors import (iter_cstr_residence_time_sweep, parse_residence_times, simulate_cstr,  # noqa: E402
+                      simulate_pfr, steady_state_cache)
+
+
+INLET = "CH4:1, O2:2, N2:7.52"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CSTR/PFR engine.")
+    parser.add_argument("--points", type=int, default=50, help="Residence times in the sweep")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    taus = parse_residence_times({"start": 2e-4, "stop": 0.05, "num": args.points})
+    with mechanism_registry.checkout("gri30.yaml") as gas:
+        simulate_cstr(gas, INLET, 300.0, 101325.0, 1.0, residence_time_s=0.01, ignite=True, use_cache=False)  # Warm-up
+
+        started = time.perf_counter()
+        cold_steps = 0
+        for tau in taus:
+            result = simulate_cstr(gas, INLET, 300.0, 101325.0, 1.0, residence_time_s=tau, ignite=True, use_cache=False)
+            cold_steps += result["solver"]["steps"]
+        independent_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        points = list(iter_cstr_residence_time_sweep(gas, INLET, 300.0, 101325.0, 1.0, taus, ignite=True))
+        sweep_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        warm = simulate_cstr(gas, INLET, 305.0, 101325.0, 1.0, residence_time_s=taus[len(taus) // 2])
+        warm_point_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pfr = simulate_pfr(gas, INLET, 1200.0, 101325.0, 0.1, length_m=2.0, diameter_m=0.05)
+        pfr_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        simulate_pfr(gas, INLET, 1200.0, 101325.0, 0.1, residence_times_s=taus, diameter_m=0.05)
+        pfr_sweep_s = time.perf_counter() - started
+
+    metrics = {
+        "cstr_independent_points_s": round(independent_s, 4),
+        "cstr_sweep_s": round(sweep_s, 4),
+        "cstr_warm_point_s": round(warm_point_s, 4),
+        "pfr_single_s": round(pfr_s, 4),
+        "pfr_sweep_s": round(pfr_sweep_s, 4),
+    }
+    print(f"{'CSTR, ' + str(len(taus)) + ' independent cold points':<40}{independent_s:>9.3f} s  ({cold_steps} integrator steps)")
+    print(f"{'CSTR, ' + str(len(taus)) + '-point continuation sweep':<40}{sweep_s:>9.3f} s  "
+          f"({sum(p['integrator_steps'] for p in points)} integrator steps, "
+          f"{sum(p['method'] == 'newton' for p in points)} Newton solves)")
+    print(f"{'CSTR, warm-started single point':<40}{warm_point_s:>9.3f} s  ({warm['solver']['initial_state']})")
+    print(f"{'PFR, 2 m tube':<40}{pfr_s:>9.3f} s  ({pfr['solver']['steps']} integrator steps)")
+    print(f"{'PFR, ' + str(len(taus)) + ' residence times, one march':<40}{pfr_sweep_s:>9.3f} s")
+    print(f"{'steady-state cache':<40}{steady_state_cache.stats()}")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "reactor", "points": len(taus), "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
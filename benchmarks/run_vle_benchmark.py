@@ -0,0 +1,78 @@
+# --- Vapor-Liquid Equilibrium Benchmark ---
+# Times a binary T-x-y diagram (ethanol/water, Wilson, 1 atm) solved in one vectorized pass
+# against the same bubble points solved one composition at a time, plus a P-x-y diagram and the
+# full generate_phase_diagram tool call.
+#
+#   python benchmarks/run_vle_benchmark.py --points 500
+#   python benchmarks/run_vle_benchmark.py --baseline vle_baseline.json
+
+import argparse
+import json
+import time
+
+import common
+
+common.setup_environment()
+
+from tools import generate_phase_diagram  # noqa: E402
+from vle import binary_diagram, bubble_temperature, get_parameter_set  # noqa: E402
+
+
+COMPONENTS = ["ethanol", "water"]
+PRESSURE_PA = 101325.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized VLE engine.")
+    parser.add_argument("--points", type=int, default=500, help="Compositions along the diagram")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    parameters = get_parameter_set(COMPONENTS)
+    first_build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    get_parameter_set(COMPONENTS)
+    cached_build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    txy = binary_diagram(parameters, "txy", 350.0, PRESSURE_PA, args.points)
+    txy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    looped = [bubble_temperature(parameters, [x1, 1.0 - x1], PRESSURE_PA)[0][0] for x1, _, _ in txy["rows"]]
+    looped_s = time.perf_counter() - started
+    deviation = max(abs(row[2] - t) for row, t in zip(txy["rows"], looped))
+
+    started = time.perf_counter()
+    binary_diagram(parameters, "pxy", 350.0, PRESSURE_PA, args.points)
+    pxy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = json.loads(generate_phase_diagram(COMPONENTS, 350.0, PRESSURE_PA, [0.3, 0.7], points=args.points))
+    tool_s = time.perf_counter() - started
+
+    metrics = {
+        "txy_vectorized_s": round(txy_s, 4),
+        "txy_point_by_point_s": round(looped_s, 4),
+        "pxy_vectorized_s": round(pxy_s, 4),
+        "tool_call_s": round(tool_s, 4),
+    }
+    print(f"{'parameter set, first / cached':<40}{first_build_s * 1000:>8.3f} / {cached_build_s * 1000:.3f} ms")
+    print(f"{str(args.points) + '-point T-x-y, vectorized':<40}{txy_s:>9.4f} s  ({txy['iterations']} Newton iterations)")
+    print(f"{str(args.points) + '-point T-x-y, point by point':<40}{looped_s:>9.4f} s  ({looped_s / txy_s:.0f}x slower, "
+          f"max difference {deviation:.1e} K)")
+    print(f"{str(args.points) + '-point P-x-y, vectorized':<40}{pxy_s:>9.4f} s")
+    print(f"{'generate_phase_diagram (both + feed)':<40}{tool_s:>9.4f} s  (azeotrope {result['txy']['azeotropes']})")
+
+    if args.output:
+        common.write_results(args.output, {"benchmark": "vle", "points": args.points, "metrics": metrics})
+    if args.baseline:
+        return common.report_regressions(common.compare_to_baseline(metrics, args.baseline, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
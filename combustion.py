@@ -0,0 +1,149 @@
+# --- Batched Combustion Calculations ---
+# Parameter sweeps of the adiabatic flame temperature evaluated in a single tool call.
+# States are held in a Cantera SolutionArray so the reactant mixtures for a whole grid
+# are set in one vectorised assignment and equilibrated in one pass, and large grids
+# can optionally be split across worker processes.
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cantera as ct
+import numpy as np
+
+from mechanisms import DEFAULT_MECHANISM, mechanism_registry
+from worker_pool import process_context
+
+
+MAX_SWEEP_POINTS = 5000
+# Below this many points the cost of shipping work to other processes outweighs the gain.
+MIN_POINTS_PER_WORKER = 50
+
+AIR = {'O2': 1.0, 'N2': 3.76}
+
+_process_pool = None
+
+
+def expand_range(spec, name: str) -> list:
+    """
+    Expands a sweep specification into a list of floats.
+
+    Args:
+        spec: A single number, a list of numbers, or a dict describing a range, either
+              {"start": 0.5, "stop": 2.0, "num": 200} (inclusive, evenly spaced) or
+              {"start": 300, "stop": 900, "step": 100} (inclusive of "stop" when it lands on the grid).
+        name (str): Name of the parameter, used in error messages.
+
+    Returns:
+        list: The expanded values.
+    """
+    if isinstance(spec, (int, float)):
+        return [float(spec)]
+    if isinstance(spec, (list, tuple)):
+        if not spec:
+            raise ValueError(f"'{name}' must not be empty.")
+        return [float(value) for value in spec]
+    if isinstance(spec, dict):
+        if "start" not in spec or "stop" not in spec:
+            raise ValueError(f"'{name}' range needs 'start' and 'stop'.")
+        start, stop = float(spec["start"]), float(spec["stop"])
+        if "num" in spec:
+            return np.linspace(start, stop, int(spec["num"])).tolist()
+        if "step" in spec:
+            step = float(spec["step"])
+            if step == 0:
+                raise ValueError(f"'{name}' step must be non-zero.")
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            return (start + step * np.arange(max(count, 0))).tolist()
+        raise ValueError(f"'{name}' range needs either 'num' or 'step'.")
+    raise ValueError(f"Unsupported specification for '{name}': {spec!r}")
+
+
+def _oxidizer_composition(oxidizer: str):
+    return AIR if oxidizer.lower() == 'air' else oxidizer
+
+
+def _sweep_chunk(mechanism: str, fuel: str, oxidizer: str, phis, temps, pressures) -> list:
+    """Equilibrates one batch of (phi, T0, P0) points for a single fuel and returns the flame temperatures."""
+    with mechanism_registry.checkout(mechanism) as gas:
+        states = ct.SolutionArray(gas, len(phis))
+        states.TP = np.asarray(temps), np.asarray(pressures)
+        states.set_equivalence_ratio(np.asarray(phis), fuel, _oxidizer_composition(oxidizer))
+        states.equilibrate('HP')
+        return states.T.tolist()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Tool workers run threads of their own, so the pool must not be forked from them either
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=process_context())
+    return _process_pool
+
+
+def adiabatic_flame_temperature_sweep(fuels: list, oxidizer: str, equivalence_ratios, initial_temps_k,
+                                      initial_pressures_pa, parallel: bool = False,
+                                      mechanism: str = DEFAULT_MECHANISM) -> dict:
+    """
+    Computes the adiabatic flame temperature over the full grid fuels x phi x T0 x P0.
+
+    Args:
+        fuels (list): Fuel formulas (e.g., ['CH4', 'C3H8']).
+        oxidizer (str): Oxidizer formula or 'air'.
+        equivalence_ratios: Sweep specification for phi (see expand_range).
+        initial_temps_k: Sweep specification for the initial temperature in Kelvin.
+        initial_pressures_pa: Sweep specification for the initial pressure in Pascals.
+        parallel (bool): Split the grid across worker processes when it is large enough.
+        mechanism (str): Cantera mechanism file.
+
+    Returns:
+        dict: Columnar table with "columns" and "rows" (one row per grid point).
+    """
+    phis = expand_range(equivalence_ratios, "equivalence_ratios")
+    temps = expand_range(initial_temps_k, "initial_temps_k")
+    pressures = expand_range(initial_pressures_pa, "initial_pressures_pa")
+
+    grid = list(itertools.product(phis, temps, pressures))
+    total_points = len(grid) * len(fuels)
+    if total_points > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep has {total_points} points; the limit is {MAX_SWEEP_POINTS}.")
+
+    grid_phis, grid_temps, grid_pressures = (list(column) for column in zip(*grid))
+
+    # One batch per fuel, further split into per-worker chunks when running in parallel
+    batches = []
+    workers = os.cpu_count() or 1
+    chunks = 1
+    if parallel:
+        chunks = max(1, min(workers, len(grid) // MIN_POINTS_PER_WORKER))
+    bounds = np.linspace(0, len(grid), chunks + 1).astype(int)
+    for fuel in fuels:
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi > lo:
+                batches.append((fuel, lo, hi))
+
+    if len(batches) > 1 and parallel:
+        pool = _get_process_pool()
+        futures = [
+            pool.submit(_sweep_chunk, mechanism, fuel, oxidizer,
+                        grid_phis[lo:hi], grid_temps[lo:hi], grid_pressures[lo:hi])
+            for fuel, lo, hi in batches
+        ]
+        results = [future.result() for future in futures]
+    else:
+        results = [
+            _sweep_chunk(mechanism, fuel, oxidizer,
+                         grid_phis[lo:hi], grid_temps[lo:hi], grid_pressures[lo:hi])
+            for fuel, lo, hi in batches
+        ]
+
+    rows = []
+    for (fuel, lo, hi), flame_temps in zip(batches, results):
+        for phi, t0, p0, aft in zip(grid_phis[lo:hi], grid_temps[lo:hi], grid_pressures[lo:hi], flame_temps):
+            rows.append([fuel, round(phi, 6), round(t0, 4), round(p0, 2), round(aft, 2)])
+
+    return {
+        "columns": ["fuel", "equivalence_ratio", "initial_temperature_K", "initial_pressure_Pa",
+                    "adiabatic_flame_temperature_K"],
+        "rows": rows,
+    }
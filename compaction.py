@@ -0,0 +1,277 @@
+# --- Rolling Conversation Compaction ---
+# Builds the Gemini request from the chat history without letting it grow with the length of the
+# conversation: the last few turns are sent verbatim, older turns are replaced by short extractive
+# summaries (computed once per turn and reused on later requests), bulky tool outputs from earlier
+# turns are trimmed, images from earlier turns are re-attached only when the question refers to
+# them, and the whole request (including the tool results of each step) is kept under a token budget.
+
+import json
+import re
+
+from image_store import image_blob_store
+from retrieval import estimate_tokens
+
+
+IMAGE_TOKENS = 258  # Gemini's token cost for one image
+SUMMARY_HEADER = "[Summary of the earlier conversation, for context]"
+MAX_REATTACHED_IMAGES = 2
+# Questions that refer back to an earlier upload get its image re-attached
+_IMAGE_REFERENCE_RE = re.compile(
+    r"\b(image|images|picture|photo|figure|diagram|drawing|sketch|chart|plot|graph|screenshot|scan|"
+    r"schematic|p&id|pfd|attached|attachment|uploaded)\b", re.IGNORECASE
+)
+
+
+def _image_placeholder(part: dict, reason: str) -> dict:
+    return {"text": f"[Image '{part.get('name', 'image')}' ({part.get('width')}x{part.get('height')}), {reason}]"}
+
+
+def to_gemini_parts(message: dict, attach_images=True) -> list:
+    """
+    Converts the parts of a chat history message into Gemini API parts.
+
+    Args:
+        message (dict): A chat history message.
+        attach_images: True to attach every image, or a set of the image_ref values to attach;
+                       other images are replaced by a short text note.
+    """
+    parts = []
+    for part_content in message["parts"]:
+        if isinstance(part_content, dict) and "text" in part_content:
+            parts.append({"text": part_content["text"]})
+        elif isinstance(part_content, dict) and "image_ref" in part_content:
+            if attach_images is True or part_content["image_ref"] in attach_images:
+                data = image_blob_store.get(part_content["image_ref"])
+                if data is not None:
+                    parts.append({"mime_type": part_content["mime_type"], "data": data})
+                else:
+                    parts.append(_image_placeholder(part_content, "uploaded earlier, no longer available"))
+            else:
+                parts.append(_image_placeholder(part_content, "uploaded earlier, not re-attached"))
+        elif isinstance(part_content, dict) and "tool_output" in part_content:
+            # When sending tool output back to the model, format it as regular text
+            # or a specific string that the model understands as "tool result"
+            parts.append({"text": f"Tool Output:\n```json\n{json.dumps(part_content['tool_output'], indent=2)}\n```"})
+        elif isinstance(part_content, str): # Fallback for any raw strings
+            parts.append({"text": part_content})
+    return parts
+
+
+def compact_tool_output(output, max_chars: int = 1500, max_items: int = 10):
+    """
+    Shrinks a tool output for re-use in later requests.
+
+    Scalars are kept; long strings are cut; dicts of numbers keep their largest entries
+    (e.g. the main species of an equilibrium composition) and lists keep their first items.
+    """
+    if len(json.dumps(output, default=str)) <= max_chars:
+        return output
+    if isinstance(output, str):
+        return output[:max_chars] + "... [truncated]"
+    if isinstance(output, list):
+        head = [compact_tool_output(item, max_chars // max_items, max_items) for item in output[:max_items]]
+        if len(output) > max_items:
+            head.append(f"... {len(output) - max_items} more items omitted")
+        return head
+    if isinstance(output, dict):
+        values = list(output.values())
+        if values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            largest = sorted(output.items(), key=lambda item: abs(item[1]), reverse=True)[:max_items]
+            compacted = dict(largest)
+            if len(output) > max_items:
+                compacted["_omitted"] = f"{len(output) - max_items} smaller entries"
+            return compacted
+        return {key: compact_tool_output(value, max(max_chars // max(len(output), 1), 200), max_items)
+                for key, value in output.items()}
+    return output
+
+
+def _summarize_turn(turn: list, max_chars: int = 300) -> str:
+    """Extractive one-paragraph summary of a turn (user request, tool calls, assistant answer)."""
+    user_text, tools, answer, images = [], [], "", 0
+    for message in turn:
+        for part in message["parts"]:
+            if isinstance(part, dict) and "image_ref" in part:
+                images += 1
+            elif isinstance(part, dict) and "tool_output" in part:
+                output = part["tool_output"]
+                if isinstance(output, dict):
+                    scalars = {k: v for k, v in output.items()
+                               if isinstance(v, (int, float, str)) and len(str(v)) < 60 and k != "status"}
+                    tools.append(f"{output.get('status', '?')}: {json.dumps(scalars)[:max_chars]}")
+            elif isinstance(part, dict) and "text" in part:
+                if message["role"] == "user":
+                    user_text.append(part["text"])
+                elif message["role"] == "assistant":
+                    answer = part["text"]
+
+    summary = "User: " + " ".join(user_text)[:max_chars].strip()
+    if images:
+        summary += f" [{images} image(s) attached]"
+    if tools:
+        summary += " | Tool results: " + "; ".join(tools)
+    if answer:
+        summary += " | Assistant: " + answer[:max_chars].strip()
+    return summary
+
+
+def _estimate_message_tokens(message: dict) -> int:
+    return sum(IMAGE_TOKENS if "data" in part else estimate_tokens(part.get("text", ""))
+               for part in message["parts"])
+
+
+def _images_to_reattach(earlier_turns: list, question: str) -> set:
+    """Image refs from earlier verbatim turns to attach again: the most recent ones, if the question refers to images."""
+    if not _IMAGE_REFERENCE_RE.search(question):
+        return set()
+    refs = []
+    for turn in reversed(earlier_turns):
+        for message in reversed(turn):
+            for part in reversed(message["parts"]):
+                if isinstance(part, dict) and "image_ref" in part and len(refs) < MAX_REATTACHED_IMAGES:
+                    refs.append(part["image_ref"])
+    return set(refs)
+
+
+class ConversationCompactor:
+    """
+    Turns the chat history into a bounded Gemini request.
+
+    Args:
+        keep_turns (int): Number of most recent turns (a user message and everything after it) sent verbatim.
+        token_budget (int): Approximate upper bound on the tokens of the conversation part of the request.
+        tool_output_chars (int): Size that tool outputs of earlier turns are trimmed to.
+    """
+
+    def __init__(self, keep_turns: int = 4, token_budget: int = 12000, tool_output_chars: int = 1500):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.tool_output_chars = tool_output_chars
+
+    @staticmethod
+    def split_turns(messages: list) -> list:
+        """Groups history messages into turns as (index of the first message, messages)."""
+        turns = []
+        for index, message in enumerate(messages):
+            if message["role"] == "user" or not turns:
+                turns.append((index, []))
+            turns[-1][1].append(message)
+        # The greeting before the first user message is for display only
+        if turns and turns[0][1][0]["role"] != "user":
+            turns.pop(0)
+        return turns
+
+    def _turn_to_messages(self, turn: list, trim_tool_outputs: bool, attach_images=True) -> list:
+        api_messages = []
+        for message in turn:
+            if trim_tool_outputs:
+                message = dict(message, parts=[
+                    {"tool_output": compact_tool_output(part["tool_output"], self.tool_output_chars)}
+                    if isinstance(part, dict) and "tool_output" in part else part
+                    for part in message["parts"]
+                ])
+            parts = to_gemini_parts(message, attach_images)
+            if parts:
+                role = "user" if message["role"] == "user" else "model"
+                api_messages.append({"role": role, "parts": parts})
+        return api_messages
+
+    @staticmethod
+    def _trimmed_summary(summary_lines: list, kept: list) -> list:
+        omitted = len(summary_lines) - 1 - len(kept)
+        return summary_lines[:1] + [f"- [{omitted} earlier turn(s) omitted]"] + kept
+
+    def tool_results_text(self, results: list, api_messages: list) -> tuple:
+        """
+        Formats a step's tool results for the next request within what is left of the token budget.
+
+        Results are sent whole when they fit. Otherwise each is trimmed with compact_tool_output,
+        to tool_output_chars or, if that is still too much, to its share of the remaining budget.
+
+        Args:
+            results (list): (tool name, result JSON string, parsed output) per tool call.
+            api_messages (list): The request so far, which the results will be appended to.
+
+        Returns:
+            tuple: (text of the message, True if the outputs were trimmed)
+        """
+        full_text = "\n\n".join(f"Tool execution result for {name}:\n```json\n{result}\n```" for name, result, _ in results)
+        available = self.token_budget - sum(_estimate_message_tokens(m) for m in api_messages)
+        if estimate_tokens(full_text) <= available or not results:
+            return full_text, False
+        max_chars = min(self.tool_output_chars, max(available * 4 // len(results), 200))
+        return "\n\n".join(
+            f"Tool execution result for {name} (trimmed):\n```json\n{json.dumps(compact_tool_output(output, max_chars), default=str)}\n```"
+            for name, _, output in results
+        ), True
+
+    def build_request(self, messages: list, state: dict) -> tuple:
+        """
+        Builds the list of messages for generate_content.
+
+        Args:
+            messages (list): The chat history (st.session_state.messages): all of it, or its most
+                             recent messages from position state["message_offset"] on.
+            state (dict): Per-session compaction state; turn summaries are cached in it so each
+                          turn is summarized only once. Turns before the offset are sent as their
+                          cached summaries.
+
+        Returns:
+            tuple: (Gemini API messages, stats dict with "summarized_turns", "verbatim_turns",
+                   "estimated_tokens", "images_attached", "images_omitted" and "image_bytes")
+        """
+        summaries = state.setdefault("summaries", {})
+        offset = state.get("message_offset", 0)
+        turns = [(offset + start, turn) for start, turn in self.split_turns(messages)]
+        split = max(len(turns) - self.keep_turns, 0)
+        earlier_lines = [f"- {summaries[start]}" for start in sorted(summaries) if start < offset]
+
+        while True:
+            older, recent = turns[:split], turns[split:]
+            summary_lines = list(earlier_lines)
+            for start, turn in older:
+                if start not in summaries:
+                    summaries[start] = _summarize_turn(turn)
+                summary_lines.append(f"- {summaries[start]}")
+
+            # Images of the current turn are always sent; earlier ones only when the question refers to them
+            question = " ".join(part.get("text", "") for part in recent[-1][1][0]["parts"]
+                                if isinstance(part, dict)) if recent else ""
+            reattach = _images_to_reattach([turn for _, turn in recent[:-1]], question)
+            api_messages = []
+            for position, (_, turn) in enumerate(recent):
+                is_current = position == len(recent) - 1
+                # Tool outputs of the current turn are kept whole; earlier ones are trimmed
+                api_messages.extend(self._turn_to_messages(turn, trim_tool_outputs=not is_current,
+                                                           attach_images=True if is_current else reattach))
+
+            summary_text = "\n".join(summary_lines)
+            tokens = estimate_tokens(summary_text) + sum(_estimate_message_tokens(m) for m in api_messages)
+            if tokens <= self.token_budget or len(recent) <= 1:
+                break
+            split += 1  # Over budget: summarize one more turn
+
+        if summary_text and tokens > self.token_budget:
+            # Still over budget with a single verbatim turn: drop whole turn summaries, keeping the
+            # first turn (which usually states the task) and as many of the latest as fit
+            message_tokens = tokens - estimate_tokens(summary_text)
+            kept = summary_lines[1:]
+            while kept and message_tokens + estimate_tokens("\n".join(self._trimmed_summary(summary_lines, kept))) > self.token_budget:
+                kept.pop(0)
+            summary_text = "\n".join(self._trimmed_summary(summary_lines, kept))
+            tokens = message_tokens + estimate_tokens(summary_text)
+
+        if summary_text and api_messages:
+            api_messages[0] = dict(api_messages[0], parts=[{"text": f"{SUMMARY_HEADER}\n{summary_text}"}] + api_messages[0]["parts"])
+
+        image_parts = [part for message in api_messages for part in message["parts"] if "data" in part]
+        image_refs = sum(1 for _, turn in recent for message in turn for part in message["parts"]
+                         if isinstance(part, dict) and "image_ref" in part)
+        return api_messages, {
+            "summarized_turns": len(earlier_lines) + len(older),
+            "verbatim_turns": len(recent),
+            "estimated_tokens": tokens,
+            "images_attached": len(image_parts),
+            "images_omitted": image_refs - len(image_parts),
+            "image_bytes": sum(len(part["data"]) for part in image_parts),
+        }
@@ -0,0 +1,87 @@
+# --- Per-Session Document Store ---
+# Uploaded PDF and TXT files are stored once per session and indexed with BM25 instead of being
+# pasted (truncated) into the chat history. For every question only the best-matching chunks of
+# the session's documents are added to the request, under a token budget, so a long manual stays
+# queryable in later turns without being re-sent in full. Indexes are keyed on the content hash
+# and shared between sessions that upload the same file.
+
+import hashlib
+
+from retrieval import IndexCache, estimate_tokens
+
+
+DOCUMENT_CONTEXT_TOKENS = 2000
+DOCUMENT_TOP_K = 8
+CONTEXT_HEADER = "Relevant excerpts from the uploaded documents (retrieved for this question):"
+
+# Module-level index cache shared by every Streamlit session in this process.
+document_index_cache = IndexCache(max_entries=32)
+
+
+def pages_to_text(pages: list) -> str:
+    """Joins extracted PDF pages with page headings, so every chunk knows the page it came from."""
+    return "\n\n".join(f"### Page {number}\n\n{text}" for number, text in enumerate(pages, start=1) if text.strip())
+
+
+class SessionDocumentStore:
+    """The documents uploaded in one chat session."""
+
+    def __init__(self):
+        self.documents = {}  # sha256 -> {"name", "sha256", "text", "chars", "turn"}
+
+    def add(self, name: str, text: str, turn: int) -> dict:
+        """
+        Stores and indexes a document (a re-upload of the same content is stored once).
+
+        Args:
+            name (str): File name shown to the user and the model.
+            text (str): Full document text ("### " headings become chunk sections).
+            turn (int): Index of the history message the document was uploaded with.
+
+        Returns:
+            dict: {"name", "sha256", "chars", "chunks", "turn"}
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        document = self.documents.setdefault(digest, {"name": name, "sha256": digest, "text": text, "chars": len(text)})
+        document["turn"] = turn
+        index = document_index_cache.get_or_build(digest, text)
+        return {"name": name, "sha256": digest, "chars": len(text), "chunks": len(index.chunks), "turn": turn}
+
+    def context_for(self, question: str, token_budget: int = DOCUMENT_CONTEXT_TOKENS,
+                    top_k: int = DOCUMENT_TOP_K, new_since_turn: int = None) -> tuple:
+        """
+        Selects the chunks of all session documents that best match a question.
+
+        Documents uploaded at or after new_since_turn also contribute their opening chunk, so
+        "summarize this file" works even when the question shares no words with it.
+
+        Returns:
+            tuple: (context text or "" if nothing was selected, list of {"name", "section", "score"})
+        """
+        candidates = []
+        for document in self.documents.values():
+            index = document_index_cache.get_or_build(document["sha256"], document["text"])
+            is_new = new_since_turn is not None and document["turn"] >= new_since_turn
+            for chunk in index.search(question, top_k=top_k, always_include=(0,) if is_new else ()):
+                # Forced opening chunks rank after every real match
+                candidates.append((chunk["score"] if chunk["score"] > 0 else -1.0, document["name"], chunk))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        selected, used = [], 0
+        for score, name, chunk in candidates[:top_k]:
+            cost = estimate_tokens(chunk["text"])
+            if used + cost > token_budget:
+                continue
+            selected.append((name, chunk))
+            used += cost
+        if not selected:
+            return "", []
+
+        # Present the excerpts grouped by document and in document order
+        selected.sort(key=lambda item: (item[0], item[1]["position"]))
+        blocks = [f"[{name} | {chunk['section']}]\n{chunk['text']}" for name, chunk in selected]
+        sources = [{"name": name, "section": chunk["section"], "score": chunk["score"]} for name, chunk in selected]
+        return CONTEXT_HEADER + "\n\n" + "\n\n".join(blocks), sources
+
+    def summary(self) -> list:
+        return [{"name": d["name"], "chars": d["chars"]} for d in self.documents.values()]
@@ -0,0 +1,157 @@
+# --- Batched Equilibrium Compositions ---
+# TP equilibrium of one mixture over a temperature/pressure grid. Along each temperature run the
+# previous point's equilibrium composition is the initial guess for the next (continuation), which
+# converges in a few iterations where a cold start from the raw mixture can take hundreds.
+# Independent runs can be spread across worker processes, and the result only keeps the species
+# that reach a cutoff mole fraction somewhere on the grid, stored column by column.
+
+import math
+import os
+
+import cantera as ct
+import numpy as np
+
+from combustion import MIN_POINTS_PER_WORKER, _get_process_pool, expand_range
+from mechanisms import DEFAULT_MECHANISM, mechanism_registry
+
+
+MAX_GRID_POINTS = 5000
+DEFAULT_MIN_MOLE_FRACTION = 1e-6
+SIGNIFICANT_DIGITS = 4
+# A seeded element-potential solve converges within a few dozen iterations or not at all (typically
+# at low temperatures); failing fast and switching to the VCS solver beats its default 1000 steps.
+ELEMENT_POTENTIAL_MAX_STEPS = 50
+
+
+def _equilibrate_tp(gas) -> bool:
+    """
+    Equilibrates at the gas's current T and P, starting from its current composition.
+
+    Returns:
+        bool: False if the element-potential solver failed and the VCS solver was used.
+    """
+    start = gas.X
+    try:
+        gas.equilibrate('TP', solver='element_potential', max_steps=ELEMENT_POTENTIAL_MAX_STEPS)
+        return True
+    except ct.CanteraError:
+        gas.TPX = gas.T, gas.P, start
+        gas.equilibrate('TP', solver='vcs')
+        return False
+
+
+def _equilibrate_block(mechanism: str, mixture: str, temps, pressures, continuation: bool = True) -> tuple:
+    """
+    Equilibrates a block of the grid (every temperature at every pressure, pressure-major).
+
+    With continuation each pressure's temperature run starts from the mixture and every further
+    point starts from its neighbour's solution; without it every point starts from the mixture
+    and uses Cantera's default solver, as a single-point calculation does.
+
+    Returns:
+        tuple: (mole fractions, shape (len(pressures) * len(temps), n_species), number of VCS fallbacks)
+    """
+    with mechanism_registry.checkout(mechanism) as gas:
+        compositions = np.empty((len(pressures) * len(temps), gas.n_species))
+        fallbacks = 0
+        row = 0
+        for pressure in pressures:
+            for index, temp in enumerate(temps):
+                if not continuation:
+                    gas.TPX = temp, pressure, mixture
+                    gas.equilibrate('TP')
+                else:
+                    if index == 0:
+                        gas.TPX = temp, pressure, mixture
+                    else:
+                        gas.TP = temp, pressure
+                    fallbacks += not _equilibrate_tp(gas)
+                compositions[row] = gas.X
+                row += 1
+        return compositions, fallbacks
+
+
+def _blocks(n_temps: int, n_pressures: int, workers: int) -> list:
+    """
+    Splits the grid into about `workers` blocks of (temperature slice, pressure slice).
+
+    Pressures are divided first; when there are fewer pressures than workers, each temperature
+    run is also cut into pieces of at least MIN_POINTS_PER_WORKER points.
+    """
+    pressure_chunks = max(1, min(workers, n_pressures))
+    temp_chunks = max(1, min(math.ceil(workers / pressure_chunks), n_temps // MIN_POINTS_PER_WORKER))
+    pressure_bounds = np.linspace(0, n_pressures, pressure_chunks + 1).astype(int)
+    temp_bounds = np.linspace(0, n_temps, temp_chunks + 1).astype(int)
+    return [(slice(t_lo, t_hi), slice(p_lo, p_hi))
+            for p_lo, p_hi in zip(pressure_bounds[:-1], pressure_bounds[1:])
+            for t_lo, t_hi in zip(temp_bounds[:-1], temp_bounds[1:])]
+
+
+def _round(value: float) -> float:
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+def equilibrium_grid(mixture: str, temperatures_k, pressures_pa, min_mole_fraction: float = DEFAULT_MIN_MOLE_FRACTION,
+                     parallel: bool = False, continuation: bool = True, mechanism: str = DEFAULT_MECHANISM) -> dict:
+    """
+    Computes TP equilibrium compositions of a mixture over the grid temperatures x pressures.
+
+    Args:
+        mixture (str): Initial composition (e.g., 'CH4:1, O2:2, N2:7.52').
+        temperatures_k: Sweep specification for the temperature in Kelvin (see combustion.expand_range).
+        pressures_pa: Sweep specification for the pressure in Pascals.
+        min_mole_fraction (float): Species below this mole fraction at every grid point are left out,
+                                   and values below it are reported as 0.
+        parallel (bool): Split the grid across worker processes when it is large enough.
+        continuation (bool): Seed each point with its neighbour's solution (False starts every point
+                             from the mixture, for comparison).
+        mechanism (str): Cantera mechanism file.
+
+    Returns:
+        dict: {"temperature_K", "pressure_Pa" (one entry per grid point, pressure-major),
+               "mole_fractions" ({species: column}, most abundant species first), "species_omitted",
+               "max_mole_fraction" ({species: grid maximum}), "solver_fallbacks", "blocks"}
+    """
+    temps = expand_range(temperatures_k, "temperatures_k")
+    pressures = expand_range(pressures_pa, "pressures_pa")
+    total_points = len(temps) * len(pressures)
+    if total_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid has {total_points} points; the limit is {MAX_GRID_POINTS}.")
+    if min(temps) <= 0 or min(pressures) <= 0:
+        raise ValueError("Temperatures and pressures must be positive.")
+
+    workers = 1
+    if parallel:
+        workers = max(1, min(os.cpu_count() or 1, total_points // MIN_POINTS_PER_WORKER))
+    blocks = _blocks(len(temps), len(pressures), workers)
+    if len(blocks) > 1:
+        pool = _get_process_pool()
+        futures = [pool.submit(_equilibrate_block, mechanism, mixture, temps[t_slice], pressures[p_slice], continuation)
+                   for t_slice, p_slice in blocks]
+        results = [future.result() for future in futures]
+    else:
+        results = [_equilibrate_block(mechanism, mixture, temps, pressures, continuation)]
+
+    # Reassemble the blocks into one (pressure, temperature, species) array
+    species_names = mechanism_registry.get_template(mechanism).species_names
+    grid = np.empty((len(pressures), len(temps), len(species_names)))
+    for (t_slice, p_slice), (compositions, _) in zip(blocks, results):
+        n_temps = t_slice.stop - t_slice.start
+        grid[p_slice, t_slice] = compositions.reshape(-1, n_temps, len(species_names))
+    grid = grid.reshape(total_points, len(species_names))
+
+    peaks = grid.max(axis=0)
+    kept = [index for index in np.argsort(-peaks) if peaks[index] >= min_mole_fraction]
+    mole_fractions = {
+        species_names[index]: [_round(x) if x >= min_mole_fraction else 0.0 for x in grid[:, index].tolist()]
+        for index in kept
+    }
+    return {
+        "temperature_K": [round(temp, 4) for temp in temps] * len(pressures),
+        "pressure_Pa": [round(pressure, 2) for pressure in pressures for _ in temps],
+        "mole_fractions": mole_fractions,
+        "species_omitted": len(species_names) - len(kept),
+        "max_mole_fraction": {species_names[index]: _round(peaks[index]) for index in kept},
+        "solver_fallbacks": sum(fallbacks for _, fallbacks in results),
+        "blocks": len(blocks),
+    }
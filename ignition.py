@@ -0,0 +1,154 @@
+# --- Batched Ignition Delay ---
+# Constant-volume autoignition delays over grids of initial temperature, pressure and equivalence
+# ratio. Every point is an adiabatic IdealGasReactor in its own ReactorNet, advanced step by step
+# by the integrator until the temperature has risen by IGNITION_TEMPERATURE_RISE_K above its
+# initial value; the delay is the interpolated crossing time, so integration stops at ignition
+# instead of running on to a fixed end time. Independent points can be spread over worker
+# processes, and the results come with 1000/T and log10(tau) columns and an Arrhenius fit per
+# (phi, P) series.
+
+import itertools
+import math
+import os
+
+import cantera as ct
+import numpy as np
+
+from combustion import _get_process_pool, _oxidizer_composition, expand_range
+from mechanisms import DEFAULT_MECHANISM, mechanism_registry
+from reactors import _reactor
+
+
+MAX_IGNITION_POINTS = 500
+IGNITION_TEMPERATURE_RISE_K = 400.0
+DEFAULT_MAX_TIME_S = 1.0
+MAX_TIME_LIMIT_S = 100.0
+MAX_STEPS_PER_POINT = 50000
+# An ignition point takes tens of milliseconds, so even small grids are worth splitting
+MIN_POINTS_PER_WORKER = 4
+
+
+def _ignition_delay(gas: ct.Solution, max_time_s: float, stop_at_ignition: bool = True) -> tuple:
+    """
+    Integrates a constant-volume reactor from the gas's current state.
+
+    Returns:
+        tuple: (ignition delay in s or None if the temperature did not rise enough within
+                max_time_s, integrator steps taken)
+    """
+    reactor = _reactor(ct.IdealGasReactor, gas)
+    net = ct.ReactorNet([reactor])
+    threshold = reactor.T + IGNITION_TEMPERATURE_RISE_K
+    previous_time, previous_temp = 0.0, reactor.T
+    delay = None
+    steps = 0
+    while net.time < max_time_s and steps < MAX_STEPS_PER_POINT:
+        time_now = net.step()
+        steps += 1
+        temp = reactor.T
+        if delay is None and temp >= threshold:
+            delay = previous_time + (threshold - previous_temp) * (time_now - previous_time) / (temp - previous_temp)
+            if stop_at_ignition:
+                break
+        previous_time, previous_temp = time_now, temp
+    if delay is not None and delay > max_time_s:
+        delay = None
+    return delay, steps
+
+
+def _ignition_chunk(mechanism: str, fuel: str, oxidizer: str, points: list, max_time_s: float,
+                    stop_at_ignition: bool) -> list:
+    """Ignition delays of (phi, P0, T0) points, as (delay, steps) pairs."""
+    results = []
+    with mechanism_registry.checkout(mechanism) as gas:
+        for phi, pressure, temp in points:
+            gas.TP = temp, pressure
+            gas.set_equivalence_ratio(phi, fuel, _oxidizer_composition(oxidizer))
+            results.append(_ignition_delay(gas, max_time_s, stop_at_ignition))
+    return results
+
+
+def _arrhenius_fit(temps: list, delays: list):
+    """Least-squares fit of tau = A exp(Ea / (R T)); None with fewer than two ignited points."""
+    pairs = [(temp, delay) for temp, delay in zip(temps, delays) if delay is not None and delay > 0]
+    if len(set(temp for temp, _ in pairs)) < 2:
+        return None
+    slope, intercept = np.polyfit([1.0 / temp for temp, _ in pairs], [math.log(delay) for _, delay in pairs], 1)
+    return {
+        "apparent_activation_energy_kJ_mol": round(float(slope) * ct.gas_constant / 1e6, 2),  # gas_constant is J/kmol-K
+        "pre_exponential_s": float(f"{math.exp(intercept):.4g}"),
+        "points": len(pairs),
+    }
+
+
+def ignition_delay_sweep(fuel: str, oxidizer: str, temperatures_k, pressures_pa, equivalence_ratios,
+                         max_time_s: float = DEFAULT_MAX_TIME_S, parallel: bool = False, stop_at_ignition: bool = True,
+                         mechanism: str = DEFAULT_MECHANISM) -> dict:
+    """
+    Computes constant-volume ignition delays over the grid phi x P0 x T0.
+
+    Args:
+        fuel (str): Fuel formula (e.g., 'CH4').
+        oxidizer (str): Oxidizer formula or 'air'.
+        temperatures_k: Sweep specification for the initial temperature in Kelvin (see combustion.expand_range).
+        pressures_pa: Sweep specification for the initial pressure in Pascals.
+        equivalence_ratios: Sweep specification for phi.
+        max_time_s (float): Points that have not ignited by then are reported without a delay.
+        parallel (bool): Spread the points across worker processes.
+        stop_at_ignition (bool): Stop each integration at ignition (False integrates every point to
+                                 max_time_s, for comparison).
+        mechanism (str): Cantera mechanism file.
+
+    Returns:
+        dict: {"columns", "rows" (one per point, grouped by phi and P0), "arrhenius_fits",
+               "not_ignited", "integrator_steps", "workers"}
+    """
+    temps = expand_range(temperatures_k, "temperatures_k")
+    pressures = expand_range(pressures_pa, "pressures_pa")
+    phis = expand_range(equivalence_ratios, "equivalence_ratios")
+    grid = list(itertools.product(phis, pressures, temps))
+    if len(grid) > MAX_IGNITION_POINTS:
+        raise ValueError(f"Grid has {len(grid)} points; the limit is {MAX_IGNITION_POINTS}.")
+    if min(temps) <= 0 or min(pressures) <= 0 or min(phis) <= 0:
+        raise ValueError("Temperatures, pressures and equivalence ratios must be positive.")
+    if not 0 < max_time_s <= MAX_TIME_LIMIT_S:
+        raise ValueError(f"max_time_s must be between 0 and {MAX_TIME_LIMIT_S} s.")
+
+    workers = 1
+    if parallel:
+        workers = max(1, min(os.cpu_count() or 1, len(grid) // MIN_POINTS_PER_WORKER))
+    if workers > 1:
+        # Round-robin, so the slow low-temperature points are shared out evenly
+        pool = _get_process_pool()
+        futures = [pool.submit(_ignition_chunk, mechanism, fuel, oxidizer, grid[k::workers], max_time_s, stop_at_ignition)
+                   for k in range(workers)]
+        chunks = [future.result() for future in futures]
+        results = [None] * len(grid)
+        for k, chunk in enumerate(chunks):
+            results[k::workers] = chunk
+    else:
+        results = _ignition_chunk(mechanism, fuel, oxidizer, grid, max_time_s, stop_at_ignition)
+
+    rows = []
+    for (phi, pressure, temp), (delay, _) in zip(grid, results):
+        rows.append([
+            round(phi, 6), round(pressure, 2), round(temp, 4), round(1000.0 / temp, 6),
+            None if delay is None else float(f"{delay:.5g}"),
+            None if delay is None else round(math.log10(delay), 5),
+        ])
+    fits = []
+    for phi, pressure in itertools.product(phis, pressures):
+        series = [(temp, delay) for (p, P, temp), (delay, _) in zip(grid, results) if p == phi and P == pressure]
+        fit = _arrhenius_fit([temp for temp, _ in series], [delay for _, delay in series])
+        if fit is not None:
+            fits.append(dict({"equivalence_ratio": round(phi, 6), "initial_pressure_Pa": round(pressure, 2)}, **fit))
+
+    return {
+        "columns": ["equivalence_ratio", "initial_pressure_Pa", "initial_temperature_K", "1000_over_T_per_K",
+                    "ignition_delay_s", "log10_ignition_delay_s"],
+        "rows": rows,
+        "arrhenius_fits": fits,
+        "not_ignited": sum(delay is None for delay, _ in results),
+        "integrator_steps": sum(steps for _, steps in results),
+        "workers": workers,
+    }
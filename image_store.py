@@ -0,0 +1,206 @@
+# --- Image Preprocessing and Content-Addressed Blob Store ---
+# Uploaded images are downsized and re-encoded once, deduplicated by content hash and kept as
+# bytes in a bounded on-disk store shared by all sessions. The chat history only holds a small
+# reference to the blob, so sessions stay light and the compressed bytes (not a full-resolution
+# PIL image) are what gets sent to Gemini, and only when the image is still relevant.
+
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+from tool_cache import CACHE_DIR
+
+
+IMAGE_BLOB_DIR = os.path.join(CACHE_DIR, "image_blobs")
+MAX_IMAGE_SIDE = 1536
+JPEG_QUALITY = 85
+MAX_STORE_BYTES = 256 * 1024 * 1024
+MAX_MEMORY_BYTES = 32 * 1024 * 1024
+# Blob names are SHA-256 hex digests; anything else (absolute paths, '..') must never reach the filesystem
+_DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def is_blob_digest(value) -> bool:
+    """True if value is a lowercase SHA-256 hex digest, i.e. a valid image reference."""
+    return isinstance(value, str) and _DIGEST_PATTERN.fullmatch(value) is not None
+
+
+def preprocess_image(data: bytes, max_side: int = MAX_IMAGE_SIDE, quality: int = JPEG_QUALITY) -> tuple:
+    """
+    Downsizes an image so its longer side is at most max_side and re-encodes it.
+
+    Images with transparency are stored as PNG, everything else as JPEG. If the re-encoded file
+    is not smaller than the upload and no resize was needed, the original bytes are kept.
+
+    Returns:
+        tuple: (encoded bytes, MIME type, width, height)
+
+    Raises:
+        PIL.UnidentifiedImageError: If the data is not an image.
+    """
+    image = Image.open(io.BytesIO(data))
+    original_format = (image.format or "").upper()
+    image = ImageOps.exif_transpose(image)  # Phone photos carry their rotation in EXIF
+    resized = max(image.size) > max_side
+    if resized:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    out = io.BytesIO()
+    if has_alpha:
+        image.save(out, format="PNG", optimize=True)
+        mime_type = "image/png"
+    else:
+        image.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+        mime_type = "image/jpeg"
+    encoded = out.getvalue()
+
+    if not resized and len(data) <= len(encoded) and original_format in ("JPEG", "PNG"):
+        return data, f"image/{original_format.lower()}", image.width, image.height
+    return encoded, mime_type, image.width, image.height
+
+
+class BlobStore:
+    """
+    Bounded content-addressed store of image bytes: files on disk (least recently used evicted
+    beyond max_bytes) with a small in-memory LRU in front.
+
+    Args:
+        directory (str): Directory holding one file per blob, named by its SHA-256.
+        max_bytes (int): Disk budget.
+        max_memory_bytes (int): Budget of the in-memory LRU.
+    """
+
+    def __init__(self, directory: str = IMAGE_BLOB_DIR, max_bytes: int = MAX_STORE_BYTES,
+                 max_memory_bytes: int = MAX_MEMORY_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "deduplicated": 0, "memory_hits": 0, "disk_reads": 0, "misses": 0, "evicted": 0}
+
+    def _path(self, digest: str) -> str:
+        if not is_blob_digest(digest):
+            raise ValueError(f"Invalid image reference {digest!r}")
+        return os.path.join(self.directory, digest)
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        # Called with the lock held
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        self._memory[digest] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+
+    def put(self, data: bytes) -> str:
+        """Stores bytes (once per distinct content) and returns their SHA-256."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        with self._lock:
+            self._stats["puts"] += 1
+            if os.path.exists(path):
+                self._stats["deduplicated"] += 1
+                os.utime(path)
+            else:
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self._remember(digest, data)
+        self._evict()
+        return digest
+
+    def get(self, digest: str):
+        """Returns the bytes of a blob, or None if it was evicted or the reference is not a digest."""
+        if not is_blob_digest(digest):
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+                self._stats["memory_hits"] += 1
+                return data
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["disk_reads"] += 1
+            self._remember(digest, data)
+        return data
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not is_blob_digest(name):
+                continue
+            try:
+                info = os.stat(self._path(name))
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._stats["evicted"] += 1
+                dropped = self._memory.pop(name, None)
+                if dropped is not None:
+                    self._memory_bytes -= len(dropped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = dict(self._stats)
+            report["memory_blobs"] = len(self._memory)
+            report["memory_bytes"] = self._memory_bytes
+        report["disk_bytes"] = sum(os.path.getsize(self._path(name)) for name in os.listdir(self.directory)
+                                   if is_blob_digest(name))
+        return report
+
+
+def store_upload(data: bytes, name: str, max_side: int = MAX_IMAGE_SIDE, quality: int = JPEG_QUALITY) -> dict:
+    """
+    Preprocesses an uploaded image and stores it in the shared blob store.
+
+    Returns:
+        dict: The history part referencing the image: {"image_ref", "mime_type", "name", "width",
+              "height", "bytes", "original_bytes"}
+    """
+    encoded, mime_type, width, height = preprocess_image(data, max_side, quality)
+    return {
+        "image_ref": image_blob_store.put(encoded),
+        "mime_type": mime_type,
+        "name": name,
+        "width": width,
+        "height": height,
+        "bytes": len(encoded),
+        "original_bytes": len(data),
+    }
+
+
+# Module-level blob store shared by every Streamlit session in this process.
+image_blob_store = BlobStore()
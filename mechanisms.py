@@ -0,0 +1,195 @@
+# --- Shared Cantera Mechanism Registry ---
+# Parsing a mechanism file such as gri30.yaml takes ~100 ms, while the tools that use
+# it often need only a few microseconds of work. The registry below parses each
+# mechanism once per process and hands out pooled Solution objects so that every
+# Streamlit session (and every thread within it) can reuse the parsed data.
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import cantera as ct
+
+
+DEFAULT_MECHANISM = "gri30.yaml"
+
+
+class MechanismRegistry:
+    """
+    Process-wide cache of parsed Cantera mechanisms with a pool of Solution objects per mechanism.
+
+    A Solution object is not thread-safe, so callers check one out for the duration of a
+    calculation and the registry returns it to the pool afterwards. The thermodynamic state
+    of a Solution is reset to the mechanism's initial state on every checkout, so no state
+    leaks between tool calls.
+
+    Args:
+        max_pool_size (int): Maximum number of idle Solution objects kept per mechanism.
+    """
+
+    def __init__(self, max_pool_size: int = 8):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._templates = {}      # mechanism -> parsed Solution used as the clone source
+        self._initial_states = {} # mechanism -> (T, P, Y) right after parsing
+        self._pools = {}          # mechanism -> list of idle Solution objects
+        self._parse_locks = {}    # mechanism -> lock serialising the first parse
+        self._stats = {}
+
+    def _mechanism_stats(self, mechanism: str) -> dict:
+        if mechanism not in self._stats:
+            self._stats[mechanism] = {
+                "hits": 0,
+                "misses": 0,
+                "parses": 0,
+                "parse_time_s": 0.0,
+                "clones": 0,
+                "clone_time_s": 0.0,
+            }
+        return self._stats[mechanism]
+
+    def _get_template(self, mechanism: str) -> ct.Solution:
+        with self._lock:
+            template = self._templates.get(mechanism)
+            if template is not None:
+                return template
+            parse_lock = self._parse_locks.setdefault(mechanism, threading.Lock())
+
+        # Parse outside the registry lock so other mechanisms are not blocked,
+        # but make sure concurrent callers only parse the same file once.
+        with parse_lock:
+            with self._lock:
+                template = self._templates.get(mechanism)
+            if template is not None:
+                return template
+
+            start = time.perf_counter()
+            template = ct.Solution(mechanism)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._templates[mechanism] = template
+                self._initial_states[mechanism] = template.TPY
+                stats = self._mechanism_stats(mechanism)
+                stats["parses"] += 1
+                stats["parse_time_s"] += elapsed
+        return template
+
+    def _clone(self, mechanism: str) -> ct.Solution:
+        template = self._get_template(mechanism)
+        start = time.perf_counter()
+        # Building a Solution from already-parsed Species/Reaction objects skips the YAML parse.
+        # Transport properties are not used by any tool and would triple the clone time.
+        gas = ct.Solution(
+            thermo=template.thermo_model,
+            kinetics=template.kinetics_model,
+            transport_model="none",
+            species=template.species(),
+            reactions=template.reactions(),
+        )
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._mechanism_stats(mechanism)
+            stats["clones"] += 1
+            stats["clone_time_s"] += elapsed
+        return gas
+
+    def get_template(self, mechanism: str = DEFAULT_MECHANISM) -> ct.Solution:
+        """
+        Returns the parsed template Solution for a mechanism, parsing it on first use.
+
+        The template is shared and must only be used for read-only queries
+        (species names, molecular weights, species thermo objects).
+        """
+        return self._get_template(mechanism)
+
+    def acquire(self, mechanism: str = DEFAULT_MECHANISM) -> ct.Solution:
+        """
+        Takes a Solution object out of the pool (or creates one) with its state reset.
+        Must be paired with release(); prefer the checkout() context manager.
+        """
+        with self._lock:
+            pool = self._pools.setdefault(mechanism, [])
+            gas = pool.pop() if pool else None
+            stats = self._mechanism_stats(mechanism)
+            if gas is not None:
+                stats["hits"] += 1
+            else:
+                stats["misses"] += 1
+
+        if gas is None:
+            gas = self._clone(mechanism)
+        else:
+            gas.TPY = self._initial_states[mechanism]
+        return gas
+
+    def release(self, mechanism: str, gas: ct.Solution) -> None:
+        """Returns a Solution object to the pool of its mechanism."""
+        with self._lock:
+            pool = self._pools.setdefault(mechanism, [])
+            if len(pool) < self.max_pool_size:
+                pool.append(gas)
+
+    @contextmanager
+    def checkout(self, mechanism: str = DEFAULT_MECHANISM):
+        """
+        Context manager yielding a Solution object for exclusive use by the caller.
+
+        Example:
+            with mechanism_registry.checkout("gri30.yaml") as gas:
+                gas.TPX = 300.0, ct.one_atm, "CH4:1, O2:2"
+        """
+        gas = self.acquire(mechanism)
+        try:
+            yield gas
+        finally:
+            self.release(mechanism, gas)
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and parse/clone timings per mechanism.
+
+        "estimated_time_saved_s" assumes every checkout would otherwise have parsed the file.
+        """
+        with self._lock:
+            report = {}
+            for mechanism, stats in self._stats.items():
+                entry = dict(stats)
+                entry["pool_size"] = len(self._pools.get(mechanism, []))
+                checkouts = stats["hits"] + stats["misses"]
+                entry["hit_ratio"] = stats["hits"] / checkouts if checkouts else 0.0
+                if stats["parses"]:
+                    avg_parse = stats["parse_time_s"] / stats["parses"]
+                    entry["estimated_time_saved_s"] = max(
+                        0.0, checkouts * avg_parse - stats["parse_time_s"] - stats["clone_time_s"]
+                    )
+                report[mechanism] = entry
+            return report
+
+
+def mechanism_path(mechanism: str = DEFAULT_MECHANISM) -> str:
+    """Resolves a mechanism name to the file Cantera would load, searching Cantera's data directories."""
+    if os.path.isfile(mechanism):
+        return os.path.abspath(mechanism)
+    for directory in ct.get_data_directories():
+        candidate = os.path.join(directory, mechanism)
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    raise FileNotFoundError(f"Mechanism file '{mechanism}' not found in Cantera data directories.")
+
+
+_mechanism_hashes = {}
+
+
+def mechanism_hash(mechanism: str = DEFAULT_MECHANISM) -> str:
+    """Returns the SHA-256 of a mechanism file (computed once per process), used to version derived caches."""
+    if mechanism not in _mechanism_hashes:
+        with open(mechanism_path(mechanism), "rb") as f:
+            _mechanism_hashes[mechanism] = hashlib.sha256(f.read()).hexdigest()
+    return _mechanism_hashes[mechanism]
+
+
+# Module-level registry shared by every Streamlit session in this process.
+mechanism_registry = MechanismRegistry()
@@ -0,0 +1,122 @@
+# --- NASA-7 Polynomial Property Engine ---
+# Standard-state species properties evaluated directly from the NASA-7 coefficients of the
+# loaded mechanism. The coefficients of every species are packed into NumPy arrays once, so
+# H, S, G and Cp for many species at many temperatures come out of a few array operations
+# instead of setting a full Cantera gas state for each (species, temperature) pair.
+
+import threading
+
+import cantera as ct
+import numpy as np
+
+from mechanisms import DEFAULT_MECHANISM, mechanism_registry
+
+
+class NasaPolynomialTable:
+    """
+    Array-backed NASA-7 coefficients for all species of a mechanism.
+
+    Args:
+        species_names (list): Names of the species, in table order.
+        coeffs (np.ndarray): Array of shape (n_species, 2, 7) holding the low- and
+                             high-temperature coefficients a1..a7 (index 0 = low, 1 = high).
+        t_mid (np.ndarray): Switch-over temperature of each species in Kelvin.
+        t_min (np.ndarray): Lower validity limit of each species in Kelvin.
+        t_max (np.ndarray): Upper validity limit of each species in Kelvin.
+        reference_pressure (float): Standard-state pressure of the polynomials in Pascals.
+    """
+
+    def __init__(self, species_names: list, coeffs: np.ndarray, t_mid: np.ndarray, t_min: np.ndarray,
+                 t_max: np.ndarray, reference_pressure: float):
+        self.species_names = list(species_names)
+        self.coeffs = coeffs
+        self.t_mid = t_mid
+        self.t_min = t_min
+        self.t_max = t_max
+        self.reference_pressure = reference_pressure
+        self._index = {name: i for i, name in enumerate(self.species_names)}
+        self._index_upper = {name.upper(): i for i, name in enumerate(self.species_names)}
+
+    @classmethod
+    def from_solution(cls, gas: ct.Solution) -> "NasaPolynomialTable":
+        """Builds the table from every species of a Solution that uses NASA-7 (NasaPoly2) thermo."""
+        names, coeffs, t_mid, t_min, t_max = [], [], [], [], []
+        reference_pressure = None
+        for species in gas.species():
+            thermo = species.thermo
+            if not isinstance(thermo, ct.NasaPoly2):
+                continue  # Other parameterizations are left to Cantera
+            c = thermo.coeffs  # [T_mid, high a1..a7, low a1..a7]
+            names.append(species.name)
+            coeffs.append([c[8:15], c[1:8]])
+            t_mid.append(c[0])
+            t_min.append(thermo.min_temp)
+            t_max.append(thermo.max_temp)
+            reference_pressure = thermo.reference_pressure
+        return cls(names, np.array(coeffs, dtype=float), np.array(t_mid), np.array(t_min), np.array(t_max),
+                   reference_pressure or ct.one_atm)
+
+    def species_index(self, name: str) -> int:
+        """Returns the table row of a species (case-insensitive fallback), raising KeyError if absent."""
+        if name in self._index:
+            return self._index[name]
+        if name.upper() in self._index_upper:
+            return self._index_upper[name.upper()]
+        raise KeyError(f"Species '{name}' has no NASA-7 data in the loaded mechanism.")
+
+    def evaluate(self, species_names: list, temperatures, pressure: float = None) -> dict:
+        """
+        Evaluates molar properties of pure ideal-gas species.
+
+        Args:
+            species_names (list): Species to evaluate.
+            temperatures: Temperatures in Kelvin (scalar or 1-D array).
+            pressure (float, optional): Pressure in Pascals; defaults to the reference pressure.
+                                        Only entropy and Gibbs energy depend on it.
+
+        Returns:
+            dict: Arrays of shape (n_species, n_temperatures) for "cp" and "s" in J/kmol-K and
+                  "h" and "g" in J/kmol, plus an "in_range" boolean mask of the polynomial validity.
+        """
+        rows = np.array([self.species_index(name) for name in species_names], dtype=int)
+        T = np.atleast_1d(np.asarray(temperatures, dtype=float))
+        if pressure is None:
+            pressure = self.reference_pressure
+
+        # Pick the low/high coefficient set per (species, temperature): shape (n_species, n_T, 7).
+        # T_mid itself takes the low set, as in Cantera
+        high = T[None, :] > self.t_mid[rows, None]
+        a = np.where(high[:, :, None], self.coeffs[rows, 1][:, None, :], self.coeffs[rows, 0][:, None, :])
+
+        T2, T3, T4 = T * T, T ** 3, T ** 4
+        a1, a2, a3, a4, a5, a6, a7 = (a[:, :, i] for i in range(7))
+
+        cp_R = a1 + a2 * T + a3 * T2 + a4 * T3 + a5 * T4
+        h_RT = a1 + a2 * T / 2 + a3 * T2 / 3 + a4 * T3 / 4 + a5 * T4 / 5 + a6 / T
+        s_R = a1 * np.log(T) + a2 * T + a3 * T2 / 2 + a4 * T3 / 3 + a5 * T4 / 4 + a7
+        s_R = s_R - np.log(pressure / self.reference_pressure)
+
+        R = ct.gas_constant
+        h = h_RT * R * T
+        s = s_R * R
+        return {
+            "cp": cp_R * R,
+            "h": h,
+            "s": s,
+            "g": h - T * s,
+            "in_range": (T[None, :] >= self.t_min[rows, None]) & (T[None, :] <= self.t_max[rows, None]),
+        }
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_nasa_table(mechanism: str = DEFAULT_MECHANISM) -> NasaPolynomialTable:
+    """Returns the NASA-7 table of a mechanism, building it once per process."""
+    with _tables_lock:
+        table = _tables.get(mechanism)
+        if table is None:
+            table = NasaPolynomialTable.from_solution(mechanism_registry.get_template(mechanism))
+            _tables[mechanism] = table
+        return table
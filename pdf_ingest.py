@@ -0,0 +1,197 @@
+# --- Parallel, Cached PDF Text Extraction ---
+# Extracts the text of uploaded PDFs in page batches spread over worker processes (PyPDF2 is
+# pure Python, so threads would serialize on the GIL) and caches the extracted pages by content
+# hash on disk so a re-uploaded file is never parsed twice. Extraction runs on a background thread
+# and reports its progress; the Streamlit script still waits for it (the question needs the text),
+# but it keeps a progress bar moving and can be stopped while a 300-page manual is read.
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import PyPDF2
+
+from tool_cache import CACHE_DIR
+from worker_pool import process_context
+
+
+PDF_CACHE_DIR = os.path.join(CACHE_DIR, "pdf_text")
+PAGES_PER_TASK = 8
+# Documents with fewer pages are extracted in the calling thread; process start-up would cost more
+MIN_PAGES_FOR_PROCESSES = 24
+MAX_CACHED_DOCUMENTS = 16
+
+
+def _extract_pages(reader: PyPDF2.PdfReader, start: int, stop: int) -> list:
+    """Extracts the text of pages [start, stop)."""
+    pages = []
+    for page_number in range(start, stop):
+        try:
+            pages.append(reader.pages[page_number].extract_text() or "")
+        except Exception:
+            pages.append("")  # One damaged page should not lose the rest of the document
+    return pages
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list:
+    """Worker-process entry point: opens the PDF at path and extracts pages [start, stop)."""
+    return _extract_pages(PyPDF2.PdfReader(path), start, stop)
+
+
+class PdfIngestor:
+    """
+    Extracts and caches the text of PDF documents.
+
+    Args:
+        cache_dir (str): Directory of the on-disk page-text cache.
+        max_workers (int): Worker processes for large documents (defaults to the CPU count).
+        pages_per_task (int): Pages extracted per worker task.
+    """
+
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR, max_workers: int = None, pages_per_task: int = PAGES_PER_TASK):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        os.makedirs(cache_dir, exist_ok=True)
+        self._documents = OrderedDict()  # sha256 -> {"page_count": int, "pages": list (None = not extracted)}
+        self._lock = threading.Lock()
+        self._processes = None
+        self._threads = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf-ingest")
+        self._stats = {"documents": 0, "cache_hits": 0, "pages_extracted": 0, "extract_time_s": 0.0}
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # Not forked: this pool is created inside the multithreaded Streamlit process
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_context())
+        return self._processes
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest + ".json")
+
+    def _load(self, digest: str):
+        with self._lock:
+            document = self._documents.get(digest)
+            if document is not None:
+                self._documents.move_to_end(digest)
+                return document
+        try:
+            with open(self._cache_path(digest), "r", encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(digest, document)
+        return document
+
+    def _remember(self, digest: str, document: dict) -> None:
+        with self._lock:
+            self._documents[digest] = document
+            self._documents.move_to_end(digest)
+            while len(self._documents) > MAX_CACHED_DOCUMENTS:
+                self._documents.popitem(last=False)
+
+    def _store(self, digest: str, document: dict) -> None:
+        self._remember(digest, document)
+        tmp_path = self._cache_path(digest) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+        os.replace(tmp_path, self._cache_path(digest))
+
+    def extract(self, data: bytes, progress: dict = None) -> dict:
+        """
+        Returns the text of a PDF, page by page.
+
+        Args:
+            data (bytes): The PDF file contents.
+            progress (dict, optional): Updated with "pages_done" and "page_count" while extracting.
+
+        Returns:
+            dict: {"sha256", "page_count", "pages" (text of every page), "cached" (no page had to be parsed)}
+
+        Raises:
+            PyPDF2.errors.PdfReadError: If the file is not a readable PDF.
+        """
+        started = time.perf_counter()
+        digest = hashlib.sha256(data).hexdigest()
+        progress = progress if progress is not None else {}
+        document = self._load(digest)
+        reader = None
+        if document is None:
+            reader = PyPDF2.PdfReader(io.BytesIO(data))
+            page_count = len(reader.pages)
+            document = {"page_count": page_count, "pages": [None] * page_count}
+        progress.update(page_count=document["page_count"], pages_done=0)
+
+        pages = document["pages"]
+        extracted = 0
+        missing = [i for i, text in enumerate(pages) if text is None]
+        if missing:
+            # Small documents are extracted in this thread. Large ones are split into a few large
+            # batches per worker, since every batch has to re-open the PDF.
+            use_processes = len(missing) >= MIN_PAGES_FOR_PROCESSES and self.max_workers > 1
+            batch_size = max(self.pages_per_task, -(-len(missing) // (self.max_workers * 2))) if use_processes else self.pages_per_task
+            batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            futures = []
+            if use_processes:
+                # Workers read the file from disk instead of receiving a pickled copy per batch
+                source = os.path.join(self.cache_dir, f"{digest}.{threading.get_ident()}.pdf")
+                with open(source, "wb") as f:
+                    f.write(data)
+            elif reader is None:
+                reader = PyPDF2.PdfReader(io.BytesIO(data))
+            try:
+                if use_processes:
+                    futures = [self._process_pool().submit(_extract_page_range, source, batch[0], batch[-1] + 1)
+                               for batch in batches]
+                for index, batch in enumerate(batches):
+                    texts = futures[index].result() if use_processes else _extract_pages(reader, batch[0], batch[-1] + 1)
+                    for page_number, text in zip(range(batch[0], batch[-1] + 1), texts):
+                        if pages[page_number] is None:
+                            pages[page_number] = text
+                            extracted += 1
+                    progress["pages_done"] = sum(text is not None for text in pages)
+            finally:
+                if use_processes:
+                    for future in futures:
+                        future.cancel()  # Only still-queued batches of a failed extraction
+                    os.remove(source)
+            self._store(digest, document)
+        progress["pages_done"] = document["page_count"]
+
+        with self._lock:
+            self._stats["documents"] += 1
+            self._stats["cache_hits"] += int(extracted == 0)
+            self._stats["pages_extracted"] += extracted
+            self._stats["extract_time_s"] += time.perf_counter() - started
+        return {
+            "sha256": digest,
+            "page_count": document["page_count"],
+            "pages": list(pages),
+            "cached": extracted == 0,
+        }
+
+    def submit(self, data: bytes, progress: dict = None):
+        """Runs extract() on a background thread and returns its Future."""
+        return self._threads.submit(self.extract, data, progress)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes and background threads."""
+        if self._processes is not None:
+            self._processes.shutdown(cancel_futures=True)
+            self._processes = None
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = dict(self._stats)
+            report["extract_time_s"] = round(report["extract_time_s"], 4)
+            report["documents_in_memory"] = len(self._documents)
+            return report
+
+
+# Module-level ingestor shared by every Streamlit session in this process.
+pdf_ingestor = PdfIngestor()
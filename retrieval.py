@@ -0,0 +1,161 @@
+# --- Lexical Retrieval over Long Texts ---
+# Splits long documents (Wikipedia articles, uploaded files) into section-aware chunks and
+# ranks them against a question with BM25, so only the relevant part of a document is sent
+# to the model. Indexes are cached by the caller-supplied key and reused by follow-up questions.
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+
+DEFAULT_CHUNK_CHARS = 1200
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how in into is it its of on or
+than that the their them then there these this to was were what when where which who why
+will with about also any more most other some such used using
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercases and splits text into word tokens, dropping common English stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model-token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def chunk_text(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> list:
+    """
+    Splits text into chunks of at most max_chars, keeping paragraphs together and
+    tagging each chunk with the "### " section heading it falls under.
+
+    Returns:
+        list: Dicts with "section", "text" and "position" (order in the document).
+    """
+    chunks = []
+    section = "Introduction"
+    buffer = []
+    size = 0
+
+    def flush():
+        nonlocal buffer, size
+        if buffer:
+            chunks.append({"section": section, "text": "\n\n".join(buffer), "position": len(chunks)})
+        buffer, size = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if paragraph.startswith("### "):
+            flush()
+            section = paragraph[4:].strip() or section
+            continue
+        # Paragraphs longer than a chunk are cut on sentence boundaries where possible
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(". ", 0, max_chars)
+            cut = cut + 1 if cut > max_chars // 2 else max_chars
+            flush()
+            buffer, size = [paragraph[:cut].strip()], cut
+            flush()
+            paragraph = paragraph[cut:].strip()
+        if size + len(paragraph) > max_chars:
+            flush()
+        buffer.append(paragraph)
+        size += len(paragraph) + 2
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a list of chunks produced by chunk_text().
+
+    Args:
+        chunks (list): Chunk dicts with "section" and "text".
+        k1 (float): Term-frequency saturation.
+        b (float): Length normalization.
+    """
+
+    def __init__(self, chunks: list, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        # Section headings are indexed with the body so "Safety" questions find the Safety section
+        self._term_freqs = [Counter(tokenize(f"{c['section']} {c['text']}")) for c in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if chunks else 0.0
+        doc_freq = Counter()
+        for tf in self._term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: str) -> list:
+        """Returns the BM25 score of every chunk for the query."""
+        terms = tokenize(query)
+        results = []
+        for tf, length in zip(self._term_freqs, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+    def search(self, query: str, top_k: int = 5, token_budget: int = None, always_include: tuple = ()) -> list:
+        """
+        Returns the best-matching chunks, in document order.
+
+        Args:
+            query (str): The question to match.
+            top_k (int): Maximum number of chunks.
+            token_budget (int, optional): Maximum total estimated tokens of the returned chunks.
+            always_include (tuple): Positions of chunks to include first (e.g. the lead section).
+
+        Returns:
+            list: Chunk dicts with an added "score".
+        """
+        scores = self.scores(query)
+        ranked = sorted(range(len(self.chunks)), key=lambda i: scores[i], reverse=True)
+        ranked = [i for i in ranked if scores[i] > 0]
+        selected = []
+        used = 0
+        for i in list(always_include) + ranked:
+            if i in selected or i >= len(self.chunks) or len(selected) >= top_k:
+                continue
+            cost = estimate_tokens(self.chunks[i]["text"])
+            if token_budget is not None and used + cost > token_budget:
+                continue
+            selected.append(i)
+            used += cost
+        return [dict(self.chunks[i], score=round(scores[i], 3)) for i in sorted(selected)]
+
+
+class IndexCache:
+    """Small thread-safe LRU of BM25 indexes keyed on a document identifier."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> BM25Index:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = BM25Index(chunk_text(text, max_chars))
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
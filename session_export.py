@@ -0,0 +1,168 @@
+# --- Session Export and Import ---
+# Writes a stored chat session to a zip archive entry by entry, reading the history from the
+# session store one message at a time, so exporting a long session needs memory for one message
+# (or one image) rather than the whole session. The archive holds a manifest, the messages as
+# NDJSON, and separate files for tool outputs, images and uploaded documents; importing it
+# restores the session under a new id.
+
+import hashlib
+import json
+import time
+import uuid
+import zipfile
+import zlib
+
+from image_store import image_blob_store, is_blob_digest
+from session_store import session_store
+
+
+EXPORT_FORMAT = "catalyst-mind-session"
+EXPORT_VERSION = 1
+# Largest single archive entry accepted on import (guards against zip bombs)
+MAX_IMPORT_ENTRY_BYTES = 64 * 1024 * 1024
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png"}
+
+
+def _tool_output_entry(position: int, index: int) -> str:
+    return f"tool_outputs/{position:06d}_{index}.json"
+
+
+def export_session(session_id: str, path: str) -> dict:
+    """
+    Writes a stored session to a zip archive.
+
+    Args:
+        session_id (str): A session in the session store.
+        path (str): Path of the archive to create.
+
+    Returns:
+        dict: The archive's manifest.
+
+    Raises:
+        KeyError: If the session does not exist.
+    """
+    info = session_store.session_info(session_id)
+    if info is None:
+        raise KeyError(f"Unknown session '{session_id}'")
+
+    manifest = {
+        "format": EXPORT_FORMAT,
+        "version": EXPORT_VERSION,
+        "exported_at": time.time(),
+        "session_id": session_id,
+        "title": info["title"],
+        "created_at": info["created_at"],
+        "summaries": info["summaries"],
+        "messages": 0,
+        "tool_outputs": 0,
+        "images": {},
+        "documents": [],
+    }
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        # A zip archive takes one entry at a time: the history is read twice, once for the
+        # messages and once for the tool outputs and images they point to
+        with archive.open("messages.ndjson", "w") as messages_file:
+            for position, message in enumerate(session_store.iter_messages(session_id)):
+                parts = [{"tool_output_file": _tool_output_entry(position, index)}
+                         if isinstance(part, dict) and "tool_output" in part else part
+                         for index, part in enumerate(message["parts"])]
+                messages_file.write((json.dumps({"role": message["role"], "parts": parts}, default=str) + "\n").encode("utf-8"))
+                manifest["messages"] += 1
+        for position, message in enumerate(session_store.iter_messages(session_id)):
+            for index, part in enumerate(message["parts"]):
+                if isinstance(part, dict) and "tool_output" in part:
+                    archive.writestr(_tool_output_entry(position, index), json.dumps(part["tool_output"], indent=2, default=str))
+                    manifest["tool_outputs"] += 1
+                elif isinstance(part, dict) and "image_ref" in part and part["image_ref"] not in manifest["images"]:
+                    data = image_blob_store.get(part["image_ref"])
+                    entry = None  # Evicted from the blob store: the archive keeps the reference only
+                    if data is not None:
+                        entry = f"images/{part['image_ref']}.{IMAGE_EXTENSIONS.get(part['mime_type'], 'bin')}"
+                        archive.writestr(entry, data, compress_type=zipfile.ZIP_STORED)  # Already compressed
+                    manifest["images"][part["image_ref"]] = entry
+        for document in session_store.iter_documents(session_id):
+            entry = f"documents/{document['sha256']}.txt"
+            archive.writestr(entry, document["text"])
+            manifest["documents"].append({"name": document["name"], "turn": document["turn"], "file": entry})
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _entry_info(archive: zipfile.ZipFile, name: str) -> zipfile.ZipInfo:
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        raise ValueError(f"Not a session archive: {name} is missing")
+    if info.file_size > MAX_IMPORT_ENTRY_BYTES:
+        raise ValueError(f"Archive entry '{name}' is too large ({info.file_size} bytes)")
+    return info
+
+
+def _read_entry(archive: zipfile.ZipFile, name: str) -> bytes:
+    return archive.read(_entry_info(archive, name))
+
+
+def import_session(file, owner: str) -> str:
+    """
+    Restores a session from an archive written by export_session().
+
+    Args:
+        file: Path or binary file object of the archive.
+        owner (str): Owner token the restored session belongs to.
+
+    Returns:
+        str: Id of the new session.
+
+    Raises:
+        ValueError: If the file is not a session archive of a supported version, or is malformed.
+    """
+    try:
+        with zipfile.ZipFile(file) as archive:
+            return _import_archive(archive, owner)
+    except ValueError:
+        raise
+    except KeyError as e:
+        raise ValueError(f"Malformed session archive: field {e} is missing")
+    except (zipfile.BadZipFile, zlib.error, EOFError, TypeError, AttributeError) as e:
+        # Corrupt members and entries of the wrong shape all mean the upload is not usable
+        raise ValueError(f"Malformed session archive: {e}")
+
+
+def _import_archive(archive: zipfile.ZipFile, owner: str) -> str:
+    manifest = json.loads(_read_entry(archive, "manifest.json"))
+    if not isinstance(manifest, dict) or manifest.get("format") != EXPORT_FORMAT or manifest.get("version", 0) > EXPORT_VERSION:
+        raise ValueError("Unsupported session archive format or version")
+
+    # Images go back into the blob store first; their content hash is their reference, and a
+    # reference that is not one would otherwise be joined onto the blob directory as a path
+    for image_ref, entry in manifest.get("images", {}).items():
+        if not is_blob_digest(image_ref):
+            raise ValueError(f"Invalid image reference {image_ref!r} in the archive")
+        if entry and image_blob_store.put(_read_entry(archive, entry)) != image_ref:
+            raise ValueError(f"Image '{entry}' does not match its reference")
+
+    messages = []
+    with archive.open(_entry_info(archive, "messages.ndjson")) as messages_file:
+        for line in messages_file:
+            message = json.loads(line)
+            for part in message["parts"]:
+                if isinstance(part, dict) and "image_ref" in part and not is_blob_digest(part["image_ref"]):
+                    raise ValueError(f"Invalid image reference {part['image_ref']!r} in the archive")
+            message["parts"] = [
+                {"tool_output": json.loads(_read_entry(archive, part["tool_output_file"]))}
+                if isinstance(part, dict) and "tool_output_file" in part else part
+                for part in message["parts"]
+            ]
+            messages.append(message)
+    documents = []
+    for document in manifest.get("documents", []):
+        text = _read_entry(archive, document["file"]).decode("utf-8")
+        documents.append((document["name"], text, hashlib.sha256(text.encode("utf-8")).hexdigest(), document["turn"]))
+
+    # Everything was read and checked: nothing of a malformed archive is left in the store
+    session_id = uuid.uuid4().hex
+    session_store.save_messages(session_id, messages, owner=owner)
+    session_store.save_summaries(session_id, manifest.get("summaries", {}))
+    for name, text, digest, turn in documents:
+        session_store.save_document(session_id, name, text, digest, turn)
+    return session_id
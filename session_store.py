@@ -0,0 +1,230 @@
+# --- Durable Chat Sessions ---
+# Chat sessions (messages, turn summaries and uploaded documents) are written to a local SQLite
+# database as they grow, so a session survives a server restart and can be reopened from its URL
+# or the session list. Messages are appended incrementally: a turn writes only its new messages,
+# never the whole history. Images are stored as references to the image blob store. Every session
+# belongs to an owner token (one per browser, see app.py); listing and loading are scoped to it so
+# one visitor never sees another's chats. Reopening a session reads only its most recent messages;
+# earlier ones are read back from the store when they are shown.
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from tool_cache import CACHE_DIR
+
+
+SESSION_DB_PATH = os.environ.get("CATALYST_MIND_SESSION_DB", os.path.join(CACHE_DIR, "sessions.sqlite"))
+TITLE_CHARS = 60
+_OWNER_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def is_owner_token(value) -> bool:
+    """True if value has the form of an owner token (a uuid4 hex string)."""
+    return isinstance(value, str) and _OWNER_PATTERN.fullmatch(value) is not None
+
+
+class SessionStore:
+    """
+    SQLite store of chat sessions, safe to share between Streamlit sessions (one connection per thread).
+
+    Args:
+        path (str): Path of the SQLite database file.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL DEFAULT '',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    summaries TEXT NOT NULL DEFAULT '{}',
+                    owner TEXT NOT NULL DEFAULT ''
+                )""")
+            # Databases written before sessions had owners: their sessions stay unowned and cannot be opened
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    parts TEXT NOT NULL,
+                    PRIMARY KEY (session_id, position)
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    session_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    turn INTEGER NOT NULL,
+                    PRIMARY KEY (session_id, sha256)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_owner ON sessions (owner, updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_messages(self, session_id: str, messages: list, start: int = 0, owner: str = "", offset: int = 0) -> int:
+        """
+        Writes the messages from position start on of a session's history (earlier messages are already stored).
+
+        Args:
+            session_id (str): The session.
+            messages (list): The chat history held in memory: the whole history, or its most recent
+                             messages from position offset on (as returned by load()).
+            start (int): Number of leading messages that were saved before.
+            owner (str): Owner token recorded when the session is first stored.
+            offset (int): Position of messages[0] in the session's history.
+
+        Returns:
+            int: Number of messages now stored, to pass as start on the next call.
+
+        Raises:
+            ValueError: If owner is empty (an unowned session could be opened by anyone).
+        """
+        if not owner:
+            raise ValueError("A session must be saved with its owner token")
+        now = time.time()
+        count = offset + len(messages)
+        rows = [(session_id, position, message["role"], json.dumps(message["parts"], default=str))
+                for position, message in enumerate(messages[max(start - offset, 0):], start=max(start, offset))]
+        title = next((part["text"][:TITLE_CHARS] for message in messages if message["role"] == "user"
+                      for part in message["parts"] if isinstance(part, dict) and part.get("text")), "")
+        with self._connection() as conn:
+            # The title comes from the first question; a window of later messages does not change it
+            conn.execute(
+                "INSERT INTO sessions (session_id, title, created_at, updated_at, message_count, owner) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET title = CASE WHEN sessions.title = '' THEN excluded.title "
+                "ELSE sessions.title END, updated_at = excluded.updated_at, message_count = excluded.message_count",
+                (session_id, title, now, now, count, owner),
+            )
+            conn.executemany("INSERT OR REPLACE INTO messages (session_id, position, role, parts) VALUES (?, ?, ?, ?)", rows)
+            # A history that shrank (e.g. replaced by an import) leaves no stale tail behind
+            conn.execute("DELETE FROM messages WHERE session_id = ? AND position >= ?", (session_id, count))
+        return count
+
+    def save_summaries(self, session_id: str, summaries: dict) -> None:
+        """Stores the cached turn summaries of the session's compaction state."""
+        with self._connection() as conn:
+            conn.execute("UPDATE sessions SET summaries = ? WHERE session_id = ?", (json.dumps(summaries), session_id))
+
+    def save_document(self, session_id: str, name: str, text: str, sha256: str, turn: int) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (session_id, sha256, name, text, turn) VALUES (?, ?, ?, ?, ?)",
+                (session_id, sha256, name, text, turn),
+            )
+
+    def _window_start(self, session_id: str, info: dict, recent_messages: int) -> int:
+        """
+        Position of the first message to load: a turn start at least recent_messages from the end,
+        and no later than the first turn that has no summary yet (its messages are still needed
+        to summarize it once it leaves the verbatim window).
+        """
+        conn = self._connection()
+        if recent_messages is None or info["message_count"] <= recent_messages:
+            return 0
+        turn_start = conn.execute(
+            "SELECT MAX(position) FROM messages WHERE session_id = ? AND role = 'user' AND position <= ?",
+            (session_id, info["message_count"] - recent_messages)
+        ).fetchone()[0]
+        if not info["summaries"]:
+            return 0
+        first_unsummarized = conn.execute(
+            "SELECT MIN(position) FROM messages WHERE session_id = ? AND role = 'user' AND position > ?",
+            (session_id, max(info["summaries"]))
+        ).fetchone()[0]
+        return min(turn_start or 0, info["message_count"] if first_unsummarized is None else first_unsummarized)
+
+    def load(self, session_id: str, owner: str, recent_messages: int = None):
+        """
+        Reads a stored session of an owner.
+
+        Args:
+            session_id (str): The session.
+            owner (str): Owner token of the visitor opening it.
+            recent_messages (int, optional): Read only (about) this many of the most recent messages,
+                                             starting at a turn boundary; None reads them all.
+
+        Returns:
+            dict or None: {"messages", "offset" (position of the first message read), "message_count"
+                          (messages stored), "summaries" (keyed by turn start index), "documents" (list of
+                          {"name", "sha256", "text", "turn"})}, or None if the session does not exist
+                          or belongs to another owner (or to none).
+        """
+        info = self.session_info(session_id)
+        if info is None or not owner or info["owner"] != owner:
+            return None
+        offset = self._window_start(session_id, info, recent_messages)
+        return {
+            "messages": list(self.iter_messages(session_id, start=offset)),
+            "offset": offset,
+            "message_count": info["message_count"],
+            "summaries": info["summaries"],
+            "documents": list(self.iter_documents(session_id)),
+        }
+
+    def session_info(self, session_id: str):
+        """Returns {"title", "created_at", "updated_at", "message_count", "summaries", "owner"} of a session, or None."""
+        row = self._connection().execute(
+            "SELECT title, created_at, updated_at, message_count, summaries, owner FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        # JSON object keys are strings; the compactor keys summaries by message index
+        return {"title": row[0], "created_at": row[1], "updated_at": row[2], "message_count": row[3],
+                "summaries": {int(start): summary for start, summary in json.loads(row[4]).items()}, "owner": row[5]}
+
+    def iter_messages(self, session_id: str, start: int = 0, stop: int = None):
+        """Yields the messages of a session (from position start up to stop) one at a time, without loading the whole history."""
+        cursor = self._connection().execute(
+            "SELECT role, parts FROM messages WHERE session_id = ? AND position >= ? AND position < ? ORDER BY position",
+            (session_id, start, stop if stop is not None else 2 ** 62))
+        for role, parts in cursor:
+            yield {"role": role, "parts": json.loads(parts)}
+
+    def iter_documents(self, session_id: str):
+        """Yields the documents of a session as {"name", "sha256", "text", "turn"}."""
+        cursor = self._connection().execute(
+            "SELECT name, sha256, text, turn FROM documents WHERE session_id = ? ORDER BY turn", (session_id,))
+        for name, sha256, text, turn in cursor:
+            yield {"name": name, "sha256": sha256, "text": text, "turn": turn}
+
+    def list_sessions(self, owner: str, limit: int = 10) -> list:
+        """Returns an owner's most recently updated sessions as {"session_id", "title", "updated_at", "message_count"}."""
+        if not owner:
+            return []
+        rows = self._connection().execute(
+            "SELECT session_id, title, updated_at, message_count FROM sessions WHERE owner = ? "
+            "ORDER BY updated_at DESC LIMIT ?", (owner, limit)
+        ).fetchall()
+        return [{"session_id": r[0], "title": r[1], "updated_at": r[2], "message_count": r[3]} for r in rows]
+
+    def delete(self, session_id: str) -> None:
+        with self._connection() as conn:
+            for table in ("messages", "documents", "sessions"):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+
+# Module-level store shared by every Streamlit session in this process (and, via the file, across processes).
+session_store = SessionStore()
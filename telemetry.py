@@ -0,0 +1,147 @@
+# --- Per-Turn Timing and Token Instrumentation ---
+# Every chat turn is traced as a list of named timing spans (upload parsing, message building,
+# each model call, each round of tool execution, rendering) plus the token counts reported by
+# the API. Finished traces are appended to a JSONL log and can be summarized as p50/p95 per span.
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from tool_cache import CACHE_DIR
+
+
+TRACE_LOG_PATH = os.environ.get("CATALYST_MIND_TRACE_LOG", os.path.join(CACHE_DIR, "turn_traces.jsonl"))
+
+
+class TurnTrace:
+    """
+    Timing spans and token counts of one chat turn.
+
+    Args:
+        session_id (str): Identifier of the chat session the turn belongs to.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.spans = []
+        self.tokens = {}
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Times the enclosed block as a span; extra keyword arguments are stored with it."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - started, start_s=started - self._started, **attributes)
+
+    def add_span(self, name: str, duration_s: float, start_s: float = None, **attributes) -> None:
+        """Records a span measured elsewhere."""
+        span = {"name": name, "duration_s": round(duration_s, 4)}
+        if start_s is not None:
+            span["start_s"] = round(start_s, 4)
+        span.update(attributes)
+        self.spans.append(span)
+
+    def add_tokens(self, **counts) -> None:
+        """Adds to the turn's token counters (e.g. input=..., cached_input=..., output=...)."""
+        for key, value in counts.items():
+            self.tokens[key] = self.tokens.get(key, 0) + (value or 0)
+
+    def record(self) -> dict:
+        """Returns the finished trace as a JSON-serializable dict."""
+        return {
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "total_s": round(time.perf_counter() - self._started, 4),
+            "spans": self.spans,
+            "tokens": self.tokens,
+        }
+
+
+class TraceLog:
+    """Append-only JSONL file of turn traces, safe to share between sessions of one process."""
+
+    def __init__(self, path: str = TRACE_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def read(self, session_id: str = None) -> list:
+        """Returns the logged traces, optionally only those of one session."""
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by a crash
+                    if session_id is None or record.get("session_id") == session_id:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+
+def percentile(values: list, q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_traces(records: list) -> dict:
+    """
+    Summarizes turn traces as percentiles per span name.
+
+    Spans with the same name in one turn (e.g. two renders) are added together first.
+
+    Returns:
+        dict: {"turns": int, "spans": {name: {"count", "p50_s", "p95_s", "max_s"}},
+               "tokens": {counter: {"p50", "p95", "total"}}}
+    """
+    per_span = {"turn_total": [r["total_s"] for r in records]}
+    per_token = {}
+    for record in records:
+        turn_spans = {}
+        for span in record.get("spans", []):
+            turn_spans[span["name"]] = turn_spans.get(span["name"], 0.0) + span["duration_s"]
+        for name, duration in turn_spans.items():
+            per_span.setdefault(name, []).append(duration)
+        for key, value in record.get("tokens", {}).items():
+            per_token.setdefault(key, []).append(value)
+
+    return {
+        "turns": len(records),
+        "spans": {
+            name: {
+                "count": len(values),
+                "p50_s": round(percentile(values, 50), 4),
+                "p95_s": round(percentile(values, 95), 4),
+                "max_s": round(max(values), 4),
+            }
+            for name, values in per_span.items() if values
+        },
+        "tokens": {
+            key: {"p50": percentile(values, 50), "p95": percentile(values, 95), "total": sum(values)}
+            for key, values in per_token.items()
+        },
+    }
+
+
+# Module-level log shared by every Streamlit session in this process.
+trace_log = TraceLog()
@@ -0,0 +1,11 @@
+# Tests import the application modules from the repository root, and every on-disk cache the
+# modules create at import time goes to a throwaway directory instead of the user's cache.
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_cache_dir = tempfile.mkdtemp(prefix="catalyst_mind_tests_")
+os.environ.setdefault("CATALYST_MIND_CACHE_DIR", _cache_dir)
+os.environ.setdefault("CATALYST_MIND_HTTP_CACHE_DIR", os.path.join(_cache_dir, "http"))
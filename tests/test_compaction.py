@@ -0,0 +1,43 @@
+# --- Conversation Compaction Tests ---
+# Requests must stay under the token budget both for the history and for the tool results added
+# at every step, and an over-long summary must lose whole turns rather than the middle of one.
+
+import json
+
+from compaction import ConversationCompactor, _estimate_message_tokens
+
+
+def _turn(index: int, words: int = 20) -> list:
+    return [
+        {"role": "user", "parts": [{"text": f"Question {index}: " + "flame temperature " * words}]},
+        {"role": "assistant", "parts": [{"text": f"Answer {index}: " + "about 2200 K " * words}]},
+    ]
+
+
+def test_over_long_summary_drops_whole_turns():
+    history = [message for index in range(40) for message in _turn(index)]
+    compactor = ConversationCompactor(keep_turns=1, token_budget=800)
+    api_messages, stats = compactor.build_request(history, {})
+
+    assert stats["estimated_tokens"] <= compactor.token_budget
+    summary = api_messages[0]["parts"][0]["text"].splitlines()[1:]
+    assert summary[0].startswith("- User: Question 0:")
+    assert "earlier turn(s) omitted" in summary[1]
+    # Every kept turn summary is whole, and they run up to the turn before the verbatim one
+    assert all(line.startswith("- User: Question") for line in summary[2:])
+    assert summary[-1].startswith("- User: Question 38:")
+
+
+def test_tool_results_are_trimmed_to_the_remaining_budget():
+    compactor = ConversationCompactor(token_budget=2000)
+    api_messages, _ = compactor.build_request(_turn(0)[:1], {})
+    small = {"status": "success", "T_K": 2225.3}
+    large = {"status": "success", "mole_fractions": {f"S{i}": 1.0 / (i + 1) for i in range(2000)}}
+
+    text, trimmed = compactor.tool_results_text([("small_tool", json.dumps(small), small)], api_messages)
+    assert not trimmed and json.dumps(small) in text
+
+    text, trimmed = compactor.tool_results_text([("large_tool", json.dumps(large), large)], api_messages)
+    api_messages.append({"role": "user", "parts": [{"text": text}]})
+    assert trimmed and "S0" in text
+    assert sum(_estimate_message_tokens(message) for message in api_messages) <= compactor.token_budget
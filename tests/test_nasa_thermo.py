@@ -0,0 +1,64 @@
+# --- NASA-7 Property Engine Tests ---
+# The vectorized property table must agree with Cantera's own species thermo on both sides of
+# each species' switch-over temperature, and the property curve tool must agree with Cantera's
+# gas state at non-standard pressure.
+
+import json
+
+import cantera as ct
+import numpy as np
+import pytest
+
+from nasa_thermo import get_nasa_table
+from tools import get_species_property_curves
+
+
+SPECIES = ["CO2", "H2O", "CH4", "O2", "N2", "OH", "H", "C2H4", "CH3OH"]
+
+
+@pytest.fixture(scope="module")
+def gas():
+    return ct.Solution("gri30.yaml")
+
+
+def _temperatures(thermo) -> np.ndarray:
+    """Points across the validity range, including just below and just above T_mid."""
+    t_mid = thermo.coeffs[0]
+    return np.concatenate([np.linspace(thermo.min_temp, thermo.max_temp, 25), [t_mid - 1e-6, t_mid, t_mid + 1e-6]])
+
+
+@pytest.mark.parametrize("name", SPECIES)
+def test_table_matches_cantera_species_thermo(gas, name):
+    thermo = gas.species(name).thermo
+    temperatures = _temperatures(thermo)
+    values = get_nasa_table("gri30.yaml").evaluate([name], temperatures)
+
+    np.testing.assert_allclose(values["cp"][0], [thermo.cp(T) for T in temperatures], rtol=1e-10)
+    np.testing.assert_allclose(values["h"][0], [thermo.h(T) for T in temperatures], rtol=1e-10, atol=1e-3)
+    np.testing.assert_allclose(values["s"][0], [thermo.s(T) for T in temperatures], rtol=1e-10)
+    assert values["in_range"].all()
+
+
+def test_both_coefficient_sets_are_exercised(gas):
+    table = get_nasa_table("gri30.yaml")
+    for name in SPECIES:
+        t_mid = table.t_mid[table.species_index(name)]
+        assert table.t_min[table.species_index(name)] < t_mid < table.t_max[table.species_index(name)]
+
+
+@pytest.mark.parametrize("pressure_pa", [101325.0, 5e6])
+def test_property_curves_match_cantera_gas_state(gas, pressure_pa):
+    result = json.loads(get_species_property_curves(["CO2", "H2O", "ch4"], 300.0, 3000.0, 50.0, pressure_pa))
+    assert result["status"] == "success"
+
+    for name, curves in result["species_properties"].items():
+        for i, T in enumerate(result["temperatures_K"]):
+            gas.TPX = T, pressure_pa, {name: 1.0}
+            assert curves["cp_kmol"][i] == pytest.approx(gas.cp_mole, rel=1e-6)
+            assert curves["enthalpy_kmol"][i] == pytest.approx(gas.enthalpy_mole, rel=1e-6, abs=1e2)
+            assert curves["entropy_kmol"][i] == pytest.approx(gas.entropy_mole, rel=1e-6)
+            assert curves["gibbs_kmol"][i] == pytest.approx(gas.gibbs_mole, rel=1e-6)
+
+
+def test_unknown_species_is_an_error():
+    assert json.loads(get_species_property_curves(["XYZ"]))["status"] == "error"
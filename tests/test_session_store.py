@@ -0,0 +1,63 @@
+# --- Session Store Tests ---
+# Sessions are only opened by their owner, and a reopened session reads only its recent messages:
+# the window must start at a turn, build the same request as the full history, and save new
+# messages at their positions in the whole session.
+
+import pytest
+
+from compaction import ConversationCompactor
+from session_store import SessionStore
+
+
+OWNER = "0123456789abcdef0123456789abcdef"
+GREETING = {"role": "assistant", "parts": [{"text": "Hello!"}]}
+
+
+def _history(turns: int) -> list:
+    history = [GREETING]
+    for index in range(turns):
+        history.append({"role": "user", "parts": [{"text": f"Question {index}"}]})
+        history.append({"role": "tool_output_display", "parts": [{"tool_output": {"status": "success", "T_K": index}}]})
+        history.append({"role": "assistant", "parts": [{"text": f"Answer {index}"}]})
+    return history
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / "sessions.sqlite"))
+
+
+def test_sessions_are_private_to_their_owner(store):
+    with pytest.raises(ValueError):
+        store.save_messages("unowned", _history(1))
+    store.save_messages("mine", _history(1), owner=OWNER)
+    with store._connection() as conn:  # A session stored before sessions had owners
+        conn.execute("UPDATE sessions SET owner = '' WHERE session_id = 'mine'")
+    assert store.load("mine", OWNER) is None
+    assert store.load("mine", "") is None
+    store.save_messages("theirs", _history(1), owner="f" * 32)
+    assert store.load("theirs", OWNER) is None
+
+
+def test_reopened_session_reads_only_its_recent_turns(store):
+    history = _history(30)
+    compactor = ConversationCompactor(keep_turns=4)
+    state = {}
+    expected, _ = compactor.build_request(history, state)
+    store.save_messages("s", history, owner=OWNER)
+    store.save_summaries("s", state["summaries"])
+
+    stored = store.load("s", OWNER, recent_messages=10)
+    assert stored["message_count"] == len(history)
+    assert stored["messages"][0]["role"] == "user"
+    assert len(stored["messages"]) < len(history)
+    assert stored["messages"] == history[stored["offset"]:]
+
+    window_state = {"summaries": stored["summaries"], "message_offset": stored["offset"]}
+    assert compactor.build_request(stored["messages"], window_state)[0] == expected
+
+    window = stored["messages"] + [{"role": "user", "parts": [{"text": "Question 30"}]}]
+    count = store.save_messages("s", window, stored["message_count"], owner=OWNER, offset=stored["offset"])
+    assert count == len(history) + 1
+    assert list(store.iter_messages("s")) == history + window[-1:]
+    assert store.session_info("s")["title"] == "Question 0"
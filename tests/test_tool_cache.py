@@ -0,0 +1,50 @@
+# --- Tool Result Cache Tests ---
+# Keys ignore execution options but follow the flame temperature tables a result may have been
+# read from, and a hit does not report the timing of the call that computed it.
+
+import json
+import shutil
+
+import pytest
+
+import tool_cache
+from aft_tables import AFT_TABLE_DIR, AftTableStore
+from tool_cache import ToolResultCache
+
+
+FLAME_ARGS = {"fuel": "CH4", "oxidizer": "air", "equivalence_ratio": 1.0,
+              "initial_temp_k": 300.0, "initial_pressure_pa": 101325.0}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ToolResultCache(str(tmp_path / "cache.sqlite"))
+
+
+def test_parallel_does_not_change_the_key(cache):
+    args = {"fuel": "CH4", "oxidizer": "air", "initial_temps_k": [1200, 1400], "initial_pressures_pa": 101325}
+    assert cache.make_key("calculate_ignition_delay", dict(args, parallel=True)) == \
+        cache.make_key("calculate_ignition_delay", dict(args, parallel=False))
+
+
+def test_hit_does_not_report_the_original_elapsed_time(cache):
+    result = json.dumps({"status": "success", "adiabatic_flame_temperature_K": 2225.5, "elapsed_s": 1.234})
+    cache.put("calculate_adiabatic_flame_temperature", FLAME_ARGS, result, 1.234)
+    assert json.loads(cache.get("calculate_adiabatic_flame_temperature", FLAME_ARGS)) == \
+        {"status": "success", "adiabatic_flame_temperature_K": 2225.5}
+
+
+def test_rebuilt_table_changes_the_key(cache, tmp_path, monkeypatch):
+    table_dir = tmp_path / "tables"
+    shutil.copytree(AFT_TABLE_DIR, table_dir)
+    monkeypatch.setattr(tool_cache, "aft_table_store", AftTableStore(str(table_dir)))
+    before = cache.make_key("calculate_adiabatic_flame_temperature", FLAME_ARGS)
+    other_tool = cache.make_key("get_species_molecular_weight", {"species_name": "CH4"})
+
+    sidecar = table_dir / "CH4_air.json"
+    metadata = json.loads(sidecar.read_text())
+    sidecar.write_text(json.dumps(dict(metadata, created_at=metadata["created_at"] + 1, max_error_K=0.5)))
+    tool_cache.aft_table_store.clear()
+
+    assert cache.make_key("calculate_adiabatic_flame_temperature", FLAME_ARGS) != before
+    assert cache.make_key("get_species_molecular_weight", {"species_name": "CH4"}) == other_tool
@@ -0,0 +1,49 @@
+# --- Tool Dispatcher Tests ---
+# A call must be stopped when the caller's time budget runs out, even when the tool's own limit
+# is longer, a budget that is already spent must not start a worker at all, and a network call
+# run on a thread must be abandoned at its limit.
+
+import json
+import time
+
+import pytest
+
+from tool_dispatch import TOOL_TIMEOUT_S, ToolDispatcher, available_tools
+from tool_cache import ToolResultCache
+from test_worker_pool import SLOW_ARGS
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    dispatcher = ToolDispatcher(max_threads=2, max_processes=1, cache=ToolResultCache(str(tmp_path / "cache.sqlite")))
+    yield dispatcher
+    dispatcher._workers.shutdown()
+
+
+def test_call_is_stopped_at_the_callers_time_limit(dispatcher):
+    assert TOOL_TIMEOUT_S["calculate_ignition_delay"] > 10
+    started = time.perf_counter()
+    record = dispatcher.submit("calculate_ignition_delay", SLOW_ARGS, time_limit_s=1.0).result()
+    assert time.perf_counter() - started < 10.0
+    assert record["stopped"] == "ToolTimeoutError"
+    assert json.loads(record["result"])["status"] == "error"
+
+
+def test_spent_budget_does_not_start_the_call(dispatcher):
+    record = dispatcher.submit("get_species_molecular_weight", {"species_name": "CH4"}, time_limit_s=0.0).result()
+    assert record["stopped"] == "ToolTimeoutError"
+    assert "time budget" in json.loads(record["result"])["message"]
+    assert dispatcher.stats()["workers"] == 0
+
+
+def test_network_call_is_abandoned_at_its_limit(dispatcher, monkeypatch):
+    def hanging_lookup(query):
+        time.sleep(3.0)
+        return json.dumps({"status": "success"})
+
+    monkeypatch.setitem(available_tools, "get_wikipedia_data", hanging_lookup)
+    monkeypatch.setitem(TOOL_TIMEOUT_S, "get_wikipedia_data", 0.5)
+    started = time.perf_counter()
+    record = dispatcher.submit("get_wikipedia_data", {"query": "Methane"}).result()
+    assert time.perf_counter() - started < 2.0
+    assert (record["executor"], record["stopped"]) == ("thread", "ToolTimeoutError")
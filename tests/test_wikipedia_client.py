@@ -0,0 +1,135 @@
+# --- Wikipedia Client Tests ---
+# Runs the pooled, cached client against the local stand-in server: cold versus warm latency,
+# ETag revalidation (in memory and from the on-disk cache), the parsed-article LRU and its keys,
+# and retries of transient server errors.
+
+import time
+
+import pytest
+import requests
+
+import wikipedia_client
+from wikipedia_client import WikipediaClient
+
+from wikipedia_stub import WikipediaStub
+
+
+PAGES = {
+    "Methane": ("Methane", "Methane is a chemical compound with the formula CH4."),
+    "methane": ("Methane", "Methane is a chemical compound with the formula CH4."),
+    "NaN": ("NaN", "NaN stands for not a number."),
+    "Nan": ("Nan", "Nan is a given name."),
+    "Ethane": ("Ethane", "Ethane is an organic compound with the formula C2H6."),
+    "Propane": ("Propane", "Propane is a three-carbon alkane."),
+}
+STUB_DELAY_S = 0.2
+
+
+@pytest.fixture
+def stub():
+    server = WikipediaStub(PAGES, delay_s=STUB_DELAY_S)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(stub, tmp_path):
+    return WikipediaClient(base_url=stub.base_url, cache_dir=str(tmp_path / "http"))
+
+
+def _timed(client, query):
+    started = time.perf_counter()
+    article = client.get_article(query)
+    return article, time.perf_counter() - started
+
+
+def test_warm_request_is_served_from_memory(client, stub):
+    cold, cold_s = _timed(client, "Methane")
+    warm, warm_s = _timed(client, "Methane")
+
+    assert cold["title"] == "Methane" and "formula CH4" in cold["article_text"]
+    assert warm == cold
+    assert stub.statuses() == [200]
+    assert cold_s >= STUB_DELAY_S
+    assert warm_s < STUB_DELAY_S / 10
+    stats = client.stats()
+    assert (stats["downloads"], stats["parses"], stats["article_hits"]) == (1, 1, 1)
+
+
+def test_expired_article_is_revalidated_with_etag(client, stub, monkeypatch):
+    monkeypatch.setattr(wikipedia_client, "ARTICLE_TTL_S", 0)
+    first = client.get_article("Methane")
+    second = client.get_article("Methane")
+
+    assert second == first
+    assert stub.statuses() == [200, 304]
+    assert stub.requests[1][2] is not None  # Sent If-None-Match
+    stats = client.stats()
+    assert (stats["downloads"], stats["revalidated"], stats["parses"]) == (1, 1, 1)
+
+    # A changed page fails revalidation and is downloaded and parsed again
+    stub.pages["Methane"] = ("Methane", "Methane is the simplest alkane.")
+    third = client.get_article("Methane")
+    assert "simplest alkane" in third["article_text"]
+    assert stub.statuses() == [200, 304, 200]
+    assert client.stats()["parses"] == 2
+
+
+def test_disk_cache_survives_a_new_client(client, stub, tmp_path):
+    client.get_article("Ethane")
+    fresh = WikipediaClient(base_url=stub.base_url, cache_dir=str(tmp_path / "http"))
+    article = fresh.get_article("Ethane")
+
+    assert article["title"] == "Ethane"
+    assert stub.statuses() == [200, 304]
+    assert fresh.stats()["downloads"] == 0
+
+
+def test_lru_evicts_least_recently_used_article(client, stub, monkeypatch):
+    monkeypatch.setattr(wikipedia_client, "MAX_PARSED_ARTICLES", 2)
+    for query in ("Methane", "Ethane", "Methane", "Propane"):  # Ethane is least recently used
+        client.get_article(query)
+    assert client.stats()["parsed_articles"] == 2
+
+    client.get_article("Methane")
+    assert stub.statuses("Methane") == [200]
+    client.get_article("Ethane")
+    assert stub.statuses("Ethane") == [200, 304]
+
+
+def test_case_distinct_titles_are_kept_apart(client):
+    nan = client.get_article("NaN")
+    name = client.get_article("Nan")
+
+    assert nan["title"] == "NaN" and "not a number" in nan["article_text"]
+    assert name["title"] == "Nan" and "given name" in name["article_text"]
+    assert client.get_article("NaN") == nan
+
+
+def test_requests_resolving_to_one_page_share_an_entry(client, stub):
+    client.get_article("Methane")
+    article = client.get_article("methane")
+
+    assert article["title"] == "Methane"
+    assert client.stats()["parsed_articles"] == 1
+    client.get_article("methane")
+    assert stub.statuses("methane") == [200]
+
+
+def test_transient_errors_are_retried(client, stub):
+    stub.fail_next = 2
+    article = client.get_article("Propane")
+
+    assert article["title"] == "Propane"
+    assert stub.statuses("Propane") == [503, 503, 200]
+
+
+def test_persistent_errors_are_raised(client, stub):
+    stub.fail_next = 10
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_article("Propane")
+    assert stub.statuses("Propane") == [503, 503, 503]  # One request and two retries
+
+    stub.fail_next = 0
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_article("No such article")
@@ -0,0 +1,60 @@
+# --- Tool Worker Pool Tests ---
+# A worker killed for exceeding its time limit must free its slot for the calls already queued
+# behind it, and the pool must report the kill and the replacement.
+
+import threading
+import time
+
+import pytest
+
+from worker_pool import ToolTimeoutError, WorkerCrashedError, WorkerPool
+
+
+# Slow enough to overrun a short limit: CH4/air near 1000 K with a long integration window
+SLOW_ARGS = {"fuel": "CH4", "oxidizer": "air", "initial_temps_k": {"start": 1000, "stop": 1100, "num": 20},
+             "initial_pressures_pa": 101325, "equivalence_ratios": [0.5, 1.0, 2.0], "max_time_s": 100}
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_queued_call_gets_a_replacement_after_a_timeout(pool):
+    outcome = {}
+
+    def slow():
+        try:
+            pool.run("calculate_ignition_delay", SLOW_ARGS, timeout_s=1.0)
+        except ToolTimeoutError as e:
+            outcome["slow"] = e
+
+    thread = threading.Thread(target=slow)
+    thread.start()
+    time.sleep(0.3)  # The slow call holds the only worker; the next call queues behind it
+    started = time.monotonic()
+    result, _ = pool.run("get_species_molecular_weight", {"species_name": "CH4"}, timeout_s=20.0)
+    waited = time.monotonic() - started
+    thread.join()
+
+    assert isinstance(outcome.get("slow"), ToolTimeoutError)
+    assert '"status": "success"' in result
+    assert waited < 10.0  # Served by a replacement, not left waiting out its own limit
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["restarts"], stats["workers"], stats["queued"]) == (1, 1, 1, 0)
+
+
+def test_wait_for_a_worker_still_times_out(pool):
+    def slow():
+        with pytest.raises(WorkerCrashedError):  # Killed by the shutdown below
+            pool.run("calculate_ignition_delay", SLOW_ARGS, timeout_s=30.0)
+
+    thread = threading.Thread(target=slow)
+    thread.start()
+    time.sleep(0.3)
+    with pytest.raises(ToolTimeoutError, match="waiting for a free worker"):
+        pool.run("get_species_molecular_weight", {"species_name": "CH4"}, timeout_s=0.5)
+    pool.shutdown()  # Stops the slow call
+    thread.join()
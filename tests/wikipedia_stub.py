@@ -0,0 +1,92 @@
+# --- Local Wikipedia Stand-in ---
+# A small threaded HTTP server serving generated article pages under /wiki/<title>, with the
+# caching behavior of the real site (strong ETags, conditional GETs answered with 304,
+# "max-age=0, must-revalidate"), an optional per-response delay and injectable 503 failures.
+# It records every request, so tests can tell which calls reached the network.
+
+import hashlib
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def article_html(title: str, text: str) -> str:
+    return (f'<html><head><title>{title} - Wikipedia</title></head><body>'
+            f'<h1 id="firstHeading">{title}</h1>'
+            f'<div class="mw-parser-output"><p>{text}</p><h2>Properties[edit]</h2>'
+            f'<ul><li>First property of {title}</li></ul></div></body></html>')
+
+
+class WikipediaStub:
+    """
+    Serves articles from a dict until closed.
+
+    Args:
+        pages (dict): Requested title -> (page title, article text). Several requested titles may
+                      map to the same page title, as redirects do on the real site.
+        delay_s (float): Time every response waits before it is sent.
+    """
+
+    def __init__(self, pages: dict, delay_s: float = 0.0):
+        self.pages = dict(pages)
+        self.delay_s = delay_s
+        self.fail_next = 0  # Number of upcoming requests answered with 503
+        self.requests = []  # (title, status, sent If-None-Match) of every request
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/wiki/"
+
+    def statuses(self, title: str = None) -> list:
+        with self._lock:
+            return [status for requested, status, _ in self.requests if title is None or requested == title]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                title = urllib.parse.unquote(self.path[len("/wiki/"):])
+                if stub.delay_s:
+                    time.sleep(stub.delay_s)
+                with stub._lock:
+                    failing = stub.fail_next > 0
+                    if failing:
+                        stub.fail_next -= 1
+                    page = stub.pages.get(title)
+                if failing:
+                    status, body, etag = 503, b"Service Unavailable", None
+                elif page is None:
+                    status, body, etag = 404, b"Not Found", None
+                else:
+                    body = article_html(*page).encode("utf-8")
+                    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                    status = 304 if self.headers.get("If-None-Match") == etag else 200
+                with stub._lock:
+                    stub.requests.append((title, status, self.headers.get("If-None-Match")))
+
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                    self.send_header("Cache-Control", "private, s-maxage=0, max-age=0, must-revalidate")
+                if status == 304:
+                    self.end_headers()
+                    return
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
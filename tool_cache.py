@@ -0,0 +1,305 @@
+# --- Persistent Tool Result Cache ---
+# Memoizes tool results in an on-disk SQLite store shared by every Streamlit session and
+# surviving restarts. Arguments are canonicalized before hashing so that equivalent requests
+# ('air' vs 'O2:1, N2:3.76', 'co2' vs 'CO2', 300 vs 300.0000001) share one entry, and every
+# key carries a version tied to the mechanism file (and, for results read from precomputed
+# tables, to those tables) so results are invalidated when it changes.
+# Results are stored without their timing, which only describes the call that computed them.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import cantera as ct
+
+from aft_tables import aft_table_store
+from mechanisms import DEFAULT_MECHANISM, mechanism_hash, mechanism_registry
+
+
+CACHE_DIR = os.environ.get("CATALYST_MIND_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "catalyst_mind"))
+CACHE_SCHEMA_VERSION = 2
+SIGNIFICANT_DIGITS = 6
+
+# Arguments holding a mixture composition ("CH4:1, O2:2" or a single species / 'air')
+COMPOSITION_ARGS = {"fuel", "oxidizer", "mixture_formula", "inlet_composition"}
+# Arguments holding one or more species names
+SPECIES_ARGS = {"species_name", "species_names", "fuels", "components"}
+# Arguments that choose how a result is computed, not what it is
+EXECUTION_ARGS = {"parallel"}
+# Tools that may answer from the precomputed flame temperature tables
+TABLE_BACKED_TOOLS = {"calculate_adiabatic_flame_temperature"}
+
+# Results of these tools may go stale; everything else is a pure function of its arguments.
+TOOL_TTL_S = {
+    "get_wikipedia_data": 24 * 3600,
+}
+
+# Output format of tools whose results changed shape; bumping an entry retires only that tool's entries.
+TOOL_OUTPUT_VERSIONS = {
+    "get_wikipedia_data": 2,  # Retrieved excerpts instead of the full article text
+    "process_simulation_snapshot": 2,  # Adiabatic/isothermal reactors, branch-keyed warm starts, sweep tables
+}
+
+AIR_COMPOSITION = {"O2": 1.0, "N2": 3.76}
+
+
+def _round(value: float) -> float:
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+def _canonical_species(name: str) -> str:
+    # Match species names case-insensitively against the mechanism ('co2' -> 'CO2')
+    name = name.strip()
+    template = mechanism_registry.get_template(DEFAULT_MECHANISM)
+    lookup = {species.upper(): species for species in template.species_names}
+    return lookup.get(name.upper(), name)
+
+
+def _canonical_composition(value):
+    if isinstance(value, dict):
+        composition = {str(k): float(v) for k, v in value.items()}
+    elif isinstance(value, str):
+        if value.strip().lower() == "air":
+            composition = dict(AIR_COMPOSITION)
+        elif ":" in value:
+            composition = {}
+            for item in value.split(","):
+                if not item.strip():
+                    continue
+                species, _, amount = item.partition(":")
+                composition[species] = composition.get(species, 0.0) + float(amount)
+        else:
+            composition = {value: 1.0}
+    else:
+        return _canonical_value(value)
+
+    composition = {_canonical_species(k): v for k, v in composition.items()}
+    total = sum(composition.values())
+    if total <= 0:
+        return sorted(composition.items())
+    # Cantera normalizes compositions, so only the ratios matter
+    return sorted((species, _round(amount / total)) for species, amount in composition.items())
+
+
+def _canonical_value(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return _round(float(value))
+    if isinstance(value, str):
+        try:
+            return _round(float(value))
+        except ValueError:
+            return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v) for k, v in sorted(value.items())}
+    return repr(value)
+
+
+def normalize_tool_args(args: dict) -> dict:
+    """
+    Canonicalizes tool arguments for use as a cache key.
+
+    Args:
+        args (dict): The arguments as produced by the model.
+
+    Returns:
+        dict: Arguments with rounded numbers, canonical species names and sorted, normalized compositions
+              (execution options such as 'parallel' are left out).
+    """
+    normalized = {}
+    for name, value in args.items():
+        if name in EXECUTION_ARGS:
+            continue
+        try:
+            if name in COMPOSITION_ARGS:
+                normalized[name] = _canonical_composition(value)
+            elif name in SPECIES_ARGS:
+                if isinstance(value, str):
+                    normalized[name] = _canonical_species(value)
+                else:
+                    normalized[name] = [_canonical_species(str(v)) for v in value]
+            else:
+                normalized[name] = _canonical_value(value)
+        except (ValueError, TypeError):
+            # Malformed input: fall back to the raw value so the tool reports the error itself
+            normalized[name] = _canonical_value(value)
+    return normalized
+
+
+def _without_timing(result: str) -> str:
+    # A hit costs a lookup, not the original computation's time; the dispatcher times each call itself
+    try:
+        output = json.loads(result)
+    except (TypeError, ValueError):
+        return result
+    if not isinstance(output, dict) or "elapsed_s" not in output:
+        return result
+    output.pop("elapsed_s")
+    return json.dumps(output)
+
+
+def cache_version() -> str:
+    """Version key combining the cache schema, the Cantera version and the mechanism file hash."""
+    return f"{CACHE_SCHEMA_VERSION}:{ct.__version__}:{mechanism_hash(DEFAULT_MECHANISM)[:16]}"
+
+
+class ToolResultCache:
+    """
+    Size-bounded LRU cache of tool results stored in SQLite.
+
+    Args:
+        path (str): SQLite database file.
+        max_entries (int): Maximum number of cached results before the least recently used are evicted.
+        max_bytes (int): Maximum total size of the cached results in bytes.
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._version = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    compute_time_s REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = cache_version()
+        return self._version
+
+    def make_key(self, tool_name: str, args: dict) -> str:
+        version = self.version
+        if tool_name in TABLE_BACKED_TOOLS:
+            version += ":" + aft_table_store.fingerprint()
+        payload = json.dumps([tool_name, version, TOOL_OUTPUT_VERSIONS.get(tool_name, 1), normalize_tool_args(args)],
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _bump(self, conn, **increments) -> None:
+        for name, amount in increments.items():
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount),
+            )
+
+    def get(self, tool_name: str, args: dict):
+        """Returns the cached result string, or None on a miss."""
+        key = self.make_key(tool_name, args)
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT result, compute_time_s, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            ttl = TOOL_TTL_S.get(tool_name)
+            if row is not None and ttl is not None and now - row[2] > ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._bump(conn, misses=1)
+                return None
+            conn.execute("UPDATE results SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._bump(conn, hits=1, saved_time_s=row[1])
+            return row[0]
+
+    def put(self, tool_name: str, args: dict, result: str, compute_time_s: float) -> None:
+        """Stores a result (without its "elapsed_s") and evicts the least recently used entries beyond the size limits."""
+        key = self.make_key(tool_name, args)
+        now = time.time()
+        result = _without_timing(result)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, tool, version, result, size, compute_time_s, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, tool_name, self.version, result, len(result), compute_time_s, now, now),
+            )
+            # Entries from an older mechanism/Cantera version can never be hit again
+            conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            while count > self.max_entries or total > self.max_bytes:
+                excess = max(count - self.max_entries, 1)
+                evicted = conn.execute(
+                    "SELECT key, size FROM results ORDER BY last_access ASC LIMIT ?", (excess,)
+                ).fetchall()
+                conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k, _ in evicted])
+                count -= len(evicted)
+                total -= sum(size for _, size in evicted)
+                self._bump(conn, evictions=len(evicted))
+
+    def call(self, tool_name: str, func, args: dict) -> str:
+        """
+        Returns the cached result of func(**args), computing and storing it on a miss.
+        Error results are never cached.
+        """
+        cached = self.get(tool_name, args)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        result = func(**args)
+        elapsed = time.perf_counter() - start
+        try:
+            status = json.loads(result).get("status")
+        except (TypeError, ValueError, AttributeError):
+            status = None
+        if status == "success":
+            self.put(tool_name, args, result, elapsed)
+        return result
+
+    def stats(self) -> dict:
+        """Returns hit ratio, saved compute time and store size."""
+        with self._connection() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        return {
+            "entries": entries,
+            "size_bytes": total,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_compute_time_s": round(counters.get("saved_time_s", 0.0), 3),
+            "evictions": int(counters.get("evictions", 0)),
+            "version": self.version,
+        }
+
+    def clear(self) -> None:
+        """Removes every cached result and resets the counters."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM counters")
+
+
+# Module-level cache shared by every Streamlit session in this process (and, via the file, across processes).
+tool_result_cache = ToolResultCache(os.path.join(CACHE_DIR, "tool_results.sqlite"))
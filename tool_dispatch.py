@@ -0,0 +1,180 @@
+# --- Concurrent Tool Dispatcher ---
+# Runs the tool calls of one model turn concurrently: network-bound tools on a thread pool,
+# CPU-bound Cantera tools in a bounded pool of killable worker processes so several calculations
+# can use several cores and none can run past its wall-clock limit (a network call that does is
+# abandoned). Every call goes through the persistent result cache first and is timed individually.
+
+import json
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from tool_cache import tool_result_cache
+from tools import IO_BOUND_TOOLS, available_tools
+from worker_pool import POLL_INTERVAL_S, ToolCancelledError, ToolTimeoutError, WorkerCrashedError, WorkerPool
+
+
+# Wall-clock limits per tool in seconds, including time queued for a free worker
+DEFAULT_TOOL_TIMEOUT_S = float(os.environ.get("CATALYST_MIND_TOOL_TIMEOUT_S", 60))
+TOOL_TIMEOUT_S = {
+    "get_species_molecular_weight": 15,
+    "get_species_thermodynamic_properties": 15,
+    "get_species_property_curves": 15,
+    "generate_phase_diagram": 30,
+    "get_wikipedia_data": 45,
+    "calculate_adiabatic_flame_temperature": 30,
+    "get_equilibrium_concentrations": 30,
+    "get_equilibrium_concentrations_sweep": 120,
+    "calculate_adiabatic_flame_temperature_sweep": 120,
+    "process_simulation_snapshot": 120,
+    "calculate_ignition_delay": 180,
+}
+
+
+def _run_in_worker(tool_name: str, tool_args: dict):
+    """Executes a tool inside a worker process and returns (result, elapsed seconds)."""
+    started = time.perf_counter()
+    result = available_tools[tool_name](**tool_args)
+    return result, time.perf_counter() - started
+
+
+def _result_status(result: str):
+    try:
+        return json.loads(result).get("status")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class ToolDispatcher:
+    """
+    Executes tool calls concurrently with per-call timing, time limits and cancellation.
+
+    Args:
+        max_threads (int): Size of the thread pool that runs I/O tools and coordinates process work.
+        max_processes (int): Number of worker processes for CPU-bound tools (defaults to the CPU count).
+        cache: Tool result cache consulted before, and filled after, every call.
+    """
+
+    def __init__(self, max_threads: int = 8, max_processes: int = None, cache=tool_result_cache):
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self.cache = cache
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="tool-dispatch")
+        self._io_threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="tool-io")
+        self._workers = WorkerPool(self.max_processes)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _execute(self, tool_name: str, tool_args: dict, submitted_at: float, cancel_event: threading.Event,
+                 time_limit_s: float = None) -> dict:
+        record = {
+            "name": tool_name,
+            "args": tool_args,
+            "queued_s": round(time.perf_counter() - submitted_at, 4),
+        }
+        started = time.perf_counter()
+
+        if tool_name not in available_tools:
+            record.update(executor="none", elapsed_s=0.0, result=json.dumps({
+                "status": "error",
+                "message": f"Unknown tool: {tool_name}"
+            }))
+            return record
+
+        cached = self.cache.get(tool_name, tool_args)
+        if cached is not None:
+            record.update(executor="cache", elapsed_s=round(time.perf_counter() - started, 4), result=cached)
+            return record
+
+        timeout_s = TOOL_TIMEOUT_S.get(tool_name, DEFAULT_TOOL_TIMEOUT_S)
+        if time_limit_s is not None:
+            # The caller's remaining budget also counts from submission
+            timeout_s = min(timeout_s, time_limit_s - (started - submitted_at))
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ToolCancelledError(f"'{tool_name}' was cancelled")
+            if timeout_s <= 0:
+                raise ToolTimeoutError(f"'{tool_name}' was not started: the time budget is used up")
+            if tool_name in IO_BOUND_TOOLS:
+                record["executor"] = "thread"
+                result, compute_time = self._run_in_thread(tool_name, tool_args, timeout_s, cancel_event)
+            else:
+                record["executor"] = "process"
+                result, compute_time = self._workers.run(tool_name, tool_args, timeout_s, cancel_event)
+        except (ToolTimeoutError, ToolCancelledError, WorkerCrashedError) as e:
+            record["stopped"] = type(e).__name__
+            result, compute_time = json.dumps({
+                "status": "error",
+                "message": f"Tool {e}" if not isinstance(e, WorkerCrashedError) else str(e)
+            }), time.perf_counter() - started
+        except Exception as e:
+            result, compute_time = json.dumps({
+                "status": "error",
+                "message": f"Tool '{tool_name}' failed: {str(e)}"
+            }), time.perf_counter() - started
+
+        if _result_status(result) == "success":
+            self.cache.put(tool_name, tool_args, result, compute_time)
+        record.update(elapsed_s=round(time.perf_counter() - started, 4),
+                      compute_s=round(compute_time, 4), result=result)
+        return record
+
+    def _run_in_thread(self, tool_name: str, tool_args: dict, timeout_s: float, cancel_event: threading.Event):
+        """
+        Runs a network tool on its own thread and waits for it at most timeout_s.
+
+        A thread cannot be killed: a call past its limit is abandoned, and its HTTP request
+        timeouts end the thread soon after.
+        """
+        future = self._io_threads.submit(_run_in_worker, tool_name, tool_args)
+        deadline = time.perf_counter() + timeout_s
+        while True:
+            try:
+                return future.result(timeout=min(POLL_INTERVAL_S, max(deadline - time.perf_counter(), 0)))
+            except FutureTimeoutError:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ToolCancelledError(f"'{tool_name}' was cancelled")
+                if time.perf_counter() >= deadline:
+                    raise ToolTimeoutError(f"'{tool_name}' exceeded its {timeout_s:g} s time limit and was abandoned")
+
+    def _run_tracked(self, *args) -> dict:
+        try:
+            return self._execute(*args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def submit(self, tool_name: str, tool_args: dict, cancel_event: threading.Event = None, time_limit_s: float = None):
+        """
+        Starts a tool call in the background.
+
+        Args:
+            tool_name (str): Name of the tool.
+            tool_args (dict): Tool arguments.
+            cancel_event (threading.Event, optional): Set it to stop the call (its worker is killed).
+            time_limit_s (float, optional): Time the caller has left; the call is stopped once it runs
+                                            out, even if the tool's own limit is longer.
+
+        Returns:
+            concurrent.futures.Future: Resolves to a dict with "name", "args", "result" (JSON string),
+                                       "executor" ('cache', 'thread' or 'process'), "queued_s" and "elapsed_s";
+                                       "stopped" is set if the call timed out, was cancelled or crashed.
+        """
+        with self._lock:
+            self._pending += 1
+        return self._threads.submit(self._run_tracked, tool_name, tool_args, time.perf_counter(), cancel_event, time_limit_s)
+
+    def run_all(self, tool_calls: list) -> list:
+        """Runs (name, args) pairs concurrently and returns their records in the same order."""
+        futures = [self.submit(name, args) for name, args in tool_calls]
+        return [future.result() for future in futures]
+
+    def stats(self) -> dict:
+        """Dispatcher queue depth (calls submitted but not finished) and worker pool counters."""
+        with self._lock:
+            pending = self._pending
+        return dict(self._workers.stats(), pending_calls=pending)
+
+
+# Module-level dispatcher shared by every Streamlit session in this process.
+tool_dispatcher = ToolDispatcher()
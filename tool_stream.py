@@ -0,0 +1,129 @@
+# --- Streaming Tool-Call Detection ---
+# Scans model output chunk by chunk for {"tool_call": {...}} objects and {"tool_calls": [...]}
+# batches. A tool call is reported the moment its closing brace arrives, so the tool can start
+# while the model is still writing the rest of its message, and the text around it can be shown
+# to the user as it streams.
+
+import json
+import re
+
+
+_FENCE_OPEN_RE = re.compile(r"```(?:json)?\s*$")
+_FENCE_CLOSE_RE = re.compile(r"^\s*```")
+# Text that may be the start of a ```json fence opening a tool call
+_PARTIAL_FENCE_RE = re.compile(r"`{1,3}(?:j(?:s(?:o(?:n)?)?)?)?\s*$")
+
+
+class ToolCall:
+    """A tool call found in the stream: tool name, arguments and the character span of its JSON."""
+
+    def __init__(self, name: str, args: dict, start: int, end: int):
+        self.name = name
+        self.args = args
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"ToolCall({self.name!r}, {self.args!r})"
+
+
+class ToolCallDetector:
+    """
+    Incremental detector of tool-call JSON objects in streamed text.
+
+    Braces are tracked with awareness of JSON strings and escapes, so the detector is not confused
+    by braces inside argument values or by braces in the prose that follows the tool call.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.tool_calls = []
+        self._pos = 0            # Next character to scan
+        self._depth = 0
+        self._object_start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of streamed text.
+
+        Returns:
+            list: Tool calls completed by this chunk (usually empty).
+        """
+        self.text += chunk
+        found = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._depth == 0:
+                if char == "{":
+                    self._object_start = i
+                    self._depth = 1
+                    self._in_string = False
+                    self._escape = False
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    calls = self._parse(self._object_start, i + 1)
+                    self.tool_calls.extend(calls)
+                    found.extend(calls)
+                    self._object_start = None
+        self._pos = len(text)
+        return found
+
+    def _parse(self, start: int, end: int) -> list:
+        try:
+            parsed = json.loads(self.text[start:end])
+        except ValueError:
+            return []
+        if not isinstance(parsed, dict):
+            return []
+        # Either a single {"tool_call": {...}} or a batch {"tool_calls": [{...}, ...]}
+        calls = parsed.get("tool_calls")
+        if not isinstance(calls, list):
+            calls = [parsed.get("tool_call")]
+        return [
+            ToolCall(call["name"], call["args"], start, end)
+            for call in calls
+            if isinstance(call, dict) and "name" in call and isinstance(call.get("args"), dict)
+        ]
+
+    def visible_text(self, final: bool = False) -> str:
+        """
+        Returns the text to show the user: everything except tool-call JSON and the code fences
+        around it. Unless final is set, text that may still become a tool call is held back.
+        """
+        segments = []
+        cursor = 0
+        for call in self.tool_calls:
+            if call.start < cursor:
+                continue  # Another call from the same batch object
+            segments.append(self.text[cursor:call.start])
+            cursor = call.end
+        tail = self.text[cursor:]
+        if not final:
+            if self._object_start is not None and self._object_start >= cursor:
+                tail = self.text[cursor:self._object_start]
+            tail = _PARTIAL_FENCE_RE.sub("", tail)
+        segments.append(tail)
+
+        # Drop the fence markers that wrapped each tool call
+        for i in range(len(segments)):
+            if i < len(segments) - 1:
+                segments[i] = _FENCE_OPEN_RE.sub("", segments[i])
+            if i > 0:
+                segments[i] = _FENCE_CLOSE_RE.sub("", segments[i])
+        return "\n".join(segment.strip() for segment in segments if segment.strip())
@@ -0,0 +1,678 @@
+# --- Tool Functions Available to the Agent ---
+# Every tool takes JSON-compatible keyword arguments produced by the model and returns a JSON string
+# with a "status" of "success" or "error". The functions live in their own module (rather than in the
+# Streamlit script) so they can be imported by worker processes.
+
+import json
+import time
+
+import cantera as ct
+import numpy as np
+import requests
+
+from aft_tables import aft_table_store
+from combustion import adiabatic_flame_temperature_sweep
+from equilibrium import DEFAULT_MIN_MOLE_FRACTION, equilibrium_grid
+from ignition import DEFAULT_MAX_TIME_S, IGNITION_TEMPERATURE_RISE_K, ignition_delay_sweep
+from mechanisms import mechanism_registry
+from nasa_thermo import get_nasa_table
+from reactors import iter_cstr_residence_time_sweep, parse_residence_times, simulate_cstr, simulate_pfr
+from retrieval import IndexCache
+from vle import (binary_diagram, bubble_pressure, bubble_temperature, dew_pressure, dew_temperature, flash,
+                 get_parameter_set)
+from wikipedia_client import wikipedia_client
+
+
+# --- Cantera Tool Definitions ---
+def _canonical_mixture(value: str) -> str:
+    """Matches the species of a formula or composition string case-insensitively against gri30 ('ch4' -> 'CH4')."""
+    value = value.strip()
+    if value.lower() == 'air':
+        return 'air'
+    names = {name.upper(): name for name in mechanism_registry.get_template('gri30.yaml').species_names}
+    items = []
+    for item in value.split(','):
+        species, separator, amount = item.partition(':')
+        if species.strip():
+            items.append(names.get(species.strip().upper(), species.strip()) + (f":{amount.strip()}" if separator else ""))
+    return ", ".join(items)
+
+def calculate_adiabatic_flame_temperature(fuel: str, oxidizer: str, equivalence_ratio: float, initial_temp_k: float, initial_pressure_pa: float) -> str:
+    """
+    Calculates the adiabatic flame temperature (AFT) for a given fuel and oxidizer mixture.
+    
+    Args:
+        fuel (str): The chemical formula of the fuel (e.g., 'CH4' for methane, 'C2H5OH' for ethanol).
+        oxidizer (str): The chemical formula of the oxidizer (e.g., 'O2' for pure oxygen, 'air' for atmospheric air).
+        equivalence_ratio (float): The equivalence ratio (phi). Phi < 1 for lean, Phi = 1 for stoichiometric, Phi > 1 for rich.
+        initial_temp_k (float): The initial temperature of the reactants in Kelvin (e.g., 300.0).
+        initial_pressure_pa (float): The initial pressure of the reactants in Pascals (e.g., 101325.0 for 1 atm).
+
+    Returns:
+        str: A JSON string containing the adiabatic flame temperature in Kelvin and Celsius,
+             or an error message if the calculation fails.
+    """
+    try:
+        # Canonical names first, so the table and Cantera paths accept exactly the same inputs
+        fuel, oxidizer = _canonical_mixture(fuel), _canonical_mixture(oxidizer)
+        # Common fuels in air near ambient conditions are answered from a precomputed table
+        lookup = aft_table_store.lookup(fuel, oxidizer, float(equivalence_ratio), float(initial_temp_k), float(initial_pressure_pa))
+        if lookup is not None:
+            aft_k, max_error_k = lookup
+            return json.dumps({
+                "status": "success",
+                "fuel": fuel,
+                "oxidizer": oxidizer,
+                "equivalence_ratio": equivalence_ratio,
+                "initial_temperature_K": initial_temp_k,
+                "initial_pressure_Pa": initial_pressure_pa,
+                "adiabatic_flame_temperature_K": round(aft_k, 2),
+                "adiabatic_flame_temperature_C": round(aft_k - 273.15, 2),
+                "method": "interpolated from a precomputed Cantera table",
+                "table_max_error_K": max_error_k
+            })
+
+        with mechanism_registry.checkout('gri30.yaml') as gas:
+            gas.TP = initial_temp_k, initial_pressure_pa
+            if oxidizer == 'air':
+                gas.set_equivalence_ratio(equivalence_ratio, fuel, {'O2': 1.0, 'N2': 3.76})
+            else:
+                gas.set_equivalence_ratio(equivalence_ratio, fuel, oxidizer)
+            gas.equilibrate('HP')
+            
+            aft_k = gas.T
+
+        return json.dumps({
+            "status": "success",
+            "fuel": fuel,
+            "oxidizer": oxidizer,
+            "equivalence_ratio": equivalence_ratio,
+            "initial_temperature_K": initial_temp_k,
+            "initial_pressure_Pa": initial_pressure_pa,
+            "adiabatic_flame_temperature_K": round(aft_k, 2),
+            "adiabatic_flame_temperature_C": round(aft_k - 273.15, 2),
+            "method": "Cantera HP equilibrium"
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Cantera calculation failed: {str(e)}",
+            "fuel": fuel,
+            "oxidizer": oxidizer,
+            "equivalence_ratio": equivalence_ratio,
+            "initial_temperature_K": initial_temp_k,
+            "initial_pressure_Pa": initial_pressure_pa
+        })
+
+def calculate_adiabatic_flame_temperature_sweep(fuels: list, oxidizer: str, equivalence_ratios, initial_temps_k, initial_pressures_pa, parallel: bool = False) -> str:
+    """
+    Calculates adiabatic flame temperatures over a grid of equivalence ratios, initial temperatures,
+    initial pressures and fuels in a single call.
+
+    Args:
+        fuels (list or str): One or more fuel formulas (e.g., ['CH4', 'C3H8', 'H2']).
+        oxidizer (str): The chemical formula of the oxidizer (e.g., 'O2' or 'air').
+        equivalence_ratios: A value, a list of values, or a range such as {"start": 0.5, "stop": 2.0, "num": 200}.
+        initial_temps_k: A value, a list of values, or a range (Kelvin), e.g. {"start": 300, "stop": 900, "step": 100}.
+        initial_pressures_pa: A value, a list of values, or a range (Pascals).
+        parallel (bool, optional): Spread large sweeps across CPU cores.
+
+    Returns:
+        str: A JSON string containing a compact table (columns + rows) of flame temperatures
+             and the peak temperature per fuel, or an error message if the calculation fails.
+    """
+    if isinstance(fuels, str):
+        fuels = [fuel.strip() for fuel in fuels.split(",") if fuel.strip()]
+    try:
+        start = time.perf_counter()
+        table = adiabatic_flame_temperature_sweep(
+            fuels, oxidizer, equivalence_ratios, initial_temps_k, initial_pressures_pa, parallel=parallel
+        )
+        elapsed = time.perf_counter() - start
+
+        peaks = {}
+        for row in table["rows"]:
+            fuel, aft_k = row[0], row[-1]
+            if fuel not in peaks or aft_k > peaks[fuel]["adiabatic_flame_temperature_K"]:
+                peaks[fuel] = {
+                    "equivalence_ratio": row[1],
+                    "initial_temperature_K": row[2],
+                    "initial_pressure_Pa": row[3],
+                    "adiabatic_flame_temperature_K": aft_k
+                }
+
+        return json.dumps({
+            "status": "success",
+            "oxidizer": oxidizer,
+            "points": len(table["rows"]),
+            "elapsed_s": round(elapsed, 3),
+            "peak_by_fuel": peaks,
+            "table": table
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Cantera sweep failed: {str(e)}",
+            "fuels": fuels,
+            "oxidizer": oxidizer
+        })
+
+def get_species_molecular_weight(species_name: str) -> str:
+    """
+    Retrieves the molecular weight of a specified chemical species using Cantera's default mechanism.
+
+    Args:
+        species_name (str): The chemical formula or common name of the species (e.g., 'CO2', 'H2O', 'CH4').
+
+    Returns:
+        str: A JSON string containing the molecular weight in kg/kmol (g/mol),
+             or an error message if the species is not found.
+    """
+    try:
+        # Read-only lookup, so the shared parsed template can be used directly
+        gas = mechanism_registry.get_template('gri30.yaml')
+        mw = gas.molecular_weights[gas.species_index(species_name)]
+        
+        return json.dumps({
+            "status": "success",
+            "species": species_name,
+            "molecular_weight_kg_kmol": mw,
+            "molecular_weight_g_mol": mw / 1000.0
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Species '{species_name}' not found or molecular weight calculation failed: {str(e)}",
+            "species": species_name
+        })
+
+def get_equilibrium_concentrations(mixture_formula: str, temperature_k: float, pressure_pa: float) -> str:
+    """
+    Calculates the equilibrium mole fractions of species in a given mixture at a specified temperature and pressure.
+
+    Args:
+        mixture_formula (str): The initial composition of the mixture as a string (e.g., 'CH4:1, O2:2, N2:7.52').
+                               Ensure the species are defined in the loaded Cantera mechanism (gri30.yaml).
+        temperature_k (float): The equilibrium temperature in Kelvin.
+        pressure_pa (float): The equilibrium pressure in Pascals.
+
+    Returns:
+        str: A JSON string containing the equilibrium mole fractions of all species present,
+             or an error message if the calculation fails.
+    """
+    try:
+        with mechanism_registry.checkout('gri30.yaml') as gas:
+            gas.TPX = temperature_k, pressure_pa, mixture_formula
+            gas.equilibrate('TP')
+
+            # mole_fractions = {species.name: gas.X[species.index] for species in gas.species()}
+            mole_fractions = {species: mole_fraction for species, mole_fraction in zip(gas.species_names, gas.X)}
+        
+        return json.dumps({
+            "status": "success",
+            "mixture_formula": mixture_formula,
+            "temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa,
+            "equilibrium_mole_fractions": mole_fractions
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Equilibrium calculation failed for mixture '{mixture_formula}' at {temperature_k}K, {pressure_pa}Pa: {str(e)}",
+            "mixture_formula": mixture_formula,
+            "temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa
+        })
+
+def get_equilibrium_concentrations_sweep(mixture_formula: str, temperatures_k, pressures_pa, min_mole_fraction: float = DEFAULT_MIN_MOLE_FRACTION, parallel: bool = False) -> str:
+    """
+    Calculates equilibrium mole fractions of a mixture over a grid of temperatures and pressures in a single call.
+
+    Args:
+        mixture_formula (str): The initial composition of the mixture (e.g., 'CH4:1, O2:2, N2:7.52').
+        temperatures_k: A value, a list of values, or a range such as {"start": 300, "stop": 3000, "num": 100} (Kelvin).
+        pressures_pa: A value, a list of values, or a range (Pascals).
+        min_mole_fraction (float, optional): Species that stay below this mole fraction everywhere are omitted.
+        parallel (bool, optional): Spread large grids across CPU cores.
+
+    Returns:
+        str: A JSON string containing one column per retained species (plus the temperature and
+             pressure columns), or an error message if the calculation fails.
+    """
+    try:
+        start = time.perf_counter()
+        table = equilibrium_grid(mixture_formula, temperatures_k, pressures_pa,
+                                 min_mole_fraction=float(min_mole_fraction), parallel=parallel)
+        elapsed = time.perf_counter() - start
+
+        return json.dumps({
+            "status": "success",
+            "mixture_formula": mixture_formula,
+            "points": len(table["temperature_K"]),
+            "min_mole_fraction": min_mole_fraction,
+            "elapsed_s": round(elapsed, 3),
+            **table
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Equilibrium sweep failed for mixture '{mixture_formula}': {str(e)}",
+            "mixture_formula": mixture_formula
+        })
+
+def calculate_ignition_delay(fuel: str, oxidizer: str, initial_temps_k, initial_pressures_pa, equivalence_ratios=1.0, max_time_s: float = DEFAULT_MAX_TIME_S, parallel: bool = False) -> str:
+    """
+    Calculates constant-volume autoignition delay times over a grid of initial temperatures,
+    initial pressures and equivalence ratios using Cantera reactor networks.
+
+    Args:
+        fuel (str): The chemical formula of the fuel (e.g., 'CH4', 'H2').
+        oxidizer (str): The chemical formula of the oxidizer (e.g., 'O2' or 'air').
+        initial_temps_k: A value, a list of values, or a range such as {"start": 1000, "stop": 1600, "num": 13} (Kelvin).
+        initial_pressures_pa: A value, a list of values, or a range (Pascals).
+        equivalence_ratios (optional): A value, a list of values, or a range. Defaults to 1.0.
+        max_time_s (float, optional): Points that have not ignited after this time are reported without a delay.
+        parallel (bool, optional): Spread the grid across CPU cores.
+
+    Returns:
+        str: A JSON string containing a table of ignition delays with 1000/T and log10(delay) columns,
+             Arrhenius fits per equivalence ratio and pressure, and throughput statistics, or an
+             error message if the calculation fails.
+    """
+    try:
+        start = time.perf_counter()
+        table = ignition_delay_sweep(fuel, oxidizer, initial_temps_k, initial_pressures_pa, equivalence_ratios,
+                                     max_time_s=float(max_time_s), parallel=parallel)
+        elapsed = time.perf_counter() - start
+
+        return json.dumps({
+            "status": "success",
+            "fuel": fuel,
+            "oxidizer": oxidizer,
+            "ignition_criterion": f"temperature rise of {IGNITION_TEMPERATURE_RISE_K:.0f} K above the initial temperature",
+            "max_time_s": max_time_s,
+            "points": len(table["rows"]),
+            "elapsed_s": round(elapsed, 3),
+            "points_per_s": round(len(table["rows"]) / elapsed, 1) if elapsed > 0 else None,
+            **table
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Ignition delay calculation failed for fuel '{fuel}': {str(e)}",
+            "fuel": fuel,
+            "oxidizer": oxidizer
+        })
+
+def get_species_thermodynamic_properties(species_name: str, temperature_k: float, pressure_pa: float) -> str:
+    """
+    Retrieves standard thermodynamic properties (enthalpy, entropy, Gibbs free energy, heat capacity)
+    for a specified chemical species at a given temperature and pressure using Cantera.
+
+    Args:
+        species_name (str): The chemical formula or common name of the species (e.g., 'CO2', 'H2O', 'CH4').
+                            Must be present in the 'gri30.yaml' mechanism.
+        temperature_k (float): The temperature in Kelvin.
+        pressure_pa (float): The pressure in Pascals.
+
+    Returns:
+        str: A JSON string containing the thermodynamic properties in J/kmol or J/kmol-K,
+             or an error message if the species is not found or calculation fails.
+    """
+    try:
+        try:
+            # Evaluate the NASA-7 polynomials directly instead of setting a full gas state
+            values = get_nasa_table('gri30.yaml').evaluate([species_name], [float(temperature_k)], float(pressure_pa))
+            properties = {
+                "enthalpy_kmol": float(values["h"][0, 0]),   # J/kmol
+                "entropy_kmol": float(values["s"][0, 0]),    # J/kmol-K
+                "gibbs_kmol": float(values["g"][0, 0]),      # J/kmol
+                "cp_kmol": float(values["cp"][0, 0])         # J/kmol-K (constant pressure heat capacity)
+            }
+        except KeyError:
+            # Species without NASA-7 data: fall back to a Cantera gas state
+            with mechanism_registry.checkout('gri30.yaml') as gas:
+                gas.TPX = temperature_k, pressure_pa, f'{species_name}:1.0' # Set mole fraction to 1 for the species
+                properties = {
+                    "enthalpy_kmol": gas.enthalpy_mole,
+                    "entropy_kmol": gas.entropy_mole,
+                    "gibbs_kmol": gas.gibbs_mole,
+                    "cp_kmol": gas.cp_mole
+                }
+        
+        return json.dumps({
+            "status": "success",
+            "species": species_name,
+            "temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa,
+            "thermodynamic_properties": properties
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Could not retrieve thermodynamic properties for '{species_name}': {str(e)}. Ensure species is in 'gri30.yaml' and parameters are valid.",
+            "species": species_name,
+            "temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa
+        })
+
+def get_species_property_curves(species_names: list, t_start_k: float = 300.0, t_stop_k: float = 3000.0, t_step_k: float = 10.0, pressure_pa: float = 101325.0) -> str:
+    """
+    Evaluates enthalpy, entropy, Gibbs free energy and heat capacity curves for several species
+    over a temperature range in a single call, using the mechanism's NASA-7 polynomials.
+
+    Args:
+        species_names (list or str): Species formulas (e.g., ['CO2', 'H2O', 'CH4']), present in 'gri30.yaml'.
+        t_start_k (float): First temperature of the curve in Kelvin.
+        t_stop_k (float): Last temperature of the curve in Kelvin (inclusive).
+        t_step_k (float): Temperature increment in Kelvin.
+        pressure_pa (float): The pressure in Pascals (affects entropy and Gibbs free energy only).
+
+    Returns:
+        str: A JSON string with the temperature grid and, per species, lists of properties in J/kmol or J/kmol-K,
+             or an error message if a species is not found or the range is invalid.
+    """
+    if isinstance(species_names, str):
+        species_names = [name.strip() for name in species_names.split(",") if name.strip()]
+    try:
+        if t_step_k <= 0 or t_stop_k < t_start_k:
+            raise ValueError("Expected t_start_k <= t_stop_k and a positive t_step_k.")
+        temperatures = np.arange(float(t_start_k), float(t_stop_k) + 1e-9, float(t_step_k))
+        if len(temperatures) * len(species_names) > 20000:
+            raise ValueError("Too many points requested; use a larger temperature step or fewer species.")
+
+        table = get_nasa_table('gri30.yaml')
+        values = table.evaluate(species_names, temperatures, float(pressure_pa))
+
+        curves = {}
+        for i, name in enumerate(species_names):
+            curves[table.species_names[table.species_index(name)]] = {
+                "enthalpy_kmol": [float(f"{v:.7g}") for v in values["h"][i]],
+                "entropy_kmol": [float(f"{v:.7g}") for v in values["s"][i]],
+                "gibbs_kmol": [float(f"{v:.7g}") for v in values["g"][i]],
+                "cp_kmol": [float(f"{v:.7g}") for v in values["cp"][i]],
+                "outside_polynomial_range": bool(not values["in_range"][i].all())
+            }
+
+        return json.dumps({
+            "status": "success",
+            "pressure_Pa": pressure_pa,
+            "temperatures_K": temperatures.tolist(),
+            "species_properties": curves
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Could not evaluate property curves for {species_names}: {str(e)}. Ensure species are in 'gri30.yaml' and the range is valid.",
+            "species_names": species_names
+        })
+
+def process_simulation_snapshot(process_type: str, inlet_composition: str, temperature_k: float, pressure_pa: float, flow_rate: float, reactor_params: dict = None) -> str:
+    """
+    Simulates a continuous flow reactor (CSTR or PFR) at steady state.
+
+    Args:
+        process_type (str): 'combustion', 'reaction', 'cstr' or 'pfr'. Combustion CSTRs start on the burning branch.
+        inlet_composition (str): The inlet composition as a string (e.g., 'CH4:1, O2:2, N2:7.52').
+        temperature_k (float): The inlet temperature in Kelvin.
+        pressure_pa (float): The operating pressure in Pascals.
+        flow_rate (float): The inlet flow rate in moles per second.
+        reactor_params (dict, optional): Reactor options:
+            reactor_type ('cstr' or 'pfr', default 'cstr' unless process_type names one),
+            volume_m3 (CSTR volume, default 1.0) or residence_time_s,
+            length_m or residence_time_s, and diameter_m (default 0.1) or area_m2 for a PFR,
+            residence_times_s (a list or {"start", "stop", "num"} range for a residence-time sweep),
+            energy ('on' for adiabatic, 'off' for isothermal), ignite (bool).
+
+    Returns:
+        str: A JSON string with the outlet state, conversion of each reacting inlet species, residence
+             time, the reactor profile (transient approach for a CSTR, axial profile for a PFR) or sweep
+             table, and solver statistics, or an error message if the simulation fails.
+    """
+    reactor_params = dict(reactor_params or {})
+    process = str(process_type).strip().lower()
+    if process in ("distillation", "separation", "flash", "absorption"):
+        return json.dumps({
+            "status": "error",
+            "message": f"'{process_type}' is not a reactor simulation. Use generate_phase_diagram for vapor-liquid equilibrium.",
+        })
+    reactor_type = str(reactor_params.get("reactor_type", process if process in ("cstr", "pfr") else "cstr")).lower()
+    if reactor_type not in ("cstr", "pfr"):
+        return json.dumps({"status": "error", "message": f"Unknown reactor_type '{reactor_type}'. Use 'cstr' or 'pfr'."})
+    energy = "off" if str(reactor_params.get("energy", "on")).lower() in ("off", "isothermal", "false") else "on"
+
+    try:
+        flow_rate = float(flow_rate)
+        if flow_rate <= 0:
+            raise ValueError("flow_rate must be positive (moles per second).")
+        residence_times = reactor_params.get("residence_times_s")
+        residence_times = parse_residence_times(residence_times) if residence_times is not None else None
+        residence_time = reactor_params.get("residence_time_s")
+        residence_time = float(residence_time) if residence_time is not None else None
+        volume = reactor_params.get("volume_m3", reactor_params.get("volume"))
+        ignite = bool(reactor_params.get("ignite", process == "combustion"))
+
+        started = time.perf_counter()
+        with mechanism_registry.checkout('gri30.yaml') as gas:
+            if reactor_type == "pfr":
+                length = reactor_params.get("length_m")
+                diameter, area = reactor_params.get("diameter_m"), reactor_params.get("area_m2")
+                result = simulate_pfr(
+                    gas, inlet_composition, temperature_k, pressure_pa, flow_rate,
+                    length_m=float(length) if length is not None else None,
+                    residence_time_s=residence_time,
+                    diameter_m=float(diameter) if diameter is not None else None,
+                    area_m2=float(area) if area is not None else None,
+                    energy=energy, residence_times_s=residence_times,
+                )
+            elif residence_times:
+                points = list(iter_cstr_residence_time_sweep(
+                    gas, inlet_composition, temperature_k, pressure_pa, flow_rate, residence_times,
+                    energy=energy, ignite=ignite,
+                ))
+                points.reverse()  # Solved from the longest residence time down; reported in increasing order
+                result = {
+                    "reactor_type": "cstr",
+                    "energy": energy,
+                    "sweep": {
+                        "columns": ["residence_time_s", "volume_m3", "T_K", "conversion", "integrator_steps", "method"],
+                        "rows": [[p["residence_time_s"], p["volume_m3"], p["outlet_temperature_K"], p["conversion"],
+                                  p["integrator_steps"], p["method"]] for p in points],
+                    },
+                    "outlet_composition_at_shortest_residence_time": points[0]["outlet_composition"],
+                    "solver": {"integrator_steps": sum(p["integrator_steps"] for p in points), "points": len(points),
+                               "newton_solves": sum(p["method"] == "newton" for p in points),
+                               "wall_time_s": round(time.perf_counter() - started, 4)},
+                }
+            else:
+                result = simulate_cstr(
+                    gas, inlet_composition, temperature_k, pressure_pa, flow_rate,
+                    volume_m3=float(volume) if volume is not None else None,
+                    residence_time_s=residence_time, energy=energy, ignite=ignite,
+                )
+        return json.dumps(dict({
+            "status": "success",
+            "process_type": process_type,
+            "inlet_composition": inlet_composition,
+            "inlet_temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa,
+            "flow_rate_mol_s": flow_rate,
+        }, **result))
+    except Exception as e:
+        return json.dumps({"status": "error", "message": f"Process simulation failed: {str(e)}"})
+
+def _rounded(values, digits: int = 6):
+    return None if values is None else [round(value, digits) for value in values]
+
+def generate_phase_diagram(components: list, temperature_k: float, pressure_pa: float, mole_fractions: list = None, diagram: str = "auto", points: int = 101, activity_model: str = "auto", interaction_parameters: dict = None) -> str:
+    """
+    Calculates vapor-liquid equilibrium (modified Raoult's law with Antoine vapor pressures and
+    Wilson or NRTL activity coefficients): binary T-x-y / P-x-y diagrams, and the bubble point,
+    dew point and flash of a given feed.
+
+    Args:
+        components (list): Component names or formulas (e.g., ['ethanol', 'water'] or ['C6H6', 'C7H8']).
+        temperature_k (float): Temperature in Kelvin, for the P-x-y diagram, bubble/dew pressures and the flash.
+        pressure_pa (float): Pressure in Pascals, for the T-x-y diagram, bubble/dew temperatures and the flash.
+        mole_fractions (list, optional): Feed composition matching the components.
+        diagram (str, optional): 'txy', 'pxy', 'both' or 'none' ('auto': both for two components, none otherwise).
+        points (int, optional): Liquid compositions along each diagram.
+        activity_model (str, optional): 'ideal', 'wilson', 'nrtl' or 'auto'.
+        interaction_parameters (dict, optional): Binary parameters in cal/mol, e.g. {"ethanol/water": [382.3, 955.45]}
+                                                 (Wilson) or [b12, b21, alpha] (NRTL).
+
+    Returns:
+        str: A JSON string containing the diagram tables and feed results, or an error message if the calculation fails.
+    """
+    if isinstance(components, str):
+        components = [component.strip() for component in components.split(",") if component.strip()]
+    try:
+        start = time.perf_counter()
+        parameters = get_parameter_set(components, activity_model, interaction_parameters)
+        result = {
+            "status": "success",
+            "components": parameters.names,
+            "activity_model": parameters.model,
+            "temperature_K": temperature_k,
+            "pressure_Pa": pressure_pa,
+        }
+        if parameters.missing_pairs:
+            result["ideal_pairs"] = [f"{a}/{b}" for a, b in parameters.missing_pairs]
+        temperatures = [float(temperature_k)]
+
+        if mole_fractions is not None:
+            if len(mole_fractions) != len(components):
+                raise ValueError("mole_fractions must have one value per component.")
+            bubble_t, y_bubble, _ = bubble_temperature(parameters, mole_fractions, pressure_pa)
+            dew_t, x_dew, _ = dew_temperature(parameters, mole_fractions, pressure_pa)
+            bubble_p, _ = bubble_pressure(parameters, mole_fractions, temperature_k)
+            dew_p, _ = dew_pressure(parameters, mole_fractions, temperature_k)
+            flashed = flash(parameters, mole_fractions, float(temperature_k), float(pressure_pa))
+            result["feed"] = {
+                "mole_fractions": mole_fractions,
+                "bubble_point_K": round(float(bubble_t[0]), 3),
+                "first_vapor_composition": _rounded(y_bubble[0].tolist()),
+                "dew_point_K": round(float(dew_t[0]), 3),
+                "first_liquid_composition": _rounded(x_dew[0].tolist()),
+                "bubble_pressure_Pa": round(float(bubble_p[0]), 1),
+                "dew_pressure_Pa": round(float(dew_p[0]), 1),
+                "flash": {"phase": flashed["phase"], "vapor_fraction": round(flashed["vapor_fraction"], 6),
+                          "liquid_composition": _rounded(flashed["x"]), "vapor_composition": _rounded(flashed["y"]),
+                          "K_values": _rounded(flashed["K"])},
+            }
+            temperatures += [float(bubble_t[0]), float(dew_t[0])]
+
+        if diagram == "auto":
+            diagram = "both" if len(components) == 2 else "none"
+        if diagram != "none":
+            for kind in (("txy", "pxy") if diagram == "both" else (diagram.lower(),)):
+                table = binary_diagram(parameters, kind, float(temperature_k), float(pressure_pa), points)
+                del table["iterations"]
+                result[kind] = table
+                if kind == "txy":
+                    temperatures += [row[2] for row in table["rows"]]
+
+        warnings = []
+        if parameters.supercritical(temperatures):
+            warnings.append(f"Above the critical temperature of {', '.join(parameters.supercritical(temperatures))}: "
+                            "vapor pressures are extrapolated and the results are not physical there.")
+        elif parameters.out_of_range(temperatures):
+            warnings.append(f"Antoine equations extrapolated beyond their fitted range for {', '.join(parameters.out_of_range(temperatures))}.")
+        if warnings:
+            result["warnings"] = warnings
+        result["elapsed_s"] = round(time.perf_counter() - start, 4)
+        return json.dumps(result)
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "message": f"Phase equilibrium calculation failed: {str(e)}",
+            "components": components
+        })
+
+
+# Relevant-section retrieval for Wikipedia articles
+WIKIPEDIA_TOKEN_BUDGET = 1500
+WIKIPEDIA_TOP_K = 6
+wikipedia_index_cache = IndexCache()
+
+def get_wikipedia_data(query: str, question: str = None, max_tokens: int = WIKIPEDIA_TOKEN_BUDGET) -> str:
+    """
+    Fetches a Wikipedia article based on a query and returns only the sections most relevant to the question.
+    
+    Args:
+        query (str): The chemical or scientific topic to retrieve from Wikipedia.
+        question (str, optional): The user's question, used to rank the article's sections. Defaults to the query.
+        max_tokens (int, optional): Approximate token budget for the returned excerpts.
+        
+    Returns:
+        str: A JSON string containing the article title, the lead and most relevant excerpts, and page metadata.
+    """
+    search_url = wikipedia_client.article_url(query)
+
+    try:
+        article = wikipedia_client.get_article(query)
+        page_title = article["title"]
+        article_text = article["article_text"]
+
+        if article_text.strip():
+            # The index is cached per article, so follow-up questions only re-rank
+            index = wikipedia_index_cache.get_or_build((article["url"], hash(article_text)), article_text)
+            excerpts = index.search(
+                question or query,
+                top_k=WIKIPEDIA_TOP_K,
+                token_budget=int(max_tokens),
+                always_include=(0,)  # The lead section gives the model an overview of the topic
+            )
+            return json.dumps({
+                "status": "success",
+                "query": query,
+                "wikipedia_url": search_url,
+                "title": page_title,
+                "total_chunks": len(index.chunks),
+                "excerpts": [
+                    {"section": chunk["section"], "text": chunk["text"], "relevance": chunk["score"]}
+                    for chunk in excerpts
+                ]
+            })
+        else:
+            return json.dumps({
+                "status": "error",
+                "query": query,
+                "wikipedia_url": search_url,
+                "message": "No article text found on the page."
+            })
+
+    except requests.exceptions.RequestException as e:
+        return json.dumps({
+            "status": "error",
+            "query": query,
+            "wikipedia_url": search_url,
+            "message": f"Network error: {str(e)}"
+        })
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "query": query,
+            "wikipedia_url": search_url,
+            "message": f"Parsing error: {str(e)}"
+        })
+
+
+# --- Map tool names to actual functions ---
+available_tools = {
+    "calculate_adiabatic_flame_temperature": calculate_adiabatic_flame_temperature,
+    "calculate_adiabatic_flame_temperature_sweep": calculate_adiabatic_flame_temperature_sweep,
+    "get_species_molecular_weight": get_species_molecular_weight,
+    "get_equilibrium_concentrations": get_equilibrium_concentrations,
+    "get_equilibrium_concentrations_sweep": get_equilibrium_concentrations_sweep,
+    "get_species_thermodynamic_properties": get_species_thermodynamic_properties,
+    "get_species_property_curves": get_species_property_curves,
+    "process_simulation_snapshot": process_simulation_snapshot,
+    "calculate_ignition_delay": calculate_ignition_delay,
+    "generate_phase_diagram": generate_phase_diagram,
+    "get_wikipedia_data": get_wikipedia_data
+}
+
+# Tools that mostly wait on the network run on threads; all others are CPU-bound Cantera/NumPy work
+# and run in worker processes.
+IO_BOUND_TOOLS = {"get_wikipedia_data"}
@@ -0,0 +1,410 @@
+# --- Vapor-Liquid Equilibrium Engine ---
+# Modified Raoult's law (y_i P = x_i gamma_i Psat_i) with Antoine vapor pressures and Wilson or
+# NRTL activity coefficients. Bubble and dew point solvers work on whole arrays of compositions at
+# once (one Newton iteration updates every point of a curve), so a T-x-y or P-x-y diagram is a few
+# dozen NumPy operations rather than a loop of scalar solves. Component parameter sets are built
+# once per process and reused.
+
+import json
+import threading
+
+import numpy as np
+
+
+R_CAL = 1.98720  # cal/(mol K), the unit of the tabulated Wilson and NRTL energies
+LN10 = np.log(10.0)
+MAX_DIAGRAM_POINTS = 2001
+MAX_ITERATIONS = 100
+TOLERANCE_K = 1e-6
+TOLERANCE_X = 1e-10
+MAX_NEWTON_STEP_K = 50.0
+# Antoine fits are usually fine a little outside their fitted range; warn beyond this
+EXTRAPOLATION_MARGIN_K = 10.0
+
+# Antoine constants for log10(Psat / bar) = A - B / (T / K + C) (NIST Chemistry WebBook), their
+# temperature range, the critical temperature and the liquid molar volume in cm3/mol (for Wilson).
+COMPONENTS = {
+    "water":         {"aliases": ("H2O",), "antoine": (4.6543, 1435.264, -64.848), "range": (255.9, 373.0), "tc": 647.1, "volume": 18.07},
+    "methanol":      {"aliases": ("CH3OH", "CH4O", "MeOH"), "antoine": (5.20409, 1581.341, -33.50), "range": (288.1, 356.8), "tc": 512.6, "volume": 40.73},
+    "ethanol":       {"aliases": ("C2H5OH", "C2H6O", "EtOH"), "antoine": (5.24677, 1598.673, -46.424), "range": (292.8, 366.6), "tc": 513.9, "volume": 58.68},
+    "1-propanol":    {"aliases": ("propanol", "n-propanol", "C3H7OH"), "antoine": (5.31384, 1690.864, -51.804), "range": (285.4, 370.3), "tc": 536.8, "volume": 75.14},
+    "2-propanol":    {"aliases": ("isopropanol", "IPA"), "antoine": (4.86100, 1357.427, -75.814), "range": (329.9, 362.4), "tc": 508.3, "volume": 76.92},
+    "acetone":       {"aliases": ("C3H6O", "CH3COCH3"), "antoine": (4.42448, 1312.253, -32.445), "range": (259.2, 507.6), "tc": 508.1, "volume": 74.05},
+    "acetic acid":   {"aliases": ("CH3COOH", "C2H4O2"), "antoine": (4.68206, 1642.540, -39.764), "range": (290.3, 391.0), "tc": 591.9, "volume": 57.54},
+    "acetonitrile":  {"aliases": ("CH3CN", "C2H3N"), "antoine": (4.27873, 1355.374, -37.853), "range": (288.3, 362.3), "tc": 545.5, "volume": 52.87},
+    "ethyl acetate": {"aliases": ("C4H8O2",), "antoine": (4.22809, 1245.702, -55.189), "range": (288.8, 349.2), "tc": 523.2, "volume": 98.49},
+    "chloroform":    {"aliases": ("CHCl3",), "antoine": (4.20772, 1233.129, -40.953), "range": (215.0, 334.4), "tc": 536.4, "volume": 80.67},
+    "benzene":       {"aliases": ("C6H6",), "antoine": (4.01814, 1203.835, -53.226), "range": (287.7, 354.1), "tc": 562.0, "volume": 89.41},
+    "toluene":       {"aliases": ("C7H8", "C6H5CH3"), "antoine": (4.07827, 1343.943, -53.773), "range": (308.5, 384.7), "tc": 591.8, "volume": 106.85},
+    "p-xylene":      {"aliases": ("xylene", "C8H10"), "antoine": (4.14553, 1474.403, -55.377), "range": (286.4, 452.4), "tc": 616.2, "volume": 123.93},
+    "cyclohexane":   {"aliases": ("C6H12",), "antoine": (3.96988, 1203.526, -50.287), "range": (293.1, 354.7), "tc": 553.5, "volume": 108.75},
+    "n-pentane":     {"aliases": ("pentane", "C5H12"), "antoine": (3.98920, 1070.617, -40.454), "range": (268.8, 341.4), "tc": 469.7, "volume": 116.11},
+    "n-hexane":      {"aliases": ("hexane", "C6H14"), "antoine": (4.00266, 1171.530, -48.784), "range": (286.2, 342.7), "tc": 507.6, "volume": 131.61},
+    "n-heptane":     {"aliases": ("heptane", "C7H16"), "antoine": (4.02832, 1268.636, -56.199), "range": (299.1, 372.4), "tc": 540.2, "volume": 147.47},
+    "n-octane":      {"aliases": ("octane", "C8H18"), "antoine": (4.04867, 1355.126, -63.633), "range": (326.1, 399.7), "tc": 568.7, "volume": 163.53},
+    "n-butane":      {"aliases": ("butane", "C4H10"), "antoine": (4.35576, 1175.581, -2.071), "range": (272.7, 425.0), "tc": 425.1, "volume": 96.48},
+    "methane":       {"aliases": ("CH4",), "antoine": (3.98950, 443.028, -0.49), "range": (91.0, 190.0), "tc": 190.6, "volume": 37.97},
+    "oxygen":        {"aliases": ("O2",), "antoine": (3.95230, 340.024, -4.144), "range": (54.4, 154.3), "tc": 154.6, "volume": 28.03},
+}
+
+# Binary interaction energies in cal/mol, (a12, a21) for the pair (1, 2); NRTL also has alpha.
+# Wilson: Lambda_ij = V_j / V_i exp(-a_ij / RT). NRTL: tau_ij = b_ij / RT, G_ij = exp(-alpha tau_ij).
+WILSON_PARAMETERS = {
+    ("methanol", "water"): (107.38, 469.55),
+    ("ethanol", "water"): (382.30, 955.45),
+    ("1-propanol", "water"): (775.48, 1351.90),
+    ("acetone", "water"): (291.27, 1448.01),
+    ("acetone", "methanol"): (-161.88, 583.11),
+    ("methanol", "benzene"): (1734.42, 183.04),
+    ("ethanol", "toluene"): (1556.45, 210.52),
+    ("methanol", "acetonitrile"): (504.31, 196.75),
+}
+NRTL_PARAMETERS = {
+    ("methanol", "water"): (-253.88, 845.21, 0.2994),
+    ("1-propanol", "water"): (500.40, 1636.57, 0.5081),
+    ("acetone", "water"): (631.05, 1197.41, 0.5343),
+    ("acetone", "methanol"): (184.70, 222.64, 0.3084),
+    ("methanol", "benzene"): (730.09, 1175.41, 0.4743),
+    ("ethanol", "toluene"): (713.57, 1147.86, 0.5292),
+}
+ACTIVITY_MODELS = ("ideal", "wilson", "nrtl")
+
+_ALIASES = {}
+for _name, _data in COMPONENTS.items():
+    for _alias in (_name,) + _data["aliases"]:
+        _ALIASES[_alias.lower()] = _name
+
+
+def canonical_name(component: str) -> str:
+    """Maps a component name or formula (case-insensitive) to its library name, raising ValueError if unknown."""
+    name = _ALIASES.get(component.strip().lower())
+    if name is None:
+        raise ValueError(f"No vapor pressure data for '{component}'. Known components: {', '.join(COMPONENTS)}.")
+    return name
+
+
+class ParameterSet:
+    """
+    Vapor pressure and activity coefficient parameters of an ordered list of components.
+
+    Args:
+        names (list): Library names of the components.
+        model (str): 'ideal', 'wilson' or 'nrtl'.
+        interactions (dict): {(i, j): parameters} for the pairs that have binary parameters,
+                             with i < j indexing names; missing pairs are treated as ideal.
+    """
+
+    def __init__(self, names: list, model: str, interactions: dict):
+        self.names = list(names)
+        self.model = model
+        data = [COMPONENTS[name] for name in names]
+        self.A, self.B, self.C = (np.array(values) for values in zip(*(d["antoine"] for d in data)))
+        self.t_min, self.t_max = (np.array(values) for values in zip(*(d["range"] for d in data)))
+        self.tc = np.array([d["tc"] for d in data])
+        n = len(names)
+        self.energies = np.zeros((n, n))  # a_ij (Wilson) or b_ij (NRTL), cal/mol
+        self.alpha = np.zeros((n, n))
+        for (i, j), values in interactions.items():
+            self.energies[i, j], self.energies[j, i] = values[0], values[1]
+            if model == "nrtl":
+                self.alpha[i, j] = self.alpha[j, i] = values[2]
+        volumes = np.array([d["volume"] for d in data])
+        self.volume_ratio = volumes[None, :] / volumes[:, None]  # V_j / V_i
+        self.missing_pairs = [(names[i], names[j]) for i in range(n) for j in range(i + 1, n)
+                              if model != "ideal" and (i, j) not in interactions]
+
+    def psat(self, T) -> np.ndarray:
+        """Vapor pressures in Pa, shape T.shape + (n,)."""
+        T = np.asarray(T, dtype=float)[..., None]
+        return 1e5 * 10.0 ** (self.A - self.B / (T + self.C))
+
+    def dln_psat_dT(self, T) -> np.ndarray:
+        T = np.asarray(T, dtype=float)[..., None]
+        return LN10 * self.B / (T + self.C) ** 2
+
+    def saturation_temperature(self, P) -> np.ndarray:
+        """Pure-component boiling temperatures in K at pressure P (Pa), shape P.shape + (n,)."""
+        P = np.asarray(P, dtype=float)[..., None]
+        return self.B / (self.A - np.log10(P / 1e5)) - self.C
+
+    def ln_gamma(self, x: np.ndarray, T) -> np.ndarray:
+        """
+        Log activity coefficients for many compositions at once.
+
+        Args:
+            x (np.ndarray): Liquid mole fractions, shape (points, n).
+            T: Temperature in K, scalar or shape (points,).
+
+        Returns:
+            np.ndarray: ln(gamma), shape (points, n).
+        """
+        if self.model == "ideal" or not self.energies.any():
+            return np.zeros_like(x)
+        T = np.broadcast_to(np.asarray(T, dtype=float), x.shape[:1])[:, None, None]
+        if self.model == "wilson":
+            L = self.volume_ratio * np.exp(-self.energies / (R_CAL * T))          # (points, n, n)
+            S = np.einsum("pj,pij->pi", x, L)                                     # sum_j x_j L_ij
+            return 1.0 - np.log(S) - np.einsum("pk,pki->pi", x / S, L)
+        tau = self.energies / (R_CAL * T)
+        G = np.exp(-self.alpha * tau)
+        D = np.einsum("pk,pki->pi", x, G)                                         # sum_k x_k G_ki
+        C = np.einsum("pj,pji->pi", x, tau * G)                                   # sum_j x_j tau_ji G_ji
+        return C / D + np.einsum("pj,pij->pi", x / D, G * (tau - (C / D)[:, None, :]))
+
+    def supercritical(self, T) -> list:
+        """Components above their critical temperature somewhere in T (no vapor pressure exists there)."""
+        high = np.nanmax(np.atleast_1d(np.asarray(T, dtype=float)))
+        return [name for name, tc in zip(self.names, self.tc) if high > tc]
+
+    def out_of_range(self, T) -> list:
+        """Components whose Antoine range (or critical temperature) does not cover the temperatures T."""
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        low, high = np.nanmin(T), np.nanmax(T)
+        return [name for name, t_min, t_max in zip(self.names, self.t_min, self.t_max)
+                if low < t_min - EXTRAPOLATION_MARGIN_K or high > t_max + EXTRAPOLATION_MARGIN_K]
+
+
+_parameter_sets = {}
+_parameter_sets_lock = threading.Lock()
+
+
+def get_parameter_set(components: list, model: str = "auto", interaction_parameters: dict = None) -> ParameterSet:
+    """
+    Returns the parameter set of a component list, building it once per process.
+
+    Args:
+        components (list): Component names or formulas, in the order results are reported.
+        model (str): 'ideal', 'wilson', 'nrtl', or 'auto' (Wilson if the library has parameters
+                     for any pair, otherwise ideal).
+        interaction_parameters (dict, optional): {"comp1/comp2": [a12, a21]} for Wilson or
+                     [b12, b21, alpha] for NRTL, in cal/mol; overrides the library.
+
+    Raises:
+        ValueError: For an unknown component or model, duplicate components or malformed parameters.
+    """
+    names = [canonical_name(component) for component in components]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate components: {components}")
+    if model == "auto":
+        pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+        model = "wilson" if interaction_parameters or any(
+            (a, b) in WILSON_PARAMETERS or (b, a) in WILSON_PARAMETERS for a, b in pairs) else "ideal"
+    if model not in ACTIVITY_MODELS:
+        raise ValueError(f"Unknown activity model '{model}'; use one of {', '.join(ACTIVITY_MODELS)}.")
+
+    key = (tuple(names), model, json.dumps(interaction_parameters, sort_keys=True))
+    with _parameter_sets_lock:
+        parameters = _parameter_sets.get(key)
+        if parameters is not None:
+            return parameters
+
+    library = {"wilson": WILSON_PARAMETERS, "nrtl": NRTL_PARAMETERS}.get(model, {})
+    custom = {}
+    for pair, values in (interaction_parameters or {}).items():
+        first, _, second = pair.partition("/")
+        if not second:
+            raise ValueError(f"Interaction parameter keys look like 'ethanol/water', got '{pair}'.")
+        expected = 3 if model == "nrtl" else 2
+        if len(values) != expected:
+            raise ValueError(f"'{pair}' needs {expected} values for the {model} model.")
+        custom[(canonical_name(first), canonical_name(second))] = [float(v) for v in values]
+
+    interactions = {}
+    for i, a in enumerate(names):
+        for j in range(i + 1, len(names)):
+            b = names[j]
+            for source in (custom, library):
+                if (a, b) in source:
+                    interactions[(i, j)] = source[(a, b)]
+                    break
+                if (b, a) in source:
+                    values = source[(b, a)]
+                    interactions[(i, j)] = [values[1], values[0]] + list(values[2:])
+                    break
+
+    parameters = ParameterSet(names, model, interactions)
+    with _parameter_sets_lock:
+        _parameter_sets[key] = parameters
+    return parameters
+
+
+def _normalize(x) -> np.ndarray:
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    if (x < 0).any() or (x.sum(axis=1) <= 0).any():
+        raise ValueError("Mole fractions must be non-negative and not all zero.")
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def bubble_pressure(parameters: ParameterSet, x, T) -> tuple:
+    """
+    Bubble point pressures of liquids x at temperatures T (explicit, no iteration).
+
+    Returns:
+        tuple: (P in Pa, shape (points,); vapor mole fractions y, shape (points, n))
+    """
+    x = _normalize(x)
+    partial = x * np.exp(parameters.ln_gamma(x, T)) * parameters.psat(np.broadcast_to(T, x.shape[:1]))
+    P = partial.sum(axis=1)
+    return P, partial / P[:, None]
+
+
+def dew_pressure(parameters: ParameterSet, y, T) -> tuple:
+    """
+    Dew point pressures of vapors y at temperatures T.
+
+    Returns:
+        tuple: (P in Pa, shape (points,); liquid mole fractions x, shape (points, n))
+    """
+    y = _normalize(y)
+    psat = parameters.psat(np.broadcast_to(T, y.shape[:1]))
+    gamma = np.ones_like(y)
+    for _ in range(MAX_ITERATIONS):
+        P = 1.0 / (y / (gamma * psat)).sum(axis=1)
+        x = y * P[:, None] / (gamma * psat)
+        x /= x.sum(axis=1, keepdims=True)
+        new_gamma = np.exp(parameters.ln_gamma(x, T))
+        converged = np.abs(new_gamma - gamma).max() < TOLERANCE_X
+        gamma = new_gamma
+        if converged:
+            break
+    P = 1.0 / (y / (gamma * psat)).sum(axis=1)
+    return P, x
+
+
+def _initial_temperature(parameters: ParameterSet, z: np.ndarray, P: np.ndarray) -> np.ndarray:
+    return (z * parameters.saturation_temperature(P)).sum(axis=1)
+
+
+def bubble_temperature(parameters: ParameterSet, x, P) -> tuple:
+    """
+    Bubble point temperatures of liquids x at pressures P, all points solved together by Newton's method.
+
+    Returns:
+        tuple: (T in K, shape (points,); vapor mole fractions y, shape (points, n); iterations used)
+    """
+    x = _normalize(x)
+    P = np.broadcast_to(np.asarray(P, dtype=float), x.shape[:1])
+    T = _initial_temperature(parameters, x, P)
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        partial = x * np.exp(parameters.ln_gamma(x, T)) * parameters.psat(T)
+        total = partial.sum(axis=1)
+        # d ln(sum x gamma Psat)/dT, neglecting the weak temperature dependence of gamma
+        slope = (partial * parameters.dln_psat_dT(T)).sum(axis=1) / total
+        step = np.clip(np.log(total / P) / slope, -MAX_NEWTON_STEP_K, MAX_NEWTON_STEP_K)
+        T = T - step
+        if np.abs(step).max() < TOLERANCE_K:
+            break
+    partial = x * np.exp(parameters.ln_gamma(x, T)) * parameters.psat(T)
+    return T, partial / partial.sum(axis=1, keepdims=True), iteration
+
+
+def dew_temperature(parameters: ParameterSet, y, P) -> tuple:
+    """
+    Dew point temperatures of vapors y at pressures P, all points solved together.
+
+    Returns:
+        tuple: (T in K, shape (points,); liquid mole fractions x, shape (points, n); iterations used)
+    """
+    y = _normalize(y)
+    P = np.broadcast_to(np.asarray(P, dtype=float), y.shape[:1])
+    T = _initial_temperature(parameters, y, P)
+    x = y.copy()
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        gamma = np.exp(parameters.ln_gamma(x, T))
+        liquid = y * P[:, None] / (gamma * parameters.psat(T))                    # unnormalized x
+        total = liquid.sum(axis=1)
+        slope = -(liquid * parameters.dln_psat_dT(T)).sum(axis=1) / total
+        step = np.clip(np.log(total) / slope, -MAX_NEWTON_STEP_K, MAX_NEWTON_STEP_K)
+        T = T - step
+        x_new = liquid / total[:, None]
+        converged = np.abs(step).max() < TOLERANCE_K and np.abs(x_new - x).max() < TOLERANCE_X
+        x = x_new
+        if converged:
+            break
+    return T, x, iteration
+
+
+def flash(parameters: ParameterSet, z, T: float, P: float) -> dict:
+    """
+    Isothermal flash of a feed z at temperature T and pressure P.
+
+    Returns:
+        dict: {"phase" ('liquid', 'vapor' or 'two-phase'), "vapor_fraction", "x", "y", "K"}
+              (compositions as lists in component order)
+    """
+    z = _normalize(z)
+    bubble_p, y_bubble = bubble_pressure(parameters, z, T)
+    dew_p, x_dew = dew_pressure(parameters, z, T)
+    if P >= bubble_p[0]:
+        return {"phase": "liquid", "vapor_fraction": 0.0, "x": z[0].tolist(), "y": y_bubble[0].tolist(), "K": None}
+    if P <= dew_p[0]:
+        return {"phase": "vapor", "vapor_fraction": 1.0, "x": x_dew[0].tolist(), "y": z[0].tolist(), "K": None}
+
+    psat = parameters.psat(np.atleast_1d(T))[0]
+    # Start between the dew and bubble liquid compositions, then alternate Rachford-Rice and gamma updates
+    fraction = (bubble_p[0] - P) / (bubble_p[0] - dew_p[0])
+    x = (1 - fraction) * z[0] + fraction * x_dew[0]
+    z = z[0]
+    V = fraction
+    for _ in range(MAX_ITERATIONS):
+        K = np.exp(parameters.ln_gamma(x[None, :], T)[0]) * psat / P
+        lo, hi = 0.0, 1.0
+        for _ in range(60):  # Bisection: the Rachford-Rice function decreases monotonically in V
+            V = (lo + hi) / 2
+            if (z * (K - 1) / (1 + V * (K - 1))).sum() > 0:
+                lo = V
+            else:
+                hi = V
+        x_new = z / (1 + V * (K - 1))
+        x_new /= x_new.sum()
+        if np.abs(x_new - x).max() < TOLERANCE_X:
+            x = x_new
+            break
+        x = x_new
+    y = K * x
+    return {"phase": "two-phase", "vapor_fraction": float(V), "x": x.tolist(), "y": (y / y.sum()).tolist(), "K": K.tolist()}
+
+
+def _azeotropes(x1: np.ndarray, y1: np.ndarray, values: np.ndarray) -> list:
+    """Interior compositions where y1 - x1 changes sign, interpolated linearly between grid points."""
+    difference = y1 - x1
+    found = []
+    for k in np.nonzero(np.sign(difference[1:-2]) * np.sign(difference[2:-1]) < 0)[0] + 1:
+        w = difference[k] / (difference[k] - difference[k + 1])
+        found.append({"x1": float(x1[k] + w * (x1[k + 1] - x1[k])), "value": float(values[k] + w * (values[k + 1] - values[k]))})
+    return found
+
+
+def binary_diagram(parameters: ParameterSet, kind: str, temperature_k: float, pressure_pa: float, points: int = 101) -> dict:
+    """
+    Computes a binary T-x-y (isobaric) or P-x-y (isothermal) diagram along the bubble point curve.
+
+    Args:
+        parameters (ParameterSet): Parameters of exactly two components.
+        kind (str): 'txy' (at pressure_pa) or 'pxy' (at temperature_k).
+        points (int): Liquid compositions x1 from 0 to 1.
+
+    Returns:
+        dict: {"columns", "rows" (x1, y1 and T_K or P_Pa per point), "azeotropes", "iterations"}
+    """
+    if len(parameters.names) != 2:
+        raise ValueError("Phase diagrams need exactly two components.")
+    points = int(points)
+    if not 2 <= points <= MAX_DIAGRAM_POINTS:
+        raise ValueError(f"points must be between 2 and {MAX_DIAGRAM_POINTS}.")
+    x1 = np.linspace(0.0, 1.0, points)
+    x = np.column_stack([x1, 1.0 - x1])
+    if kind == "txy":
+        values, y, iterations = bubble_temperature(parameters, x, pressure_pa)
+        column, digits = "T_K", 3
+    elif kind == "pxy":
+        values, y = bubble_pressure(parameters, x, temperature_k)
+        iterations = 0
+        column, digits = "P_Pa", 1
+    else:
+        raise ValueError(f"Unknown diagram type '{kind}'; use 'txy' or 'pxy'.")
+    first = parameters.names[0]
+    rows = np.column_stack([np.round(x1, 6), np.round(y[:, 0], 6), np.round(values, digits)]).tolist()
+    azeotropes = [{f"x_{first}": round(a["x1"], 4), column: round(a["value"], digits)}
+                  for a in _azeotropes(x1, y[:, 0], values)]
+    return {"columns": [f"x_{first}", f"y_{first}", column], "rows": rows, "azeotropes": azeotropes, "iterations": iterations}
@@ -0,0 +1,258 @@
+# --- Wikipedia Fetching with Connection Pooling and Caching ---
+# All article requests share one requests.Session (keep-alive connection pool with retries).
+# Raw responses are kept in an on-disk cache and revalidated with ETag / Last-Modified, and
+# parsed articles are kept in memory keyed on the resolved page title (with the requested URLs
+# as aliases), so repeated questions about the same topic neither re-download nor re-parse the page.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Point this at a local server (e.g. one serving saved pages) to work offline.
+WIKIPEDIA_BASE_URL = os.environ.get("CATALYST_MIND_WIKIPEDIA_URL", "https://en.wikipedia.org/wiki/")
+HTTP_CACHE_DIR = os.environ.get("CATALYST_MIND_HTTP_CACHE_DIR",
+                                os.path.join(os.path.expanduser("~"), ".cache", "catalyst_mind", "http"))
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+# Parsed articles are served without contacting the server for this long, then revalidated.
+ARTICLE_TTL_S = 15 * 60
+MAX_PARSED_ARTICLES = 64
+MAX_URL_ALIASES = 4 * MAX_PARSED_ARTICLES
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def _default_parser() -> str:
+    # lxml parses large articles several times faster than the pure-Python html.parser
+    configured = os.environ.get("CATALYST_MIND_HTML_PARSER")
+    if configured:
+        return configured
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = _default_parser()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+class HttpResponseCache:
+    """
+    On-disk cache of GET responses keyed on URL, revalidated with conditional requests.
+
+    Each entry is a pair of files: <key>.json with the validators and metadata and
+    <key>.html with the body.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".html")
+
+    def load(self, url: str):
+        """Returns (metadata, body) for a cached URL, or (None, None)."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "r", encoding="utf-8") as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None, None
+
+    def store(self, url: str, meta: dict, body: str = None) -> None:
+        meta_path, body_path = self._paths(url)
+        if body is not None:
+            tmp_path = body_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+
+def _max_age(cache_control: str) -> int:
+    if not cache_control or "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def parse_article(html: str, parser: str = None) -> dict:
+    """
+    Extracts the title and main text (paragraphs, lists and section headings) of a Wikipedia page.
+
+    Returns:
+        dict: {"title": str, "article_text": str}
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+
+    page_title = soup.find("h1", id="firstHeading").text.strip()
+
+    # Extract the main content
+    content_div = soup.find("div", class_="mw-parser-output")
+    paragraphs = content_div.find_all(['p', 'h2', 'h3', 'ul', 'ol'])  # Main content only
+
+    parts = []
+    for tag in paragraphs:
+        if tag.name in ["h2", "h3"]:
+            section_title = tag.get_text(strip=True).replace("[edit]", "")
+            parts.append(f"\n\n### {section_title}\n\n")
+        else:
+            text = tag.get_text(strip=True)
+            if text:
+                parts.append(f"{text}\n\n")
+
+    return {"title": page_title, "article_text": "".join(parts).strip()}
+
+
+class WikipediaClient:
+    """
+    Fetches and parses Wikipedia articles through a pooled session and two cache layers.
+
+    Args:
+        base_url (str): Prefix the quoted article title is appended to.
+        cache_dir (str): Directory of the on-disk HTTP response cache.
+        parser (str): BeautifulSoup parser backend ('lxml' or 'html.parser').
+    """
+
+    def __init__(self, base_url: str = WIKIPEDIA_BASE_URL, cache_dir: str = HTTP_CACHE_DIR, parser: str = HTML_PARSER):
+        self.base_url = base_url
+        self.parser = parser
+        self.session = _build_session()
+        self.http_cache = HttpResponseCache(cache_dir)
+        self._articles = OrderedDict()  # resolved page title -> (validator, checked_at, article)
+        self._aliases = {}  # requested URL -> resolved page title
+        self._lock = threading.Lock()
+        self._stats = {"article_hits": 0, "revalidated": 0, "downloads": 0, "parses": 0,
+                       "parse_time_s": 0.0, "fetch_time_s": 0.0}
+
+    def article_url(self, query: str) -> str:
+        return f"{self.base_url}{requests.utils.quote(query)}"
+
+    def _fetch(self, url: str):
+        """GETs a URL, revalidating a cached copy if there is one. Returns (body, validator)."""
+        meta, body = self.http_cache.load(url)
+        if meta is not None and time.time() - meta.get("fetched_at", 0) < meta.get("max_age", 0):
+            return body, meta.get("etag") or meta.get("last_modified")
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        start = time.perf_counter()
+        response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        with self._lock:
+            self._stats["fetch_time_s"] += time.perf_counter() - start
+
+        if response.status_code == 304 and meta is not None:
+            with self._lock:
+                self._stats["revalidated"] += 1
+            meta["fetched_at"] = time.time()
+            meta["max_age"] = _max_age(response.headers.get("Cache-Control", ""))
+            self.http_cache.store(url, meta)
+            return body, meta.get("etag") or meta.get("last_modified")
+
+        response.raise_for_status()
+        with self._lock:
+            self._stats["downloads"] += 1
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "max_age": _max_age(response.headers.get("Cache-Control", "")),
+            "fetched_at": time.time(),
+        }
+        body = response.text
+        self.http_cache.store(url, meta, body)
+        # Without validators every download counts as a new version of the page
+        return body, meta["etag"] or meta["last_modified"] or hashlib.sha256(body.encode()).hexdigest()
+
+    def get_article(self, query: str) -> dict:
+        """
+        Returns the parsed article for a query.
+
+        Returns:
+            dict: {"title": str, "article_text": str, "url": str}
+
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors.
+        """
+        # Article titles are case-sensitive (beyond the first letter), so requests are told apart
+        # by their exact URL and parsed pages by the title the server resolved them to
+        url = self.article_url(query.strip())
+
+        with self._lock:
+            title = self._aliases.get(url)
+            cached = self._articles.get(title) if title is not None else None
+            if cached is not None and time.time() - cached[1] < ARTICLE_TTL_S:
+                self._articles.move_to_end(title)
+                self._stats["article_hits"] += 1
+                return cached[2]
+
+        body, validator = self._fetch(url)
+
+        if cached is not None and validator is not None and cached[0] == validator:
+            # The page has not changed since it was parsed
+            article = cached[2]
+        else:
+            start = time.perf_counter()
+            article = parse_article(body, self.parser)
+            article["url"] = url
+            with self._lock:
+                self._stats["parses"] += 1
+                self._stats["parse_time_s"] += time.perf_counter() - start
+
+        with self._lock:
+            title = article["title"]
+            self._articles[title] = (validator, time.time(), article)
+            self._articles.move_to_end(title)
+            self._aliases.pop(url, None)
+            self._aliases[url] = title
+            while len(self._aliases) > MAX_URL_ALIASES:
+                del self._aliases[next(iter(self._aliases))]
+            while len(self._articles) > MAX_PARSED_ARTICLES:
+                evicted, _ = self._articles.popitem(last=False)
+                self._aliases = {alias: t for alias, t in self._aliases.items() if t != evicted}
+        return article
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = dict(self._stats)
+            report["parsed_articles"] = len(self._articles)
+            report["parser"] = self.parser
+            return report
+
+
+# Module-level client shared by every Streamlit session in this process.
+wikipedia_client = WikipediaClient()
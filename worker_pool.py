@@ -0,0 +1,233 @@
+# --- Killable Tool Worker Pool ---
+# A bounded set of long-lived worker processes that run CPU-bound tools. Unlike a
+# ProcessPoolExecutor, a single task can be stopped: when a tool exceeds its wall-clock limit or
+# its turn is cancelled (the user resubmitted or left), the worker running it is killed and
+# replaced. Workers stay warm between tasks, so the mechanism registry in each one keeps its
+# parsed mechanisms. The pool also reports queue depth and utilization.
+
+import atexit
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+
+POLL_INTERVAL_S = 0.05
+
+
+class ToolTimeoutError(Exception):
+    """The tool exceeded its wall-clock limit and its worker was killed."""
+
+
+class ToolCancelledError(Exception):
+    """The tool's turn was cancelled before the tool finished."""
+
+
+class WorkerCrashedError(Exception):
+    """The worker process died while running the tool."""
+
+
+def _worker_main(connection) -> None:
+    # Own process group, so killing the worker also stops any pool it started (e.g. parallel sweeps)
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the parent
+    from tools import available_tools
+
+    while True:
+        try:
+            tool_name, tool_args = connection.recv()
+        except (EOFError, OSError):
+            return
+        started = time.perf_counter()
+        try:
+            result = available_tools[tool_name](**tool_args)
+            connection.send(("ok", result, time.perf_counter() - started))
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}", time.perf_counter() - started))
+
+
+def process_context():
+    """
+    Multiprocessing context for every process pool of the app.
+
+    Never fork a multithreaded process (the Streamlit process, or a tool worker running its own
+    threads): another thread may hold a lock at that moment (e.g. the mechanism registry's parse
+    lock) and the child would inherit it held forever. A fork server starts from a clean
+    single-threaded process; spawn is the portable fallback.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["tools"])  # Workers start with the tool modules imported
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class _Worker:
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection,), daemon=False,
+                                       name="tool-worker")
+        self.process.start()
+        child_connection.close()
+        if hasattr(os, "setpgid"):
+            # Also set from the parent, so a kill right after start cannot miss the group
+            try:
+                os.setpgid(self.process.pid, self.process.pid)
+            except OSError:
+                pass
+
+    def kill(self) -> None:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.kill()
+        # Poll for the exit status rather than join(): join waits on a pipe that workers forked
+        # later may also hold open, so it can block long after the process is gone
+        deadline = time.monotonic() + 5
+        while self.process.exitcode is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.connection.close()
+
+
+class WorkerPool:
+    """
+    Bounded pool of killable worker processes.
+
+    Args:
+        max_workers (int): Number of worker processes (started on demand).
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._context = process_context()
+        self._idle = queue.LifoQueue()  # Most recently used worker first: its caches are warmest
+        self._started = 0
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._stats = {"tasks": 0, "queued": 0, "busy": 0, "max_queue_depth": 0, "queue_wait_s": 0.0,
+                       "timeouts": 0, "cancelled": 0, "crashes": 0, "restarts": 0}
+        atexit.register(self.shutdown)
+
+    def _acquire(self, deadline: float, cancel_event) -> _Worker:
+        queued = False
+        try:
+            while True:
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+                # Checked on every pass: a worker discarded after a timeout or crash frees its slot
+                # for the callers already waiting, not only for the next new call
+                with self._lock:
+                    create = self._started < self.max_workers
+                    if create:
+                        self._started += 1
+                    elif not queued:
+                        queued = True
+                        self._stats["queued"] += 1
+                        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queued"])
+                if create:
+                    try:
+                        worker = _Worker(self._context)
+                    except Exception:
+                        with self._lock:
+                            self._started -= 1
+                        raise
+                    with self._lock:
+                        self._workers.add(worker)
+                    return worker
+
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ToolCancelledError("cancelled while waiting for a free worker")
+                if time.monotonic() >= deadline:
+                    raise ToolTimeoutError("timed out while waiting for a free worker")
+                try:
+                    return self._idle.get(timeout=POLL_INTERVAL_S)
+                except queue.Empty:
+                    continue
+        finally:
+            if queued:
+                with self._lock:
+                    self._stats["queued"] -= 1
+
+    def _discard(self, worker: _Worker) -> None:
+        """Kills a worker; a replacement is started by the next caller waiting for or needing one."""
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            self._started -= 1
+            self._stats["restarts"] += 1
+
+    def run(self, tool_name: str, tool_args: dict, timeout_s: float, cancel_event: threading.Event = None):
+        """
+        Runs a tool in a worker process and waits for it (call from a thread, not the UI thread).
+
+        Args:
+            tool_name (str): Name of a tool in tools.available_tools.
+            tool_args (dict): Keyword arguments for the tool.
+            timeout_s (float): Wall-clock limit, including the time spent waiting for a free worker.
+            cancel_event (threading.Event, optional): Set to abandon the call and kill its worker.
+
+        Returns:
+            tuple: (result JSON string, seconds the tool ran in the worker)
+
+        Raises:
+            ToolTimeoutError, ToolCancelledError, WorkerCrashedError, or RuntimeError if the tool raised.
+        """
+        submitted = time.monotonic()
+        deadline = submitted + timeout_s
+        worker = self._acquire(deadline, cancel_event)
+        with self._lock:
+            self._stats["tasks"] += 1
+            self._stats["busy"] += 1
+            self._stats["queue_wait_s"] += time.monotonic() - submitted
+
+        try:
+            try:
+                worker.connection.send((tool_name, tool_args))
+                while not worker.connection.poll(POLL_INTERVAL_S):
+                    if cancel_event is not None and cancel_event.is_set():
+                        self._discard(worker)
+                        with self._lock:
+                            self._stats["cancelled"] += 1
+                        raise ToolCancelledError(f"'{tool_name}' was cancelled")
+                    if time.monotonic() >= deadline:
+                        self._discard(worker)
+                        with self._lock:
+                            self._stats["timeouts"] += 1
+                        raise ToolTimeoutError(f"'{tool_name}' exceeded its {timeout_s:g} s time limit and was stopped")
+                status, payload, elapsed = worker.connection.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                self._discard(worker)
+                with self._lock:
+                    self._stats["crashes"] += 1
+                raise WorkerCrashedError(f"The worker running '{tool_name}' exited unexpectedly")
+        finally:
+            with self._lock:
+                self._stats["busy"] -= 1
+
+        self._idle.put(worker)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload, elapsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = dict(self._stats)
+            report["workers"] = self._started
+            report["max_workers"] = self.max_workers
+            report["queue_wait_s"] = round(report["queue_wait_s"], 4)
+            return report
+
+    def shutdown(self) -> None:
+        """Kills all workers, including busy ones (called at interpreter exit)."""
+        with self._lock:
+            workers, self._workers = list(self._workers), set()
+            self._started = 0
+        for worker in workers:
+            worker.kill()